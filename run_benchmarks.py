@@ -0,0 +1,7 @@
+
+import os, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+from backtest.benchmarks import main
+
+# e.g. python run_benchmarks.py --profile smoke ; python run_benchmarks.py --compare
+raise SystemExit(main())
@@ -24,4 +24,12 @@ class EventBus:
         for cb in callbacks:
             cb(event)
 
+    def publish_batch(self, batch):
+        """Subscribers of the batch type get it whole; subscribers of its per-bar type
+        (`batch.bar_type`) get it unrolled, one published event per bar."""
+        self.publish(batch)
+        if self._subscribers.get(batch.bar_type):
+            for event in batch.events():
+                self.publish(event)
+
 event_bus = EventBus()
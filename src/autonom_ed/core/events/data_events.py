@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 from datetime import datetime
+from typing import ClassVar
 from .base import BaseEvent
 
 @dataclass
@@ -22,3 +23,31 @@ class BarDataEvent(BaseEvent):
     low: float
     close: float
     volume: float
+
+@dataclass
+class BarBatch(BaseEvent):
+    """Columnar bars of one symbol (index + one array per field); see EventBus.publish_batch."""
+    symbol: str
+    index: "object"  # pandas DatetimeIndex
+    open: "object"   # numpy arrays, same length as index
+    high: "object"
+    low: "object"
+    close: "object"
+    volume: "object"
+
+    bar_type: ClassVar[type] = BarDataEvent
+
+    @classmethod
+    def from_frame(cls, df, symbol: str, source: str, timestamp: datetime) -> "BarBatch":
+        return cls(source=source, timestamp=timestamp, symbol=symbol, index=df.index,
+                   **{f: df[f].to_numpy(dtype=float) for f in ("open", "high", "low", "close", "volume")})
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def events(self):
+        """One BarDataEvent per row, as the per-bar replay used to publish them."""
+        cols = (self.open.tolist(), self.high.tolist(), self.low.tolist(), self.close.tolist(), self.volume.tolist())
+        for ts, o, h, l, c, v in zip(self.index, *cols):
+            yield BarDataEvent(source=self.source, timestamp=ts, symbol=self.symbol,
+                               open=o, high=h, low=l, close=c, volume=v)
@@ -1,7 +1,7 @@
 from datetime import datetime
 from ..core.bus.event_bus import event_bus
 from ..core.events.backtest_events import BacktestRequested, BacktestCompleted
-from ..core.events.data_events import DataFetchRequested, CleanedDataReady, BarDataEvent
+from ..core.events.data_events import DataFetchRequested, CleanedDataReady, BarBatch
 from ..engines.data_provider_engine import DataProviderEngine
 
 class BacktestingService:
@@ -24,15 +24,9 @@ class BacktestingService:
         if self.pending is None or event.symbol != self.pending.symbol:
             return
         df = event.df
-        # replay
-        for ts, row in df.iterrows():
-            self.bus.publish(BarDataEvent(
-                source="BacktestingService", timestamp=ts,
-                symbol=self.pending.symbol,
-                open=float(row["open"]), high=float(row["high"]),
-                low=float(row["low"]), close=float(row["close"]),
-                volume=float(row["volume"]),
-            ))
+        # replay (per-bar subscribers get the batch unrolled into BarDataEvents)
+        self.bus.publish_batch(BarBatch.from_frame(df, symbol=self.pending.symbol,
+                                                   source="BacktestingService", timestamp=datetime.utcnow()))
         # complete
         self.bus.publish(BacktestCompleted(
             source="BacktestingService", timestamp=datetime.utcnow(),
@@ -0,0 +1,239 @@
+"""Compiled bar loop for path-dependent backtests.
+
+Logic that cannot be written as pure array math (ATR stops, LIMIT fills that
+depend on the bar range, a drawdown kill switch) runs here as one state machine
+over aligned (time x symbol) arrays. With Numba installed the loop is JIT
+compiled; otherwise the very same function runs in the interpreter, so both
+backends produce identical results.
+
+Bar t, in order:
+ 1. a pending kill switch flattens every position at the open
+ 2. orders decided at t-1 execute (MARKET at the open; LIMIT at the better of
+    limit/open, the same simplistic rule as BacktestEngine)
+ 3. ATR stops set at entry are checked against the bar's low/high
+ 4. mark-to-market at the close
+ 5. drawdown from the equity peak beyond `max_drawdown` arms the kill switch
+ 6. target units at t become orders for t+1 (1-bar delay, as in BacktestEngine)
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    njit = None
+    NUMBA_AVAILABLE = False
+
+BACKENDS = ("auto", "numba", "python")
+
+
+def _bar_loop(open_, high, low, close, target, atr, capital, fee_rate, stop_mult, limit_offset, max_drawdown):
+    T, N = close.shape
+    cash = capital
+    pos = np.zeros(N)
+    stop = np.full(N, np.nan)
+    order = np.full(N, np.nan)        # target units to execute at the next open (nan: none)
+    limit_px = np.full(N, np.nan)     # limit for that order (nan: market)
+    stopped = np.zeros(N, dtype=np.bool_)
+    last_close = np.full(N, np.nan)
+    equity = np.empty(T)
+    cash_out = np.empty(T)
+    pos_out = np.empty((T, N))
+    n_fills = 0
+    peak = -np.inf
+    halted = False
+    kill_pending = False
+    killed_at = -1
+
+    for t in range(T):
+        # 1) kill switch: flatten at the open
+        if kill_pending:
+            kill_pending = False
+            for j in range(N):
+                px = open_[t, j]
+                if pos[j] != 0.0:
+                    if np.isfinite(px):
+                        cash += pos[j] * px - abs(pos[j] * px) * fee_rate
+                        pos[j] = 0.0
+                        stop[j] = np.nan
+                        n_fills += 1
+                    else:
+                        kill_pending = True
+
+        # 2) execute orders from the previous bar
+        for j in range(N):
+            tgt = order[j]
+            if np.isnan(tgt):
+                continue
+            order[j] = np.nan
+            px = open_[t, j]
+            if not np.isfinite(px):
+                continue
+            delta = tgt - pos[j]
+            if delta == 0.0:
+                continue
+            lp = limit_px[j]
+            if not np.isnan(lp):
+                px = min(lp, px) if delta > 0.0 else max(lp, px)
+            cash -= delta * px + abs(delta * px) * fee_rate
+            prev = pos[j]
+            pos[j] = tgt
+            n_fills += 1
+            if tgt == 0.0:
+                stop[j] = np.nan
+            elif prev == 0.0 or (prev > 0.0) != (tgt > 0.0) or abs(tgt) > abs(prev):
+                # (re)set the stop on entries and adds, from the ATR known when the order was decided
+                a = atr[t - 1, j] if t > 0 else np.nan
+                if stop_mult > 0.0 and np.isfinite(a):
+                    stop[j] = px - stop_mult * a if tgt > 0.0 else px + stop_mult * a
+                else:
+                    stop[j] = np.nan
+
+        # 3) ATR stops
+        for j in range(N):
+            if pos[j] == 0.0 or np.isnan(stop[j]):
+                continue
+            px = np.nan
+            if pos[j] > 0.0 and low[t, j] <= stop[j]:
+                px = min(open_[t, j], stop[j])
+            elif pos[j] < 0.0 and high[t, j] >= stop[j]:
+                px = max(open_[t, j], stop[j])
+            if np.isnan(px):
+                continue
+            cash += pos[j] * px - abs(pos[j] * px) * fee_rate
+            pos[j] = 0.0
+            stop[j] = np.nan
+            stopped[j] = True
+            n_fills += 1
+
+        # 4) mark-to-market
+        value = cash
+        for j in range(N):
+            if np.isfinite(close[t, j]):
+                last_close[j] = close[t, j]
+            if pos[j] != 0.0:
+                value += pos[j] * last_close[j]
+        equity[t] = value
+        cash_out[t] = cash
+        pos_out[t, :] = pos
+
+        # 5) drawdown kill switch
+        if value > peak:
+            peak = value
+        if max_drawdown > 0.0 and not halted and peak > 0.0 and (value - peak) / peak <= -max_drawdown:
+            halted = True
+            kill_pending = True
+            killed_at = t
+            order[:] = np.nan
+
+        # 6) targets become next-bar orders
+        if halted:
+            continue
+        for j in range(N):
+            tgt = target[t, j]
+            if np.isnan(tgt):
+                continue
+            if stopped[j]:
+                # after a stop-out stay flat until the target changes
+                if t > 0 and target[t - 1, j] == tgt:
+                    continue
+                stopped[j] = False
+            if tgt == pos[j]:
+                continue
+            order[j] = tgt
+            if limit_offset > 0.0:
+                limit_px[j] = close[t, j] * (1.0 - limit_offset) if tgt > pos[j] else close[t, j] * (1.0 + limit_offset)
+            else:
+                limit_px[j] = np.nan
+
+    return equity, cash_out, pos_out, n_fills, killed_at
+
+
+_bar_loop_jit = njit(cache=True, nogil=True)(_bar_loop) if NUMBA_AVAILABLE else None
+
+
+@dataclass
+class BarKernelResult:
+    equity: np.ndarray       # (T,)
+    cash: np.ndarray         # (T,)
+    positions: np.ndarray    # (T, N) units after each bar
+    n_fills: int
+    killed_at: int           # bar index where the kill switch armed, -1 if never
+    backend: str
+
+
+def resolve_backend(backend: str = "auto") -> str:
+    if backend not in BACKENDS:
+        raise ValueError(f"backend must be one of {BACKENDS}, got {backend!r}")
+    if backend == "numba" and not NUMBA_AVAILABLE:
+        raise ImportError("backend='numba' requested but numba is not installed (pip install numba)")
+    if backend == "auto":
+        return "numba" if NUMBA_AVAILABLE else "python"
+    return backend
+
+
+def _as_2d(a) -> np.ndarray:
+    a = np.asarray(a, dtype=np.float64)
+    return np.ascontiguousarray(a.reshape(-1, 1) if a.ndim == 1 else a)
+
+
+def run_bar_kernel(open_, high, low, close, target, atr=None, *, capital: float = 1_000_000.0,
+                   fee_rate: float = 0.0005, stop_mult: float = 0.0, limit_offset: float = 0.0,
+                   max_drawdown: float = 0.0, backend: str = "auto") -> BarKernelResult:
+    """Run the bar state machine on aligned (T x N) arrays (1-D arrays are treated as one symbol).
+
+    target       -- desired signed units per bar (nan keeps the current position)
+    atr          -- ATR per bar, required for stops (stop_mult > 0)
+    stop_mult    -- stop distance in ATRs from the fill price; 0 disables stops
+    limit_offset -- >0 sends LIMIT orders at close*(1 -/+ offset) instead of MARKET
+    max_drawdown -- equity drawdown (fraction) that flattens the book and halts trading; 0 disables
+    """
+    name = resolve_backend(backend)
+    arrays = [_as_2d(a) for a in (open_, high, low, close, target)]
+    if atr is None:
+        if stop_mult > 0.0:
+            raise ValueError("atr is required when stop_mult > 0")
+        atr = np.full(arrays[3].shape, np.nan)
+    arrays.append(_as_2d(atr))
+    shape = arrays[3].shape
+    if any(a.shape != shape for a in arrays):
+        raise ValueError("open/high/low/close/target/atr must share one (T x N) shape")
+    fn = _bar_loop_jit if name == "numba" else _bar_loop
+    equity, cash, positions, n_fills, killed_at = fn(
+        *arrays, float(capital), float(fee_rate), float(stop_mult), float(limit_offset), float(max_drawdown)
+    )
+    return BarKernelResult(equity, cash, positions, int(n_fills), int(killed_at), name)
+
+
+def run_path_backtest(price_data: Dict[str, pd.DataFrame], targets: pd.DataFrame, atr_lookback: int = 14,
+                      backend: str = "auto", **kernel_kwargs) -> Dict[str, object]:
+    """DataFrame front-end: aligns OHLC on the common dates, computes ATR and runs run_bar_kernel.
+
+    `targets` holds target units with one column per symbol (missing symbols/dates keep positions).
+    """
+    from core.risk.advanced import AdvancedRisk
+
+    symbols = list(price_data.keys())
+    index: Optional[pd.DatetimeIndex] = None
+    for df in price_data.values():
+        index = df.index if index is None else index.intersection(df.index)
+    index = index.sort_values()
+    fields = {f: pd.DataFrame({s: price_data[s][f] for s in symbols}).reindex(index) for f in ("open", "high", "low", "close")}
+    atr = AdvancedRisk.atr_from_panel(fields["high"], fields["low"], fields["close"], lookback=atr_lookback)
+    tgt = targets.reindex(index=index, columns=symbols)
+    res = run_bar_kernel(fields["open"], fields["high"], fields["low"], fields["close"], tgt, atr,
+                         backend=backend, **kernel_kwargs)
+    return {
+        "equity": pd.Series(res.equity, index=index, name="equity"),
+        "cash": pd.Series(res.cash, index=index, name="cash"),
+        "positions": pd.DataFrame(res.positions, index=index, columns=symbols),
+        "n_fills": res.n_fills,
+        "killed_at": index[res.killed_at] if res.killed_at >= 0 else None,
+        "backend": res.backend,
+    }
@@ -0,0 +1,365 @@
+"""Backtest performance benchmarks with scaling curves.
+
+Every case is (engine, bars per symbol, symbols). Datasets come from
+``utils.yf_helpers.synthetic_walk`` seeded per symbol (``seed + j``), and signals
+(fast/slow SMA cross) are precomputed, so only the engine call is timed. Each
+case runs in a fresh interpreter: peak RSS is that process's ``ru_maxrss``
+(``data_rss_mb`` is the high-water mark after the dataset was built).
+
+Engines:
+ - backtest_engine / backtest_engine_array -- core.backtest_engine.BacktestEngine.run
+ - run_vector_backtest                     -- core/backtest/engine_v2.py
+ - backtest_vectorized                     -- core/backtest/engine.py
+ - vectorized_pnl                          -- backtest.vectorized
+ - simulator                               -- backtest.simulator.run_backtest (event bus + VirtualBroker)
+ - autonom_ed                              -- autonom_ed services fed one CleanedDataReady per symbol
+
+Results are appended to a JSON history (one entry per invocation, tagged with the
+git commit) so runs can be compared across commits:
+
+    python run_benchmarks.py --profile default
+    python run_benchmarks.py --engines vectorized_pnl simulator --bars 1000 100000 --symbols 1
+    python run_benchmarks.py --compare
+"""
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import types
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+HISTORY_PATH = os.path.join("runs", "benchmarks", "history.json")
+FAST, SLOW = 10, 30
+
+# (bars per symbol, symbols) grids; total bars = bars x symbols
+PROFILES: Dict[str, Dict[str, Sequence[int]]] = {
+    "smoke": {"bars": (1_000,), "symbols": (1, 10)},
+    "default": {"bars": (1_000, 10_000, 100_000, 1_000_000), "symbols": (1, 10, 100, 500)},
+    "full": {"bars": (1_000, 10_000, 100_000, 1_000_000, 10_000_000), "symbols": (1, 10, 100, 500, 2_000)},
+}
+
+# Largest total bar count each engine is run at by default (event-driven paths are
+# ~1e4-1e5 bars/s); --max-bars overrides it.
+MAX_TOTAL_BARS: Dict[str, int] = {
+    "backtest_engine": 1_000_000,
+    "backtest_engine_array": 10_000_000,
+    "run_vector_backtest": 10_000_000,
+    "backtest_vectorized": 10_000_000,
+    "vectorized_pnl": 10_000_000,
+    "simulator": 200_000,
+    "autonom_ed": 200_000,
+}
+
+
+def synthetic_dataset(n_bars: int, n_symbols: int, seed: int = 42) -> Dict[str, pd.DataFrame]:
+    """{symbol: OHLCV} minute bars on a shared index (daily bars overflow past ~89k rows)."""
+    from utils.yf_helpers import synthetic_walk
+
+    return {f"S{j:04d}": synthetic_walk(f"S{j:04d}", n=n_bars, seed=seed + j, freq="min") for j in range(n_symbols)}
+
+
+def sma_signals(frames: Dict[str, pd.DataFrame]) -> Dict[str, pd.Series]:
+    """+1/-1 fast/slow SMA cross per symbol (0 during warm-up)."""
+    out = {}
+    for sym, df in frames.items():
+        c = df["close"].to_numpy(dtype=float)
+        cs = np.concatenate(([0.0], np.cumsum(c)))
+        sig = np.zeros(len(c))
+        if len(c) >= SLOW:
+            fast = (cs[SLOW:] - cs[SLOW - FAST:-FAST]) / FAST
+            slow = (cs[SLOW:] - cs[:-SLOW]) / SLOW
+            sig[SLOW - 1:] = np.sign(fast - slow)
+        out[sym] = pd.Series(sig, index=df.index)
+    return out
+
+
+def _core_backtest(name: str):
+    # src/core/backtest/ has no __init__ and is shadowed by core/backtest.py; load it under an alias
+    import core
+
+    alias = "core._backtest_pkg"
+    if alias not in sys.modules:
+        pkg = types.ModuleType(alias)
+        pkg.__path__ = [os.path.join(os.path.dirname(core.__file__), "backtest")]
+        sys.modules[alias] = pkg
+    return importlib.import_module(f"{alias}.{name}")
+
+
+# ---------------------- engine runners ----------------------
+# Each takes (frames, signals, dtype_policy) and returns a setup-free callable; building
+# the callable may import and construct, the callable itself is what gets timed.
+
+def _backtest_engine(mode: str):
+    def build(frames, signals, dtype_policy=None):
+        from core.backtest_engine import BacktestEngine, OrderDirection
+
+        engine = BacktestEngine(frames, initial_capital=1_000_000.0, mode=mode, dtype_policy=dtype_policy)
+        for sym, sig in signals.items():
+            s = sig.to_numpy()
+            flips = np.flatnonzero(s[1:] != s[:-1]) + 1
+            for k in flips:
+                if s[k] != 0:
+                    direction = OrderDirection.LONG if s[k] > 0 else OrderDirection.SHORT
+                    engine.submit_order(sym, direction, 10, submission_date=sig.index[k])
+        idx = next(iter(frames.values())).index
+        return lambda: engine.run(idx[0], idx[-1])
+    return build
+
+
+def _run_vector_backtest(frames, signals, dtype_policy=None):
+    run_vector_backtest = _core_backtest("engine_v2").run_vector_backtest
+    return lambda: run_vector_backtest(frames, lambda prices, cfg: signals, cfg={}, capital=1_000_000.0,
+                                       dtype_policy=dtype_policy)
+
+
+def _backtest_vectorized(frames, signals, dtype_policy=None):
+    mod = _core_backtest("engine")
+    costs = mod.TradeCosts(commission=0.0005, slippage_bps=1.0)
+    return lambda: [mod.backtest_vectorized(df, signals[sym], costs) for sym, df in frames.items()]
+
+
+def _vectorized_pnl(frames, signals, dtype_policy=None):
+    from backtest.vectorized import vectorized_pnl
+
+    return lambda: [vectorized_pnl(df, signals[sym]) for sym, df in frames.items()]
+
+
+def _simulator(frames, signals, dtype_policy=None):
+    from backtest.simulator import run_backtest
+
+    return lambda: [run_backtest(df) for df in frames.values()]
+
+
+def _autonom_ed(frames, signals, dtype_policy=None):
+    from autonom_ed.core.bus.event_bus import event_bus
+    from autonom_ed.core.events.backtest_events import BacktestRequested
+    from autonom_ed.core.events.data_events import CleanedDataReady
+    from autonom_ed.services.backtest_service import BacktestingService
+    from autonom_ed.services.execution_service import ExecutionService
+    from autonom_ed.services.feature_service import FeatureService
+    from autonom_ed.services.portfolio_service import PortfolioService
+    from autonom_ed.services.risk_service import RiskService
+    from autonom_ed.services.strategy_service import StrategyService
+
+    FeatureService(ma_fast=FAST, ma_slow=SLOW)
+    StrategyService("sma_crossover", {"ma_fast": FAST, "ma_slow": SLOW})
+    RiskService()
+    ExecutionService()
+    PortfolioService(starting_equity=1_000_000.0)
+    backtester = BacktestingService()
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+
+    def run():
+        for sym, df in frames.items():
+            # skip the fetch leg (DataService hits the network); replay straight from the cleaned frame
+            backtester.pending = BacktestRequested(source="benchmark", timestamp=now, symbol=sym, start=str(df.index[0]),
+                                                   end=str(df.index[-1]), interval="1m", strategy_name="sma_crossover")
+            event_bus.publish(CleanedDataReady(source="benchmark", timestamp=now, symbol=sym, df=df))
+    return run
+
+
+ENGINES: Dict[str, Callable] = {
+    "backtest_engine": _backtest_engine("pandas"),
+    "backtest_engine_array": _backtest_engine("array"),
+    "run_vector_backtest": _run_vector_backtest,
+    "backtest_vectorized": _backtest_vectorized,
+    "vectorized_pnl": _vectorized_pnl,
+    "simulator": _simulator,
+    "autonom_ed": _autonom_ed,
+}
+
+
+# ---------------------- measurement ----------------------
+def _peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024  # bytes on macOS, KiB on Linux
+
+
+def run_case(engine: str, n_bars: int, n_symbols: int, seed: int = 42, repeat: int = 1,
+             dtype_policy: Optional[str] = None) -> Dict[str, Any]:
+    """Time one case in this process; ``wall_s`` is the best of ``repeat`` calls.
+
+    With ``dtype_policy`` (e.g. "compact") the datasets are cast by ``data_layer.dtypes``
+    and the policy is passed to the engines that take one.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {sorted(ENGINES)}, got {engine!r}")
+    result: Dict[str, Any] = {"engine": engine, "bars": int(n_bars), "symbols": int(n_symbols),
+                              "total_bars": int(n_bars) * int(n_symbols), "dtype_policy": dtype_policy or "float64"}
+    t0 = time.perf_counter()
+    frames = synthetic_dataset(n_bars, n_symbols, seed)
+    signals = sma_signals(frames)
+    if dtype_policy is not None:
+        from data_layer.dtypes import apply_dtype_policy
+
+        frames = {sym: apply_dtype_policy(df, dtype_policy) for sym, df in frames.items()}
+    result["data_s"] = time.perf_counter() - t0
+    result["data_rss_mb"] = _peak_rss_mb()
+    try:
+        fn = ENGINES[engine](frames, signals, dtype_policy)
+    except ImportError as e:
+        result.update(status="skipped", error=f"{type(e).__name__}: {e}")
+        return result
+    walls = []
+    for _ in range(max(1, int(repeat))):
+        t0 = time.perf_counter()
+        fn()
+        walls.append(time.perf_counter() - t0)
+    wall = min(walls)
+    result.update(status="ok", wall_s=wall, bars_per_s=result["total_bars"] / wall if wall > 0 else float("inf"),
+                  peak_rss_mb=_peak_rss_mb())
+    return result
+
+
+def _run_isolated(engine: str, n_bars: int, n_symbols: int, seed: int, repeat: int, timeout: Optional[float],
+                  dtype_policy: Optional[str] = None) -> Dict[str, Any]:
+    here = os.path.dirname(os.path.abspath(__file__))
+    src = os.path.dirname(here)
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (src, os.path.dirname(src), env.get("PYTHONPATH")) if p)
+    cmd = [sys.executable, "-m", "backtest.benchmarks", "--child", engine, str(n_bars), str(n_symbols),
+           "--seed", str(seed), "--repeat", str(repeat)] + (["--dtype-policy", dtype_policy] if dtype_policy else [])
+    base = {"engine": engine, "bars": int(n_bars), "symbols": int(n_symbols), "total_bars": int(n_bars) * int(n_symbols),
+            "dtype_policy": dtype_policy or "float64"}
+    try:
+        r = subprocess.run(cmd, capture_output=True, text=True, env=env, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {**base, "status": "timeout", "error": f"exceeded {timeout}s"}
+    lines = [ln for ln in r.stdout.splitlines() if ln.startswith("{")]
+    if r.returncode != 0 or not lines:
+        tail = (r.stderr.strip().splitlines() or ["no output"])[-1]
+        return {**base, "status": "error", "error": tail}
+    return json.loads(lines[-1])
+
+
+def plan(engines: Sequence[str], bars: Sequence[int], symbols: Sequence[int], max_bars: Optional[int] = None) -> List[tuple]:
+    """Scaling curves: bars at the smallest symbol count, symbols at the smallest bar count, capped per engine."""
+    cases = []
+    b0, s0 = min(bars), min(symbols)
+    grid = sorted({(b, s0) for b in bars} | {(b0, s) for s in symbols}, key=lambda c: (c[0] * c[1], c))
+    for engine in engines:
+        cap = max_bars if max_bars is not None else MAX_TOTAL_BARS.get(engine, 10_000_000)
+        cases += [(engine, b, s) for b, s in grid if b * s <= cap]
+    return cases
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        r = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10)
+        return r.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def load_history(path: str = HISTORY_PATH) -> List[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def append_history(entry: Dict[str, Any], path: str = HISTORY_PATH) -> None:
+    history = load_history(path)
+    history.append(entry)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(history, fh, indent=1)
+    os.replace(tmp, path)
+
+
+def compare(history: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Latest run vs the most recent earlier run of each case (ratio > 1 means slower)."""
+    if not history:
+        return pd.DataFrame()
+    latest, earlier = history[-1], history[:-1]
+    rows = []
+    for res in latest["results"]:
+        if res.get("status") != "ok":
+            continue
+        key = (res["engine"], res["bars"], res["symbols"], res.get("dtype_policy", "float64"))
+        prev = next((r for e in reversed(earlier) for r in e["results"] if r.get("status") == "ok"
+                     and (r["engine"], r["bars"], r["symbols"], r.get("dtype_policy", "float64")) == key), None)
+        rows.append({"engine": key[0], "bars": key[1], "symbols": key[2], "dtype_policy": key[3], "wall_s": res["wall_s"],
+                     "prev_wall_s": prev["wall_s"] if prev else np.nan,
+                     "ratio": res["wall_s"] / prev["wall_s"] if prev else np.nan,
+                     "peak_rss_mb": res["peak_rss_mb"], "prev_peak_rss_mb": prev["peak_rss_mb"] if prev else np.nan})
+    return pd.DataFrame(rows)
+
+
+def run_suite(engines: Sequence[str], bars: Sequence[int], symbols: Sequence[int], max_bars: Optional[int] = None,
+              seed: int = 42, repeat: int = 1, timeout: Optional[float] = None, history: Optional[str] = HISTORY_PATH,
+              label: str = "", echo: bool = True, dtype_policy: Optional[str] = None) -> Dict[str, Any]:
+    unknown = sorted(set(engines) - set(ENGINES))
+    if unknown:
+        raise ValueError(f"unknown engines {unknown}; choose from {sorted(ENGINES)}")
+    entry: Dict[str, Any] = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "label": label,
+        "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(),
+                    "numpy": np.__version__, "pandas": pd.__version__},
+        "seed": seed,
+        "repeat": repeat,
+        "results": [],
+    }
+    for engine, b, s in plan(engines, bars, symbols, max_bars):
+        res = _run_isolated(engine, b, s, seed, repeat, timeout, dtype_policy)
+        entry["results"].append(res)
+        if echo:
+            if res["status"] == "ok":
+                print(f"{engine:22s} bars={b:>10,d} symbols={s:>5d}  {res['wall_s']:9.3f}s  "
+                      f"{res['bars_per_s']:>14,.0f} bars/s  peak {res['peak_rss_mb']:8.1f} MB")
+            else:
+                print(f"{engine:22s} bars={b:>10,d} symbols={s:>5d}  {res['status']}: {res.get('error', '')}")
+    if history:
+        append_history(entry, history)
+    return entry
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Backtest engine benchmarks (wall time, bars/s, peak RSS)")
+    p.add_argument("--child", nargs=3, metavar=("ENGINE", "BARS", "SYMBOLS"), help=argparse.SUPPRESS)
+    p.add_argument("--profile", choices=sorted(PROFILES), default="default")
+    p.add_argument("--engines", nargs="+", default=list(ENGINES), choices=sorted(ENGINES))
+    p.add_argument("--bars", nargs="+", type=int, help="bars per symbol (overrides the profile)")
+    p.add_argument("--symbols", nargs="+", type=int, help="symbol counts (overrides the profile)")
+    p.add_argument("--max-bars", type=int, help="cap on bars x symbols for every engine (default: per-engine caps)")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--repeat", type=int, default=1, help="timed calls per case; the best is recorded")
+    p.add_argument("--timeout", type=float, help="seconds per case")
+    p.add_argument("--history", default=HISTORY_PATH, help="JSON history file ('' to not record)")
+    p.add_argument("--label", default="")
+    p.add_argument("--dtype-policy", choices=("float64", "compact"), help="cast datasets/panels (data_layer.dtypes)")
+    p.add_argument("--compare", action="store_true", help="print the latest run against earlier runs and exit")
+    args = p.parse_args(argv)
+
+    if args.child:
+        engine, b, s = args.child
+        print(json.dumps(run_case(engine, int(b), int(s), seed=args.seed, repeat=args.repeat, dtype_policy=args.dtype_policy)))
+        return 0
+    if args.compare:
+        table = compare(load_history(args.history))
+        print(table.to_string(index=False) if not table.empty else "no comparable runs")
+        return 0
+    prof = PROFILES[args.profile]
+    entry = run_suite(args.engines, args.bars or prof["bars"], args.symbols or prof["symbols"], args.max_bars,
+                      args.seed, args.repeat, args.timeout, args.history or None, args.label,
+                      dtype_policy=args.dtype_policy)
+    failed = [r for r in entry["results"] if r["status"] in ("error", "timeout")]
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
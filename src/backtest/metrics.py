@@ -12,3 +12,22 @@ def summarize(equity: pd.Series, trades: pd.DataFrame, freq: str = "D"):
     total_ret = float(equity.iloc[-1]/equity.iloc[0]-1.0) if equity.iloc[0] != 0 else 0.0
     maxdd = float((equity / equity.cummax() - 1.0).min())
     return {"total_return": round(total_ret,4), "sharpe": round(sharpe,3), "maxdd": round(maxdd,4)}
+
+def summarize_batch(equity: pd.DataFrame) -> pd.DataFrame:
+    """summarize() for every column of a (T x K) equity frame in one array pass (one row per column)."""
+    cols = ["total_return", "sharpe", "maxdd"]
+    if len(equity) == 0:
+        return pd.DataFrame(0.0, index=equity.columns, columns=cols)
+    eq = equity.to_numpy(dtype=float)
+    rets = np.zeros_like(eq)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rets[1:] = eq[1:] / eq[:-1] - 1.0
+        rets = np.where(np.isnan(rets), 0.0, rets)
+        mean = rets.mean(axis=0)
+        std = rets.std(axis=0, ddof=1) if len(eq) > 1 else np.full(eq.shape[1], np.nan)
+        sharpe = np.where(std > 0, mean / std * np.sqrt(252), 0.0)
+        total_ret = np.where(eq[0] != 0, eq[-1] / eq[0] - 1.0, 0.0)
+        maxdd = np.nanmin(eq / np.fmax.accumulate(eq, axis=0) - 1.0, axis=0)
+    out = pd.DataFrame({"total_return": total_ret.round(4), "sharpe": sharpe.round(3), "maxdd": maxdd.round(4)},
+                       index=equity.columns)
+    return out
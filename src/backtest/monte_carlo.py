@@ -1,16 +1,174 @@
 
+"""Bootstrap Monte Carlo of equity paths.
+
+Paths are generated as one (path_len x n_paths) index matrix into the return
+sample, so no Python loop runs per path:
+ - "iid"        -- independent draws (the original behaviour)
+ - "circular"   -- fixed-length blocks starting anywhere, wrapping around the sample
+ - "stationary" -- Politis-Romano: geometric block lengths with mean `block_size`
+
+`run_monte_carlo` processes large path counts in chunks sized to a memory budget
+and keeps only per-path scalars (terminal equity, max drawdown) plus a per-bar
+histogram of equity, from which the quantile bands are read. The histogram range
+is taken from the first chunk (widened by `range_pad` on each side); values
+outside it are clamped into the edge bins and counted in `clamped`.
+"""
 from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
 import numpy as np
 import pandas as pd
 
-def bootstrap_paths(returns: pd.Series, n_paths: int = 500, path_len: int | None = None, seed: int = 42) -> pd.DataFrame:
+METHODS = ("iid", "circular", "stationary")
+DEFAULT_QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+
+def default_block_size(n_obs: int) -> int:
+    """n^(1/3) rule of thumb for the (mean) block length."""
+    return max(1, int(round(n_obs ** (1.0 / 3.0))))
+
+
+def bootstrap_indices(n_obs: int, path_len: int, n_paths: int, method: str = "iid",
+                      block_size: Optional[int] = None, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """(path_len x n_paths) int matrix of positions into a sample of `n_obs` returns."""
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}, got {method!r}")
+    if n_obs < 1:
+        raise ValueError("need at least one return to resample")
+    rng = rng if rng is not None else np.random.default_rng()
+    if method == "iid":
+        # drawn path-major so a seed gives the same paths as the per-path rng.choice loop
+        return rng.integers(0, n_obs, size=(n_paths, path_len)).T
+    block = int(block_size or default_block_size(n_obs))
+    if block < 1:
+        raise ValueError("block_size must be >= 1")
+    if method == "circular":
+        n_blocks = -(-path_len // block)
+        starts = rng.integers(0, n_obs, size=(n_blocks, n_paths))
+        idx = (starts[:, None, :] + np.arange(block)[None, :, None]) % n_obs  # (blocks, offset, paths)
+        return idx.reshape(n_blocks * block, n_paths)[:path_len]
+    # stationary: a new block starts at t with probability 1/block, otherwise continue the current one
+    t = np.arange(path_len)[:, None]
+    new_block = rng.random((path_len, n_paths)) < 1.0 / block
+    new_block[0] = True
+    block_start = np.maximum.accumulate(np.where(new_block, t, 0), axis=0)
+    starts = rng.integers(0, n_obs, size=(path_len, n_paths))
+    return (np.take_along_axis(starts, block_start, axis=0) + (t - block_start)) % n_obs
+
+
+def bootstrap_paths(returns: pd.Series, n_paths: int = 500, path_len: int | None = None, seed: int = 42,
+                    method: str = "iid", block_size: Optional[int] = None) -> pd.DataFrame:
     rng = np.random.default_rng(seed)
     r = returns.dropna().to_numpy()
     if path_len is None:
         path_len = len(r)
-    paths = []
-    for _ in range(n_paths):
-        boot = rng.choice(r, size=path_len, replace=True)
-        equity = (1.0 + pd.Series(boot)).cumprod()
-        paths.append(equity.values)
-    return pd.DataFrame(paths).T  # time x n_paths
+    idx = bootstrap_indices(len(r), path_len, n_paths, method, block_size, rng)
+    return pd.DataFrame(np.cumprod(1.0 + r[idx], axis=0))  # time x n_paths
+
+
+@dataclass
+class MonteCarloResult:
+    bands: pd.DataFrame          # (path_len x quantiles) equity quantile bands
+    terminal: np.ndarray         # (n_paths,) final equity of every path
+    max_drawdown: np.ndarray     # (n_paths,) max drawdown of every path (<= 0)
+    method: str
+    block_size: int
+    n_paths: int
+    chunk_size: int
+    clamped: int                 # values that fell outside the histogram range
+
+    def drawdown_quantiles(self, quantiles: Sequence[float] = DEFAULT_QUANTILES) -> pd.Series:
+        return pd.Series(np.quantile(self.max_drawdown, quantiles), index=list(quantiles), name="max_drawdown")
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "n_paths": float(self.n_paths),
+            "terminal_median": float(np.median(self.terminal)),
+            "terminal_p05": float(np.quantile(self.terminal, 0.05)),
+            "terminal_p95": float(np.quantile(self.terminal, 0.95)),
+            "prob_loss": float(np.mean(self.terminal < 1.0)),
+            "max_drawdown_median": float(np.median(self.max_drawdown)),
+            "max_drawdown_p05": float(np.quantile(self.max_drawdown, 0.05)),
+        }
+
+
+def _chunk_paths(path_len: int, memory_budget_mb: float) -> int:
+    # index matrix + returns + equity + running peak + bin index, all 8 bytes per cell
+    per_path = path_len * 8 * 5
+    return max(1, int(memory_budget_mb * 1024 * 1024 // per_path))
+
+
+def _band_quantiles(counts: np.ndarray, lo: np.ndarray, width: np.ndarray, total: int,
+                    quantiles: Sequence[float]) -> np.ndarray:
+    """Per-row quantiles from (path_len x n_bins) histograms, interpolating inside a bin."""
+    cum = np.cumsum(counts, axis=1)
+    out = np.empty((counts.shape[0], len(quantiles)))
+    rows = np.arange(counts.shape[0])
+    for k, q in enumerate(quantiles):
+        target = q * total
+        b = np.minimum((cum < target).sum(axis=1), counts.shape[1] - 1)
+        below = np.where(b > 0, cum[rows, np.maximum(b - 1, 0)], 0)
+        inside = counts[rows, b]
+        frac = np.where(inside > 0, (target - below) / np.maximum(inside, 1), 0.5)
+        out[:, k] = lo + (b + np.clip(frac, 0.0, 1.0)) * width
+    return out
+
+
+def run_monte_carlo(returns: pd.Series, n_paths: int = 100_000, path_len: Optional[int] = None,
+                    method: str = "stationary", block_size: Optional[int] = None,
+                    quantiles: Sequence[float] = DEFAULT_QUANTILES, seed: int = 42,
+                    memory_budget_mb: float = 256.0, n_bins: int = 2048, range_pad: float = 0.25) -> MonteCarloResult:
+    """Bootstrap `n_paths` equity paths (start 1.0) in memory-bounded chunks.
+
+    Returns quantile bands per bar plus the terminal-equity and max-drawdown
+    distributions; individual paths are never kept. Results are reproducible for
+    a given seed and memory budget (the budget fixes the chunk size).
+    """
+    r = returns.dropna().to_numpy(dtype=float)
+    if path_len is None:
+        path_len = len(r)
+    if path_len < 1 or n_paths < 1:
+        raise ValueError("path_len and n_paths must be >= 1")
+    block = int(block_size or default_block_size(len(r)))
+    rng = np.random.default_rng(seed)
+    chunk = min(n_paths, _chunk_paths(path_len, memory_budget_mb))
+    quantiles = tuple(float(q) for q in quantiles)
+
+    terminal = np.empty(n_paths)
+    max_dd = np.empty(n_paths)
+    counts = np.zeros(path_len * n_bins, dtype=np.int64)
+    rows = (np.arange(path_len) * n_bins)[:, None]
+    lo = width = None
+    clamped = 0
+    for start in range(0, n_paths, chunk):
+        m = min(chunk, n_paths - start)
+        equity = np.cumprod(1.0 + r[bootstrap_indices(len(r), path_len, m, method, block, rng)], axis=0)
+        peak = np.maximum.accumulate(equity, axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            max_dd[start:start + m] = np.nanmin(np.where(peak > 0, equity / peak - 1.0, np.nan), axis=0)
+        del peak
+        terminal[start:start + m] = equity[-1]
+        if lo is None:
+            # histogram range per bar from the first chunk, padded for the tails of later chunks
+            mn, mx = equity.min(axis=1), equity.max(axis=1)
+            pad = np.maximum((mx - mn) * range_pad, 1e-12 * np.maximum(np.abs(mx), 1.0))
+            lo = mn - pad
+            width = (mx + pad - lo) / n_bins
+        pos = np.floor((equity - lo[:, None]) / width[:, None])
+        clamped += int(np.count_nonzero((pos < 0) | (pos >= n_bins)))
+        counts += np.bincount((rows + np.clip(pos, 0, n_bins - 1).astype(np.int64)).ravel(), minlength=path_len * n_bins)
+    max_dd = np.nan_to_num(max_dd, nan=0.0)
+
+    bands = _band_quantiles(counts.reshape(path_len, n_bins), lo, width, n_paths, quantiles)
+    return MonteCarloResult(
+        bands=pd.DataFrame(bands, columns=list(quantiles)),
+        terminal=terminal,
+        max_drawdown=max_dd,
+        method=method,
+        block_size=block if method != "iid" else 1,
+        n_paths=int(n_paths),
+        chunk_size=int(chunk),
+        clamped=clamped,
+    )
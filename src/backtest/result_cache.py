@@ -0,0 +1,200 @@
+"""Content-addressed cache for backtest results.
+
+The key is a sha256 over everything that determines a result:
+ - the input data (index + OHLCV values, hashed like config/golden_data_hash.json)
+ - the strategy class and its parameters
+ - the commission/slippage (or other execution) model configuration
+ - the engine name and ENGINE_VERSION, plus any run settings (splits, test size, ...)
+
+Results are pickled to a local directory; the cache is size-bounded and evicts
+least-recently-used entries (a hit refreshes the file's mtime). Callers record
+``"hit"``/``"miss"`` in their run metadata.
+
+    cache = ResultCache.default()
+    key = result_key(data, strategy, engine="wf_engine", settings={"n_splits": 5})
+    report, status = cache.get_or_compute(key, lambda: engine.run(strategy, data))
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Bump when engine/metric logic changes so stale results are never served.
+ENGINE_VERSION = "2.9.14"
+DEFAULT_DIR = os.environ.get("BACKTEST_CACHE_DIR", os.path.join("runs", "cache"))
+DEFAULT_MAX_BYTES = int(os.environ.get("BACKTEST_CACHE_MAX_MB", "512")) * 1024 * 1024
+_OHLCV = ["open", "high", "low", "close", "volume"]
+_PRIMITIVES = (str, int, float, bool, type(None))
+
+
+def data_hash(data: Any) -> str:
+    """sha256 of a DataFrame (index + OHLCV, or all columns if not OHLCV) or a {symbol: DataFrame} dict."""
+    h = hashlib.sha256()
+    frames = data if isinstance(data, dict) else {"": data}
+    for sym in sorted(frames):
+        df = frames[sym]
+        cols = _OHLCV if set(_OHLCV) <= set(df.columns) else list(df.columns)
+        h.update(str(sym).encode("utf-8"))
+        h.update(",".join(map(str, cols)).encode("utf-8"))
+        h.update(np.asarray(df.index.astype("int64") if isinstance(df.index, pd.DatetimeIndex) else df.index.to_numpy()).tobytes())
+        h.update(np.ascontiguousarray(df[cols].to_numpy(dtype=float)).tobytes())
+    return h.hexdigest()
+
+
+def describe(obj: Any, depth: int = 2) -> Any:
+    """JSON-able configuration of a strategy/cost model: class name + public primitive attributes."""
+    if isinstance(obj, _PRIMITIVES):
+        return obj
+    if isinstance(obj, (list, tuple)):
+        return [describe(v, depth) for v in obj]
+    if isinstance(obj, dict):
+        return {str(k): describe(v, depth) for k, v in sorted(obj.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(obj, type):
+        return f"{obj.__module__}.{obj.__qualname__}"
+    out: Dict[str, Any] = {"__class__": f"{type(obj).__module__}.{type(obj).__qualname__}"}
+    if hasattr(obj, "get_params"):
+        try:
+            out["params"] = describe(obj.get_params(), depth)
+            return out
+        except Exception:
+            pass
+    if depth > 0 and hasattr(obj, "__dict__"):
+        for k, v in sorted(vars(obj).items()):
+            if k.startswith("_"):
+                continue
+            if isinstance(v, _PRIMITIVES + (list, tuple, dict)):
+                out[k] = describe(v, depth - 1)
+            elif hasattr(v, "__dict__") and not isinstance(v, (pd.DataFrame, pd.Series, np.ndarray)):
+                out[k] = describe(v, depth - 1)
+    return out
+
+
+def result_key(data: Any, strategy: Any, costs: Any = None, engine: str = "", settings: Optional[Dict[str, Any]] = None,
+               engine_version: str = ENGINE_VERSION) -> str:
+    payload = {
+        "data": data_hash(data),
+        "strategy": describe(strategy),
+        "costs": describe(costs),
+        "engine": engine,
+        "engine_version": engine_version,
+        "settings": describe(settings or {}),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """Disk-backed, size-bounded LRU of pickled results (one file per key)."""
+
+    _default: Optional["ResultCache"] = None
+
+    def __init__(self, directory: str = DEFAULT_DIR, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.directory = directory
+        self.max_bytes = int(max_bytes)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def default(cls) -> "ResultCache":
+        """Process-wide cache in BACKTEST_CACHE_DIR (default runs/cache)."""
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as fh:
+                value = pickle.load(fh)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return False, None
+        except Exception as e:  # truncated/incompatible entry: drop it and recompute
+            logger.warning(f"Dropping unreadable cache entry {path}: {e}")
+            self._remove(path)
+            with self._lock:
+                self.misses += 1
+            return False, None
+        try:
+            os.utime(path)  # LRU: a hit makes the entry most recent
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return True, value
+
+    def put(self, key: str, value: Any) -> None:
+        fd, tmp = tempfile.mkstemp(prefix=key[:16] + ".", suffix=".tmp", dir=self.directory)
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                pickle.dump(value, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._path(key))
+        except Exception as e:
+            self._remove(tmp)
+            logger.warning(f"Result not cached ({key[:12]}): {e}")
+            return
+        self._evict()
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Tuple[Any, str]:
+        """(result, "hit" | "miss"); a miss computes and stores the result."""
+        found, value = self.get(key)
+        if found:
+            return value, "hit"
+        value = compute()
+        self.put(key, value)
+        return value, "miss"
+
+    def stats(self) -> Dict[str, Any]:
+        entries = self._entries()
+        return {"hits": self.hits, "misses": self.misses, "entries": len(entries),
+                "bytes": sum(size for _, size, _ in entries), "max_bytes": self.max_bytes}
+
+    def clear(self) -> None:
+        for path, _, _ in self._entries():
+            self._remove(path)
+
+    def _entries(self):
+        out = []
+        with os.scandir(self.directory) as it:
+            for e in it:
+                if e.name.endswith(".pkl"):
+                    try:
+                        st = e.stat()
+                    except FileNotFoundError:
+                        continue
+                    out.append((e.path, st.st_size, st.st_mtime_ns))
+        return out
+
+    def _evict(self) -> None:
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        for path, size, _ in sorted(entries, key=lambda e: e[2]):
+            self._remove(path)
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -11,3 +11,40 @@ def vectorized_pnl(df: pd.DataFrame, signals: pd.Series, commission=0.0005, slip
     ret -= trades * commission
     equity = (1 + ret).cumprod()
     return equity, ret
+
+
+def _shift1(a: np.ndarray) -> np.ndarray:
+    out = np.zeros_like(a)
+    out[1:] = a[:-1]
+    return out
+
+
+def _ffill(a: np.ndarray) -> np.ndarray:
+    """Forward-fill NaNs down each column (leading NaNs stay), like pct_change's default pad."""
+    rows = np.where(np.isnan(a), 0, np.arange(len(a))[:, None])
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    return a[rows, np.arange(a.shape[1])]
+
+
+def vectorized_pnl_batch(df: pd.DataFrame, signals: pd.DataFrame, commission=0.0005, slippage=0.0002):
+    """vectorized_pnl over a (T x K) signal matrix, one column per parameter set / strategy.
+
+    Returns (equity, ret, metrics): equity/ret are (T x K) frames with the signal columns,
+    metrics is a per-column table from backtest.metrics.summarize_batch.
+    """
+    from .metrics import summarize_batch
+
+    sig = signals.reindex(df.index).fillna(0.0).to_numpy(dtype=float)
+    prev = _shift1(sig)
+    exec_price = _ffill(df['open'].to_numpy(dtype=float)[:, None] * (1 + slippage * np.sign(prev)))
+    ret = np.zeros_like(exec_price)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ret[1:] = exec_price[1:] / exec_price[:-1] - 1.0
+    ret = np.nan_to_num(ret, nan=0.0, posinf=np.inf, neginf=-np.inf) * prev
+    trades = np.abs(sig - _shift1(sig))
+    trades[0] = 0.0
+    ret -= trades * commission
+    equity = np.cumprod(1 + ret, axis=0)
+    equity = pd.DataFrame(equity, index=df.index, columns=signals.columns)
+    ret = pd.DataFrame(ret, index=df.index, columns=signals.columns)
+    return equity, ret, summarize_batch(equity)
@@ -1,8 +1,15 @@
+import copy
 import pandas as pd
 from dataclasses import dataclass, field
-from typing import Callable, Dict, Any, List
+from typing import Callable, Dict, Any, List, Optional
 from sklearn.model_selection import TimeSeriesSplit
 
+from .parallel import map_folds, fold_data
+from .result_cache import ResultCache, result_key
+try:
+    from data_layer.shared_panel import as_frame, resolve_single_frame
+except ImportError:  # imported as src.backtest
+    from ..data_layer.shared_panel import as_frame, resolve_single_frame  # type: ignore
 from .risk_execution_adapter import RiskExecutionAdapter
 from ..utils.metrics import sharpe, max_drawdown, win_rate, turnover
 
@@ -14,6 +21,7 @@ class FoldResult:
 class WFReport:
     strategy: str
     folds: List[FoldResult] = field(default_factory=list)
+    metadata: Dict[str, Any] = field(default_factory=dict)
 
     def aggregate(self) -> Dict[str, float]:
         if not self.folds: return {"sharpe":0.0,"max_dd":0.0,"win_rate":0.0,"turnover":0.0}
@@ -26,36 +34,71 @@ class WFReport:
                 agg[k] = float(pd.Series(vals).mean())
         return agg
 
+def _run_wf_fold(adapter: RiskExecutionAdapter, strategy, df_train: pd.DataFrame, df_test: pd.DataFrame) -> FoldResult:
+    df_train, df_test = as_frame(df_train), as_frame(df_test)
+    if hasattr(strategy, "fit"):
+        try:
+            strategy.fit(df_train)
+        except Exception:
+            # keep going even if fit isn't implemented
+            pass
+    res = adapter.run(df_test, strategy)
+    eq = getattr(res, "equity_curve", (1 + df_test["close"].pct_change().fillna(0)).cumprod())
+    pos = getattr(res, "positions", None)
+    r = eq.pct_change().fillna(0.0)
+
+    fold_metrics = {
+        "sharpe": sharpe(eq),
+        "max_dd": max_drawdown(eq),
+        "win_rate": win_rate(r),
+        "turnover": turnover(pos) if pos is not None else 0.0
+    }
+    return FoldResult(metrics=fold_metrics)
+
 class WalkForwardEngine:
-    def __init__(self, n_splits: int = 5, test_size: int = 63):
-        self.n_splits = n_splits; self.test_size = test_size
+    """Walk-forward over TimeSeriesSplit folds.
 
-    def run(self, strategy, data: pd.DataFrame) -> WFReport:
-        tscv = TimeSeriesSplit(n_splits=self.n_splits, test_size=self.test_size)
-        report = WFReport(getattr(strategy, "name", strategy.__class__.__name__))
+    executor="thread"/"process" fits and tests folds concurrently on `max_workers`
+    workers (each fold gets its own copy of the strategy); `seed` gives every fold a
+    deterministic RNG seed. Fold results are merged in fold order. `data` may be a
+    DataFrame or a shared panel / handle (pick the column set with `symbol`).
+
+    With a `cache` (backtest.result_cache.ResultCache), reports are keyed by data,
+    strategy class/params, execution adapter config, splits and engine version;
+    report.metadata["cache"] is "hit" or "miss". A hit does not fit the strategy.
+    """
+    def __init__(self, n_splits: int = 5, test_size: int = 63, executor: str = "serial",
+                 max_workers: Optional[int] = None, seed: Optional[int] = None,
+                 cache: Optional[ResultCache] = None):
+        self.n_splits = n_splits; self.test_size = test_size
+        self.executor = executor; self.max_workers = max_workers; self.seed = seed
+        self.cache = cache
 
+    def run(self, strategy, data, symbol: Optional[str] = None) -> WFReport:
+        data, panel, symbol = resolve_single_frame(data, symbol)
         # Single-asset path; multi-asset support can be plugged in by passing dict to RiskExecutionAdapter
         adapter = RiskExecutionAdapter(primary_symbol="ASSET")
+        if self.cache is None:
+            return self._run(adapter, strategy, data, panel, symbol)
+        key = result_key(data, strategy, costs=adapter, engine="backtest.wf_engine.WalkForwardEngine",
+                         settings={"n_splits": self.n_splits, "test_size": self.test_size, "seed": self.seed})
+        report, status = self.cache.get_or_compute(key, lambda: self._run(adapter, strategy, data, panel, symbol))
+        report.metadata.update({"cache": status, "cache_key": key})
+        return report
+
+    def _run(self, adapter: RiskExecutionAdapter, strategy, data: pd.DataFrame, panel, symbol) -> WFReport:
+        tscv = TimeSeriesSplit(n_splits=self.n_splits, test_size=self.test_size)
+        report = WFReport(getattr(strategy, "name", strategy.__class__.__name__))
 
-        for fold, (tr_idx, te_idx) in enumerate(tscv.split(data)):
-            df_train = data.iloc[tr_idx]
-            df_test  = data.iloc[te_idx]
-            if hasattr(strategy, "fit"):
-                try:
-                    strategy.fit(df_train)
-                except Exception:
-                    # keep going even if fit isn't implemented
-                    pass
-            res = adapter.run(df_test, strategy)
-            eq = getattr(res, "equity_curve", (1 + df_test["close"].pct_change().fillna(0)).cumprod())
-            pos = getattr(res, "positions", None)
-            r = eq.pct_change().fillna(0.0)
-
-            fold_metrics = {
-                "sharpe": sharpe(eq),
-                "max_dd": max_drawdown(eq),
-                "win_rate": win_rate(r),
-                "turnover": turnover(pos) if pos is not None else 0.0
-            }
-            report.folds.append(FoldResult(metrics=fold_metrics))
+        fold_args = []
+        for tr_idx, te_idx in tscv.split(data):
+            # serial keeps using the caller's objects in place; workers get independent copies
+            if self.executor == "serial":
+                fold_args.append((adapter, strategy, data.iloc[tr_idx], data.iloc[te_idx]))
+            else:
+                fold_args.append((copy.deepcopy(adapter), copy.deepcopy(strategy),
+                                  fold_data(data, tr_idx, panel, symbol, self.executor),
+                                  fold_data(data, te_idx, panel, symbol, self.executor)))
+        report.folds.extend(map_folds(_run_wf_fold, fold_args, executor=self.executor,
+                                      max_workers=self.max_workers, seed=self.seed))
         return report
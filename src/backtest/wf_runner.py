@@ -1,8 +1,15 @@
+import copy
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional
 import numpy as np, pandas as pd
 from sklearn.model_selection import TimeSeriesSplit
 
+from .parallel import map_folds, fold_data
+try:
+    from data_layer.shared_panel import as_frame, resolve_single_frame
+except ImportError:  # imported as src.backtest
+    from ..data_layer.shared_panel import as_frame, resolve_single_frame  # type: ignore
+
 try:
     # Expecting an engine in src/backtest/engine.py
     from .engine import BacktestEngine
@@ -49,28 +56,42 @@ def _max_dd(res) -> float:
 
 WF_METRICS = {"sharpe": _sharpe, "max_dd": _max_dd}
 
+def _run_adapter_fold(engine, metrics, strategy, fold: int, train_df: pd.DataFrame, test_df: pd.DataFrame) -> FoldReport:
+    train_df, test_df = as_frame(train_df), as_frame(test_df)
+    if hasattr(strategy, "fit"):
+        strategy.fit(train_df)
+
+    fold_bt = engine.run(data=test_df, strategy=strategy)
+
+    fold_metrics = {name: fn(fold_bt) for name, fn in metrics.items()}
+    fold_metrics["turnover"] = WalkForwardAdapter._calc_turnover(getattr(fold_bt, "positions", None))
+    return FoldReport(fold=fold, metrics=fold_metrics)
+
 class WalkForwardAdapter:
-    def __init__(self, backtest_engine: Optional[BacktestEngine] = None, metrics=WF_METRICS):
+    """executor="thread"/"process" runs folds on `max_workers` workers with per-fold seeds
+    derived from `seed`; results are merged in fold order. `run` also accepts a shared
+    panel / handle as `data`."""
+    def __init__(self, backtest_engine: Optional[BacktestEngine] = None, metrics=WF_METRICS,
+                 executor: str = "serial", max_workers: Optional[int] = None, seed: Optional[int] = None):
         self.engine = backtest_engine or BacktestEngine()
         self.metrics = metrics
+        self.executor = executor
+        self.max_workers = max_workers
+        self.seed = seed
 
-    def run(self, data: pd.DataFrame, strategy, n_splits=5, test_size=63, gap: int = 1) -> WFResults:
+    def run(self, data, strategy, n_splits=5, test_size=63, gap: int = 1, symbol: Optional[str] = None) -> WFResults:
+        data, panel, symbol = resolve_single_frame(data, symbol)
         results = WFResults()
         tscv = TimeSeriesSplit(n_splits=n_splits, test_size=test_size, gap=gap)
 
+        fold_args = []
         for fold, (train_idx, test_idx) in enumerate(tscv.split(data)):
-            train_df = data.iloc[train_idx]
-            test_df  = data.iloc[test_idx]
-
-            if hasattr(strategy, "fit"):
-                strategy.fit(train_df)
-
-            fold_bt = self.engine.run(data=test_df, strategy=strategy)
-
-            fold_metrics = {name: fn(fold_bt) for name, fn in self.metrics.items()}
-            fold_metrics["turnover"] = self._calc_turnover(getattr(fold_bt, "positions", None))
-            results.folds.append(FoldReport(fold=fold, metrics=fold_metrics))
-
+            strat = strategy if self.executor == "serial" else copy.deepcopy(strategy)
+            fold_args.append((self.engine, self.metrics, strat, fold,
+                              fold_data(data, train_idx, panel, symbol, self.executor),
+                              fold_data(data, test_idx, panel, symbol, self.executor)))
+        results.folds.extend(map_folds(_run_adapter_fold, fold_args, executor=self.executor,
+                                       max_workers=self.max_workers, seed=self.seed))
         return results
 
     @staticmethod
@@ -1,12 +1,13 @@
 from __future__ import annotations
 import pandas as pd
 import numpy as np
-from typing import Dict
+from typing import Any, Dict, List, Optional
 from enum import Enum, auto
 
 # Try to import production BacktestEngine
 try:
     from core.backtest_engine import BacktestEngine, OrderType, OrderDirection, PercentageCommissionModel, VolatilityProportionalSlippage  # type: ignore
+    from core.backtest_incremental import IncrementalStore, run_incremental  # type: ignore
     _ENGINE_OK = True
 except Exception:
     _ENGINE_OK = False
@@ -20,38 +21,50 @@ class _MiniReport:
             'max_dd': float(((equity.cummax() - equity) / equity.cummax()).max())
         }
 
+def signal_orders(price_df: pd.DataFrame, signals: pd.Series, initial_cash: float = 100_000.0) -> List[Dict[str, Any]]:
+    """submit_order kwargs for every signal change, submitted on the change bar (filled at T+1)."""
+    sig = signals.reindex(price_df.index).fillna(0).astype(int)
+    change = sig.diff().fillna(sig)
+    orders = []
+    for t, step in change.items():
+        if step == 0:
+            continue
+        direction = OrderDirection.LONG if sig.loc[t] > 0 else OrderDirection.SHORT if sig.loc[t] < 0 else OrderDirection.FLAT
+        qty = max(1, int(initial_cash * 0.001 / max(price_df.loc[t, 'close'], 1e-6)))
+        orders.append({"symbol": "ASSET", "direction": direction, "quantity": qty, "order_type": OrderType.MARKET,
+                       "strategy": "ai_unified", "submission_date": t})
+    return orders
+
 def run_backtest_adapter(price_df: pd.DataFrame, signals: pd.Series, initial_cash: float = 100_000.0,
-                         commission_bps: int = 5, slippage_bps: int = 5) -> Dict:
+                         commission_bps: int = 5, slippage_bps: int = 5,
+                         store: Optional["IncrementalStore"] = None, key: Optional[str] = None) -> Dict:
     """Turn -1/0/+1 signals into orders at T+1 and run BacktestEngine.
     If engine is unavailable, fallback to a simple PnL model.
+    With `store`/`key` the run is incremental: only bars appended since the stored run are simulated.
     """
-    # Align indices
-    sig = signals.reindex(price_df.index).fillna(0).astype(int)
-    # Generate orders where signal changes
-    change = sig.diff().fillna(sig)
-    # Build simple order list: enter/exit on next bar open
     if _ENGINE_OK:
-        engine = BacktestEngine(
-            price_data={"ASSET": price_df},
+        engine_kwargs = dict(
             initial_capital=initial_cash,
             commission_model=PercentageCommissionModel(rate=commission_bps/1e4, min_commission=0.0),
             slippage_model=VolatilityProportionalSlippage(base_rate=slippage_bps/1e4)
         )
-        # Seed current_date at first index
-        engine.current_date = price_df.index[0]
-        for t, step in change.items():
-            if step == 0:
-                continue
-            direction = OrderDirection.LONG if sig.loc[t] > 0 else OrderDirection.SHORT if sig.loc[t] < 0 else OrderDirection.FLAT
-            qty = max(1, int(initial_cash * 0.001 / max(price_df.loc[t, 'close'], 1e-6)))
-            engine.submit_order(symbol="ASSET", direction=direction, quantity=qty, order_type=OrderType.MARKET, strategy="ai_unified")
-            engine.current_date = t
-        rep = engine.run(price_df.index[0], price_df.index[-1])
+        orders = signal_orders(price_df, signals, initial_cash)
+        if store is not None:
+            rep = run_incremental({"ASSET": price_df}, orders, store, key, price_df.index[0], price_df.index[-1], **engine_kwargs)
+        else:
+            engine = BacktestEngine(price_data={"ASSET": price_df}, **engine_kwargs)
+            for order in orders:
+                engine.submit_order(**order)
+            rep = engine.run(price_df.index[0], price_df.index[-1])
         equity = rep.get('portfolio_history', pd.Series(dtype=float))
         stats = rep.get('performance', {})
-        return {"equity": equity, "stats": stats}
+        out = {"equity": equity, "stats": stats}
+        if "incremental" in rep:
+            out["incremental"] = rep["incremental"]
+        return out
     else:
         # Fallback: naive returns when in position
+        sig = signals.reindex(price_df.index).fillna(0).astype(int)
         ret = price_df['close'].pct_change().fillna(0.0)
         pnl = (sig.shift(1).fillna(0) * ret)  # position active on next bar
         equity = (1 + pnl).cumprod() * initial_cash
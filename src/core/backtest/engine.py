@@ -1,8 +1,10 @@
 from __future__ import annotations
 import numpy as np, pandas as pd
 from dataclasses import dataclass
-from typing import Callable, Dict, List, Tuple
-from .metrics import compute_metrics
+from typing import Callable, Dict, List, Optional, Tuple
+from backtest.parallel import map_folds, fold_data
+from data_layer.shared_panel import as_frame, resolve_single_frame
+from .metrics import compute_metrics, compute_metrics_batch
 
 @dataclass
 class TradeCosts:
@@ -26,6 +28,27 @@ def backtest_vectorized(df: pd.DataFrame, signal: pd.Series, costs: TradeCosts):
     stats = compute_metrics(equity, strat_ret)
     return equity, strat_ret, stats
 
+def backtest_vectorized_batch(df: pd.DataFrame, signals: pd.DataFrame, costs: TradeCosts):
+    """backtest_vectorized over a (T x K) signal matrix (one column per parameter set / strategy).
+
+    Signals are aligned to df's index. Returns (equity, strat_ret, stats): (T x K) frames plus a
+    per-column metrics table from compute_metrics_batch.
+    """
+    c = df["close"].to_numpy(dtype=float)
+    ret = np.zeros_like(c)
+    ret[1:] = c[1:] / c[:-1] - 1.0
+    ret = np.nan_to_num(ret, nan=0.0, posinf=np.inf, neginf=-np.inf)
+    sig = signals.reindex(df.index).to_numpy(dtype=float)
+    pos = np.zeros_like(sig)
+    pos[1:] = sig[:-1]
+    pos = np.nan_to_num(pos, nan=0.0)
+    trades = np.zeros_like(pos)
+    trades[1:] = np.abs(np.diff(pos, axis=0))
+    strat_ret = pos * ret[:, None] - trades * (costs.commission + costs.slippage_bps / 10000.0)
+    equity = pd.DataFrame(np.cumprod(1 + strat_ret, axis=0), index=df.index, columns=signals.columns)
+    strat_ret = pd.DataFrame(strat_ret, index=df.index, columns=signals.columns)
+    return equity, strat_ret, compute_metrics_batch(equity, strat_ret)
+
 def time_series_splits(n: int, n_splits: int, min_train: int = 60):
     splits = []
     fold_size = (n - min_train) // n_splits if n_splits > 0 else 0
@@ -39,11 +62,26 @@ def time_series_splits(n: int, n_splits: int, min_train: int = 60):
         splits[-1] = (splits[-1][0], slice(splits[-1][1].start, n))
     return splits
 
-def run_walkforward(df: pd.DataFrame,
+def _walkforward_fold(train_fn, infer_fn, train_df: pd.DataFrame, test_df: pd.DataFrame, costs: TradeCosts):
+    train_df, test_df = as_frame(train_df), as_frame(test_df)
+    state = train_fn(train_df)
+    sig = infer_fn(test_df, state).reindex(test_df.index).fillna(0.0)
+    return backtest_vectorized(test_df, sig, costs)
+
+def run_walkforward(df,
                     train_fn: Callable[[pd.DataFrame], dict],
                     infer_fn: Callable[[pd.DataFrame, dict], pd.Series],
                     costs: TradeCosts,
-                    n_splits: int = 5, min_train: int = 252):
+                    n_splits: int = 5, min_train: int = 252,
+                    executor: str = "serial", max_workers: Optional[int] = None, seed: Optional[int] = None,
+                    symbol: Optional[str] = None):
+    """Walk-forward over expanding folds.
+
+    executor="thread"/"process" trains/tests folds concurrently on `max_workers` workers
+    ("process" needs module-level train_fn/infer_fn); `seed` seeds each fold deterministically.
+    `df` may be a shared panel / handle, in which case process workers attach to it zero-copy.
+    """
+    df, panel, symbol = resolve_single_frame(df, symbol)
     n = len(df)
     if n < min_train + n_splits:
         raise ValueError("Not enough data for walk-forward")
@@ -51,14 +89,18 @@ def run_walkforward(df: pd.DataFrame,
     all_equity = pd.Series(index=df.index, dtype=float)
     all_ret = pd.Series(index=df.index, dtype=float)
     fold_stats = []
+    fold_args = []
     for (tr, te) in folds:
         train_df = df.iloc[tr]
         test_df = df.iloc[te]
         if train_df.empty or test_df.empty: 
             continue
-        state = train_fn(train_df)
-        sig = infer_fn(test_df, state).reindex(test_df.index).fillna(0.0)
-        eq, r, s = backtest_vectorized(test_df, sig, costs)
+        fold_args.append((train_fn, infer_fn,
+                          fold_data(df, np.arange(n)[tr], panel, symbol, executor),
+                          fold_data(df, np.arange(n)[te], panel, symbol, executor), costs))
+    results = map_folds(_walkforward_fold, fold_args, executor=executor, max_workers=max_workers, seed=seed)
+    for (_, _, _, test_part, _), (eq, r, s) in zip(fold_args, results):
+        test_df = as_frame(test_part)
         all_equity.loc[test_df.index] = eq
         all_ret.loc[test_df.index] = r
         fold_stats.append(s)
@@ -1,17 +1,25 @@
 """Vectorized, multi-asset backtest engine with improved features.
-- Accepts a dict of DataFrames per symbol, or a MultiIndex DataFrame.
+- Accepts a dict of DataFrames per symbol, a MultiIndex DataFrame, or a shared panel (handle).
 - strategy_fn should accept (prices_dict, cfg) and return exposures dict or DataFrame of exposures per symbol in [-1,1].
 - Supports percent-of-capital sizing, execution costs, ATR stops via AdvancedRisk, and portfolio aggregation.
 - Returns structured result with per-symbol equity + portfolio metrics and drawdowns.
+- All symbols are simulated together on (T x N) arrays: ATR and sizing inputs are precomputed
+  as matrices and each bar updates target units, deltas, fees, cash and MTM for every symbol at once.
+  A symbol with no bar at a union timestamp does not trade there; its MTM is NaN for that row.
+- dtype_policy="compact" keeps the price matrices in float32; cash, positions and equity stay float64.
 """
 import numpy as np
 import pandas as pd
 from copy import deepcopy
 from datetime import timedelta
 from ..risk.advanced import AdvancedRisk
+from data_layer.dtypes import FLOAT64, apply_dtype_policy, resolve_policy
+from data_layer.shared_panel import SharedPanel, SharedPanelHandle
 
 def _to_panel(prices_input):
     # normalize input: if dict of dfs -> concat into wide-format with columns (symbol, field)
+    if isinstance(prices_input, (SharedPanel, SharedPanelHandle)):
+        prices_input = SharedPanel.attach(prices_input).frames()
     if isinstance(prices_input, dict):
         dfs = {}
         for sym, df in prices_input.items():
@@ -44,12 +52,13 @@ def compute_metrics(equity_series, freq='D'):
     win_rate = (returns>0).mean()
     return {'total_return': float(s.iloc[-1]/s.iloc[0]-1),'sharpe':float(sharpe),'sortino':float(sortino),'max_drawdown':float(max_dd),'win_rate':float(win_rate)}
 
-def run_vector_backtest(prices, strategy_fn, cfg=None, capital=100000.0, freq='D'):
+def run_vector_backtest(prices, strategy_fn, cfg=None, capital=100000.0, freq='D', dtype_policy=None):
     cfg = cfg or {}
+    policy = resolve_policy(dtype_policy or cfg.get('dtype_policy'))
     panel = _to_panel(prices)
     symbols = sorted({c[0] for c in panel.columns if isinstance(c, tuple)})
     # build per-symbol price frames
-    price_dict = {sym: panel[sym].copy() for sym in symbols}
+    price_dict = {sym: panel[sym].copy() if policy == FLOAT64 else apply_dtype_policy(panel[sym], policy) for sym in symbols}
     # strategy exposures: expect dict {sym: series} or DataFrame with MultiIndex columns
     exposures = strategy_fn(price_dict, cfg)
     # normalize exposures to DataFrame aligned with index
@@ -58,47 +67,72 @@ def run_vector_backtest(prices, strategy_fn, cfg=None, capital=100000.0, freq='D
     else:
         exp_df = exposures.reindex(panel.index).fillna(0.0)
     adv_risk = AdvancedRisk(cfg.get('risk', {}))
-    # prepare results
-    per_sym_equity = {}
-    trades_all = []
+    risk_cfg = cfg.get('risk', {})
+    use_atr = risk_cfg.get('use_atr', True)
+    pct_risk = risk_cfg.get('pct_risk_per_trade', 0.01)
+    stop_mult = cfg.get('stop', {}).get('initial_pct', 3.0)
+    fee_bps = cfg.get('execution', {}).get('fee_bps', 0.0005)
+
+    # (T x N) field matrices on the sorted union index
+    index = panel.index.sort_values()
     for sym in symbols:
-        df = price_dict[sym].copy()
-        if 'close' not in df.columns:
+        if 'close' not in price_dict[sym].columns:
             raise ValueError(f"symbol {sym} missing close column")
-        exp = exp_df.get(sym, pd.Series(0.0, index=df.index)).fillna(0.0)
-        cash = capital * cfg.get('per_symbol_capital_frac', 1.0/len(symbols))
-        position = 0.0
-        equity_list = []
-        atr = adv_risk.atr_from_df(df, lookback=cfg.get('atr_lookback',14))
-        for ts, row in df.iterrows():
-            price = row['close']
-            target_pct = float(exp.loc[ts])
-            desired_notional = target_pct * cash
-            # determine units using percent-risk sizing
-            atr_val = float(atr.loc[ts]) if ts in atr.index else None
-            if cfg.get('risk',{}).get('use_atr', True) and atr_val and atr_val>0:
-                units = adv_risk.position_size_percent_risk(price, atr_val, cash, pct_risk=cfg.get('risk',{}).get('pct_risk_per_trade',0.01), stop_multiplier=cfg.get('stop',{}).get('initial_pct',3.0))
-            else:
-                units = (desired_notional)/price if price>0 else 0.0
+    close_df = pd.DataFrame({sym: price_dict[sym]['close'] for sym in symbols}).reindex(index)
+    close = close_df.to_numpy(dtype=policy.price)
+    exposure = exp_df.reindex(index=index, columns=symbols).fillna(0.0).to_numpy(dtype=float)
+    if use_atr:
+        # ATR rolls over each symbol's own frame (as atr_from_df did per symbol), then aligns to the union index
+        field = lambda name: pd.DataFrame({sym: price_dict[sym][name] for sym in symbols})
+        atr = adv_risk.atr_from_panel(field('high'), field('low'), field('close'), lookback=cfg.get('atr_lookback', 14))
+        atr = atr.reindex(index).to_numpy(dtype=float)
+        with np.errstate(invalid='ignore'):
+            atr_ok = atr > 0
+
+    T, N = close.shape
+    cash = np.full(N, capital * cfg.get('per_symbol_capital_frac', 1.0/len(symbols)), dtype=float)
+    position = np.zeros(N, dtype=float)
+    cash_hist = np.empty((T, N), dtype=float)
+    pos_hist = np.empty((T, N), dtype=float)
+    size_hist = np.zeros((T, N), dtype=float)
+    fee_hist = np.zeros((T, N), dtype=float)
+    traded = np.zeros((T, N), dtype=bool)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for t in range(T):
+            price = close[t]
+            # sizing depends on running cash, so bars advance sequentially but all symbols move together
+            units = np.where(price > 0, exposure[t] * cash / price, 0.0)
+            if use_atr:
+                risk_units = adv_risk.position_size_percent_risk_array(price, atr[t], cash, pct_risk=pct_risk, stop_multiplier=stop_mult)
+                units = np.where(atr_ok[t], risk_units, units)
             delta = units - position
-            if abs(delta) > 1e-9:
-                # simplify costs
-                fee = abs(delta*price) * cfg.get('execution',{}).get('fee_bps',0.0005)
-                cash -= delta*price
-                cash -= fee
-                trades_all.append({'timestamp':ts,'symbol':sym,'size':delta,'price':price,'fee':fee})
-                position = units
-            mtm = cash + position*price
-            equity_list.append({'timestamp':ts,'equity':mtm,'cash':cash,'position':position})
-        per_sym_equity[sym] = pd.DataFrame(equity_list).set_index('timestamp')
+            # a symbol with no bar at t (NaN close on the union index) keeps its position and cash
+            hit = (np.abs(delta) > 1e-9) & np.isfinite(price)
+            fee = np.abs(delta * price) * fee_bps
+            cash = np.where(hit, cash - delta * price - fee, cash)
+            position = np.where(hit, units, position)
+            traded[t] = hit
+            size_hist[t] = delta
+            fee_hist[t] = fee
+            cash_hist[t] = cash
+            pos_hist[t] = position
+        equity = cash_hist + pos_hist * close
+
+    ts_index = pd.DatetimeIndex(index, name='timestamp') if isinstance(index, pd.DatetimeIndex) else pd.Index(index, name='timestamp')
+    per_sym_equity = {
+        sym: pd.DataFrame({'equity': equity[:, j], 'cash': cash_hist[:, j], 'position': pos_hist[:, j]}, index=ts_index)
+        for j, sym in enumerate(symbols)
+    }
+    # trade log ordered by symbol, then time
+    sym_idx, t_idx = np.nonzero(traded.T)
+    trades = pd.DataFrame({
+        'timestamp': index[t_idx],
+        'symbol': pd.Categorical.from_codes(sym_idx, symbols) if policy != FLOAT64 and policy.symbol == 'category' else np.asarray(symbols, dtype=object)[sym_idx],
+        'size': size_hist[t_idx, sym_idx],
+        'price': close[t_idx, sym_idx],
+        'fee': fee_hist[t_idx, sym_idx],
+    }) if len(t_idx) else pd.DataFrame()
     # portfolio aggregation (sum equities)
-    all_idx = sorted(set().union(*[df.index for df in per_sym_equity.values()]))
-    port_equity = None
-    for sym, edf in per_sym_equity.items():
-        s = edf['equity'].reindex(all_idx).ffill()
-        if port_equity is None:
-            port_equity = s
-        else:
-            port_equity = port_equity.add(s, fill_value=0.0)
+    port_equity = pd.DataFrame(equity, index=index, columns=symbols).ffill().sum(axis=1, min_count=1).rename('equity')
     metrics = compute_metrics(port_equity, freq=freq)
-    return {'per_symbol_equity':per_sym_equity,'portfolio_equity':port_equity,'trades':pd.DataFrame(trades_all),'metrics':metrics}
+    return {'per_symbol_equity':per_sym_equity,'portfolio_equity':port_equity,'trades':trades,'metrics':metrics}
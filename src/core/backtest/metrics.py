@@ -19,3 +19,33 @@ def compute_metrics(equity: pd.Series, ret: pd.Series) -> dict:
     return {"AnnReturn": float(ann_ret), "AnnVol": float(ann_vol), "Sharpe": float(sharpe),
             "Sortino": float(sortino), "MaxDD": float(maxdd), "Calmar": float(calmar),
             "Turnover": float(turnover), "FinalNAV": float(nav.iloc[-1]) if len(nav) else 1.0}
+
+def compute_metrics_batch(equity: pd.DataFrame, ret: pd.DataFrame) -> pd.DataFrame:
+    """compute_metrics for every column of (T x K) equity/return frames in one array pass.
+
+    Returns one row per column with the same keys as compute_metrics.
+    """
+    eq = equity.to_numpy(dtype=float)
+    rets = np.nan_to_num(ret.to_numpy(dtype=float), nan=0.0, posinf=np.inf, neginf=-np.inf)
+    n, k = eq.shape
+    with np.errstate(divide="ignore", invalid="ignore"):
+        nav = eq / eq[0] if n else eq
+        ann_ret = nav[-1] ** (252 / max(n, 1)) - 1 if n > 1 else np.zeros(k)
+        std = rets.std(axis=0, ddof=1) if n > 1 else np.full(k, np.nan)
+        mean = rets.mean(axis=0)
+        ann_vol = np.where(std > 0, std * np.sqrt(252), 0.0)
+        sharpe = np.where(ann_vol > 0, mean * 252 / ann_vol, 0.0)
+        neg = rets < 0
+        n_neg = neg.sum(axis=0)
+        neg_mean = np.where(neg, rets, 0.0).sum(axis=0) / n_neg
+        neg_var = np.where(neg, (rets - neg_mean) ** 2, 0.0).sum(axis=0) / (n_neg - 1)
+        downside_vol = np.where(np.sqrt(neg_var) > 0, np.sqrt(neg_var) * np.sqrt(252), 0.0)
+        sortino = np.where(downside_vol > 0, mean * 252 / downside_vol, 0.0)
+        cum = np.cumprod(1 + rets, axis=0)
+        dd = (cum / np.maximum.accumulate(cum, axis=0) - 1.0).min(axis=0) if n else np.zeros(k)
+        maxdd = np.where(np.isfinite(dd), dd, 0.0)
+        calmar = np.where(maxdd < 0, ann_ret / np.abs(maxdd), 0.0)
+    return pd.DataFrame({
+        "AnnReturn": ann_ret, "AnnVol": ann_vol, "Sharpe": sharpe, "Sortino": sortino, "MaxDD": maxdd,
+        "Calmar": calmar, "Turnover": np.abs(rets).sum(axis=0), "FinalNAV": nav[-1] if n else np.ones(k),
+    }, index=equity.columns).astype(float)
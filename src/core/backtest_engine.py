@@ -1,19 +1,31 @@
-
 # src/core/backtest_engine.py
 from __future__ import annotations
 
+import bisect
 import math
+import os
+import pickle
+import tempfile
 import uuid
 import logging
 from dataclasses import dataclass
 from enum import Enum, auto
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Sequence, Union
 import pandas as pd
 import numpy as np
 
+from data_layer.dtypes import FLOAT64, DtypePolicy, apply_dtype_policy, resolve_policy
+from data_layer.shared_panel import SharedPanel, SharedPanelHandle, resolve_price_data
+
 logger = logging.getLogger("BacktestEngine")
 logger.setLevel(logging.INFO)
 
+# Field order of the (time x symbol x field) OHLCV panel used by the array mode.
+PANEL_FIELDS = ("open", "high", "low", "close", "volume")
+_F_OPEN, _F_HIGH, _F_LOW, _F_CLOSE, _F_VOLUME = range(len(PANEL_FIELDS))
+ENGINE_MODES = ("pandas", "array")
+CHECKPOINT_VERSION = 1
+
 
 class OrderType(Enum):
     MARKET = auto()
@@ -51,10 +63,19 @@ class Trade:
 
 
 class CommissionModel:
-    """Abstract-ish commission model base (duck-typed)."""
+    """Abstract-ish commission model base (duck-typed).
+
+    ``calculate_batch`` costs many fills in one call; subclasses override it with a
+    vectorized version, otherwise it falls back to ``calculate`` per element.
+    """
     def calculate(self, order_notional: float) -> float:
         raise NotImplementedError
 
+    def calculate_batch(self, notional: np.ndarray, vol: np.ndarray, symbol_idx: np.ndarray) -> np.ndarray:
+        """Commission in dollars per fill; ``vol``/``symbol_idx`` align with ``notional``."""
+        notional = np.asarray(notional, dtype=float)
+        return np.fromiter((self.calculate(float(n)) for n in notional), dtype=float, count=notional.size)
+
 
 class FixedCommissionModel(CommissionModel):
     def __init__(self, fixed_commission: float):
@@ -63,6 +84,9 @@ class FixedCommissionModel(CommissionModel):
     def calculate(self, order_notional: float) -> float:
         return float(self.fixed)
 
+    def calculate_batch(self, notional: np.ndarray, vol: np.ndarray, symbol_idx: np.ndarray) -> np.ndarray:
+        return np.full(np.shape(notional), self.fixed, dtype=float)
+
 
 class PercentageCommissionModel(CommissionModel):
     def __init__(self, rate: float, min_commission: float = 0.0):
@@ -72,12 +96,39 @@ class PercentageCommissionModel(CommissionModel):
     def calculate(self, order_notional: float) -> float:
         return max(self.min, float(order_notional) * self.rate)
 
+    def calculate_batch(self, notional: np.ndarray, vol: np.ndarray, symbol_idx: np.ndarray) -> np.ndarray:
+        return np.maximum(self.min, np.asarray(notional, dtype=float) * self.rate)
+
 
 class SlippageModel:
+    """Slippage model base (duck-typed).
+
+    ``symbol_names`` maps ``calculate_batch``'s ``symbol_idx`` back to symbols; the
+    engine sets it before costing a batch so the per-element fallback can call
+    ``calculate`` with the symbol name.
+    """
+    symbol_names: Optional[Sequence[str]] = None
+
     def calculate(self, symbol: str, order_notional: float, current_volatility: float) -> float:
         """Return slippage as a fraction of price (e.g., 0.0002 == 2bps)."""
         raise NotImplementedError
 
+    def calculate_batch(self, notional: np.ndarray, vol: np.ndarray, symbol_idx: np.ndarray) -> np.ndarray:
+        """Slippage fraction per fill; falls back to ``calculate`` per element."""
+        if self.symbol_names is None:
+            raise ValueError(f"{type(self).__name__}.calculate_batch needs symbol_names to call calculate()")
+        return _slippage_per_fill(self, self.symbol_names, notional, vol, symbol_idx)
+
+
+def _slippage_per_fill(model, names: Sequence[str], notional, vol, symbol_idx) -> np.ndarray:
+    notional = np.asarray(notional, dtype=float)
+    vol = np.broadcast_to(np.asarray(vol, dtype=float), notional.shape)
+    idx = np.broadcast_to(np.asarray(symbol_idx), notional.shape)
+    return np.fromiter(
+        (model.calculate(names[int(j)], float(n), float(v)) for n, v, j in zip(notional, vol, idx)),
+        dtype=float, count=notional.size,
+    )
+
 
 class VolatilityProportionalSlippage(SlippageModel):
     def __init__(self, base_rate: float = 0.0005):
@@ -85,8 +136,534 @@ class VolatilityProportionalSlippage(SlippageModel):
 
     def calculate(self, symbol: str, order_notional: float, current_volatility: float) -> float:
         # modest non-linear scaling with size and proportional to bar volatility
-        size_factor = np.log1p(max(order_notional, 0.0) / 1e6)  # ~0 for small orders
-        return float(self.base) * float(current_volatility) * float(max(size_factor, 0.0))
+        size_factor = math.log1p(max(float(order_notional), 0.0) / 1e6)  # ~0 for small orders
+        return self.base * float(current_volatility) * max(size_factor, 0.0)
+
+    def calculate_batch(self, notional: np.ndarray, vol: np.ndarray, symbol_idx: np.ndarray) -> np.ndarray:
+        size_factor = np.log1p(np.maximum(np.asarray(notional, dtype=float), 0.0) / 1e6)
+        return self.base * np.asarray(vol, dtype=float) * np.maximum(size_factor, 0.0)
+
+
+class PerformanceAccumulator:
+    """
+    Streaming report metrics for BacktestEngine.
+
+    Updated once per bar (``on_bar``) and once per fill (``on_fill``) so the
+    end-of-run report is O(symbols) instead of a re-walk of the history, and
+    interim metrics can be read at any point during a run:
+     - Sharpe from running (Welford) return moments
+     - max drawdown from the running equity peak
+     - dollar turnover from actual fill notionals
+     - gross/net exposure per bar and their running averages
+     - win rate from per-symbol break-even prices of every fill
+    """
+
+    def __init__(self, risk_free_rate: float = 0.0, periods_per_year: float = 252.0) -> None:
+        self.risk_free_rate = float(risk_free_rate)
+        self.periods_per_year = float(periods_per_year)
+        # equity path
+        self.n_equity = 0
+        self.first_equity = float("nan")
+        self.last_equity = float("nan")
+        self.equity_sum = 0.0
+        self.peak = float("-inf")
+        self.max_drawdown = float("nan")
+        # return moments
+        self.n_returns = 0
+        self.ret_mean = 0.0
+        self.ret_m2 = 0.0
+        # trading / exposure
+        self.num_fills = 0
+        self.dollar_turnover = 0.0
+        self.gross_exposure = 0.0
+        self.net_exposure = 0.0
+        self.exposure_sum_gross = 0.0
+        self.exposure_sum_net = 0.0
+        # symbol -> break-even closes; long fills win above, short fills win below.
+        # Appended per fill and sorted lazily when the win rate is read.
+        self.long_breakeven: Dict[str, List[float]] = {}
+        self.short_breakeven: Dict[str, List[float]] = {}
+        self._unsorted: set = set()
+
+    def on_bar(self, equity: float, ret: Optional[float] = None, gross: float = 0.0, net: float = 0.0) -> None:
+        if ret is not None and not math.isnan(ret):
+            self.n_returns += 1
+            delta = ret - self.ret_mean
+            self.ret_mean += delta / self.n_returns
+            self.ret_m2 += delta * (ret - self.ret_mean)
+        if math.isnan(equity):
+            return
+        if self.n_equity == 0:
+            self.first_equity = equity
+        self.n_equity += 1
+        self.last_equity = equity
+        self.equity_sum += equity
+        if equity > self.peak:
+            self.peak = equity
+        if self.peak != 0:
+            dd = (equity - self.peak) / self.peak
+        else:  # as the pandas report: 0/0 -> nan (skipped), x/0 -> -inf
+            dd = float("nan") if equity == 0 else -math.inf
+        if not math.isnan(dd) and (math.isnan(self.max_drawdown) or dd < self.max_drawdown):
+            self.max_drawdown = dd
+        if equity != 0:
+            self.gross_exposure = gross / equity
+            self.net_exposure = net / equity
+        self.exposure_sum_gross += self.gross_exposure
+        self.exposure_sum_net += self.net_exposure
+
+    def on_fill(self, trade: "Trade") -> None:
+        self.num_fills += 1
+        self.dollar_turnover += abs(trade.entry_price * trade.quantity)
+        if trade.quantity <= 0:
+            return
+        # MTM pnl at close c is (c - entry) * q - commission for longs, (entry - c) * q - commission for shorts
+        edge = trade.commission / trade.quantity
+        if trade.direction == OrderDirection.LONG:
+            self.long_breakeven.setdefault(trade.symbol, []).append(trade.entry_price + edge)
+            self._unsorted.add((True, trade.symbol))
+        else:
+            self.short_breakeven.setdefault(trade.symbol, []).append(trade.entry_price - edge)
+            self._unsorted.add((False, trade.symbol))
+
+    def symbols_traded(self) -> List[str]:
+        return list(set(self.long_breakeven) | set(self.short_breakeven))
+
+    def sharpe(self) -> float:
+        if self.n_returns < 2:
+            return float("nan")
+        std = math.sqrt(self.ret_m2 / (self.n_returns - 1))
+        if std == 0.0:
+            return float("nan")
+        rf = self.risk_free_rate / self.periods_per_year
+        return math.sqrt(self.periods_per_year) * (self.ret_mean - rf) / std
+
+    def win_rate(self, last_prices: Dict[str, float]) -> float:
+        """Share of fills that are in profit when marked at `last_prices` (symbol -> close)."""
+        if not self.num_fills:
+            return float("nan")
+        for is_long, sym in self._unsorted:
+            (self.long_breakeven if is_long else self.short_breakeven)[sym].sort()
+        self._unsorted.clear()
+        wins = 0
+        for sym, levels in self.long_breakeven.items():
+            px = last_prices.get(sym)
+            if px is not None and not math.isnan(px):
+                wins += bisect.bisect_left(levels, px)
+        for sym, levels in self.short_breakeven.items():
+            px = last_prices.get(sym)
+            if px is not None and not math.isnan(px):
+                wins += len(levels) - bisect.bisect_right(levels, px)
+        return wins / self.num_fills
+
+    def report(self, last_prices: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+        out: Dict[str, float] = {}
+        out["sharpe_ratio"] = self.sharpe()
+        enough = self.n_equity >= 2
+        total_return = (self.last_equity / self.first_equity - 1.0) if enough else float("nan")
+        out["max_drawdown"] = self.max_drawdown if enough else float("nan")
+        out["calmar"] = total_return / abs(out["max_drawdown"]) if enough and out["max_drawdown"] != 0 else float("nan")
+        avg_equity = self.equity_sum / self.n_equity if self.n_equity else 0.0
+        out["turnover"] = self.dollar_turnover / avg_equity if avg_equity > 0 else float("nan")
+        out["total_return"] = total_return
+        out["num_trades"] = float(self.num_fills)
+        out["win_rate"] = self.win_rate(last_prices or {})
+        out["avg_gross_exposure"] = self.exposure_sum_gross / self.n_equity if self.n_equity else float("nan")
+        out["avg_net_exposure"] = self.exposure_sum_net / self.n_equity if self.n_equity else float("nan")
+        return out
+
+
+class OrderScheduler:
+    """
+    Pending-order store bucketed by execution bar index.
+
+    Each bar bucket holds per-symbol sub-queues, so draining a bar costs
+    O(orders due on that bar) instead of a scan of the whole book. Orders are
+    also indexed by ``order_id`` for O(1) cancel/amend. Orders without an
+    execution bar yet (submitted before ``run()``, or past the end of the data)
+    are kept unscheduled until ``schedule()`` is called.
+    """
+
+    def __init__(self) -> None:
+        self._orders: Dict[str, Dict[str, Any]] = {}          # order_id -> order (submission order)
+        self._seq: Dict[str, int] = {}                         # order_id -> submission sequence
+        self._bar_of: Dict[str, Optional[int]] = {}            # order_id -> execution bar index
+        self._buckets: Dict[int, Dict[str, Dict[str, int]]] = {}  # bar -> symbol -> {order_id: seq}
+        self._next_seq = 0
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def __iter__(self):
+        return iter(list(self._orders.values()))
+
+    def __contains__(self, order_id: str) -> bool:
+        return order_id in self._orders
+
+    def get(self, order_id: str) -> Optional[Dict[str, Any]]:
+        return self._orders.get(order_id)
+
+    def add(self, order: Dict[str, Any], bar: Optional[int] = None) -> None:
+        oid = order["order_id"]
+        if oid in self._orders:
+            raise ValueError(f"Duplicate order_id: {oid}")
+        self._orders[oid] = order
+        self._seq[oid] = self._next_seq
+        self._next_seq += 1
+        self._bar_of[oid] = None
+        if bar is not None:
+            self.schedule(oid, bar)
+
+    def schedule(self, order_id: str, bar: Optional[int]) -> None:
+        """(Re)assign the execution bar of a pending order; ``None`` unschedules it."""
+        self._unlink(order_id)
+        self._bar_of[order_id] = bar
+        if bar is None:
+            return
+        sym = self._orders[order_id]["symbol"]
+        self._buckets.setdefault(bar, {}).setdefault(sym, {})[order_id] = self._seq[order_id]
+
+    def unscheduled(self) -> List[Dict[str, Any]]:
+        return [self._orders[oid] for oid, bar in self._bar_of.items() if bar is None]
+
+    def cancel(self, order_id: str) -> Optional[Dict[str, Any]]:
+        """Remove a pending order; returns it, or None if it is unknown."""
+        if order_id not in self._orders:
+            return None
+        self._unlink(order_id)
+        del self._bar_of[order_id]
+        del self._seq[order_id]
+        return self._orders.pop(order_id)
+
+    def amend(self, order_id: str, **changes: Any) -> Dict[str, Any]:
+        """Update fields of a pending order in place (queue position is kept)."""
+        order = self._orders.get(order_id)
+        if order is None:
+            raise KeyError(order_id)
+        if "symbol" in changes and changes["symbol"] != order["symbol"]:
+            raise ValueError("symbol of a pending order cannot be amended")
+        order.update(changes)
+        return order
+
+    def due_count(self, bar: int) -> int:
+        return sum(len(q) for q in self._buckets.get(bar, {}).values())
+
+    def pop_due(self, bar: int, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Remove and return orders due on ``bar`` (optionally one symbol), in submission order."""
+        bucket = self._buckets.get(bar)
+        if not bucket:
+            return []
+        if symbol is None:
+            queues = list(bucket.values())
+            del self._buckets[bar]
+        else:
+            q = bucket.pop(symbol, None)
+            queues = [q] if q else []
+            if not bucket:
+                del self._buckets[bar]
+        due = sorted((seq, oid) for q in queues for oid, seq in q.items())
+        out = []
+        for _, oid in due:
+            del self._bar_of[oid]
+            del self._seq[oid]
+            out.append(self._orders.pop(oid))
+        return out
+
+    def _unlink(self, order_id: str) -> None:
+        bar = self._bar_of.get(order_id)
+        if bar is None:
+            return
+        bucket = self._buckets[bar]
+        sym = self._orders[order_id]["symbol"]
+        queue = bucket[sym]
+        del queue[order_id]
+        if not queue:
+            del bucket[sym]
+            if not bucket:
+                del self._buckets[bar]
+        self._bar_of[order_id] = None
+
+
+_NS_PER_DAY = 86_400 * 10**9
+_NAT = np.iinfo(np.int64).min
+_DIRECTION_NAMES = np.array([d.name for d in sorted(OrderDirection, key=lambda d: d.value)], dtype=object)  # by value + 1
+_ORDER_TYPES = {t.value: t for t in OrderType}
+
+
+def match_fifo(symbol_idx: np.ndarray, signed_qty: np.ndarray) -> tuple:
+    """
+    FIFO lot matching of signed fills (time ordered), vectorized per symbol.
+
+    Every fill splits into a closing part (against the open position) and an
+    opening part. A position is always fully closed before it flips, so the
+    k-th unit ever closed on a symbol matches the k-th unit ever opened: the
+    lots are found by intersecting the cumulative open and close quantities.
+
+    Returns (open_fill, close_fill, quantity, opening): one row per matched
+    segment (``quantity`` units opened by fill ``open_fill`` and closed by fill
+    ``close_fill``), plus the opening quantity of every fill.
+    """
+    symbol_idx = np.asarray(symbol_idx)
+    signed_qty = np.asarray(signed_qty, dtype=float)
+    opening = np.zeros(len(signed_qty))
+    opens, closes, sizes = [], [], []
+    # group the fills by symbol once; a stable sort keeps each group time ordered
+    order = np.argsort(symbol_idx, kind="stable")
+    bounds = np.flatnonzero(np.diff(symbol_idx[order])) + 1
+    for rows in np.split(order, bounds) if len(order) else ():
+        q = signed_qty[rows]
+        before = np.cumsum(q) - q
+        reducing = (before != 0) & (np.sign(q) != np.sign(before))
+        closing = np.where(reducing, np.minimum(np.abs(q), np.abs(before)), 0.0)
+        opening[rows] = np.abs(q) - closing
+        open_end = np.cumsum(opening[rows])
+        close_end = np.cumsum(closing)
+        total = close_end[-1]
+        if total <= 0:
+            continue
+        tol = 1e-9 * max(open_end[-1], 1.0)
+        cuts = np.unique(np.concatenate([open_end, close_end]))
+        cuts = cuts[cuts <= total + tol]
+        lo = np.concatenate([[0.0], cuts[:-1]])
+        size = cuts - lo
+        keep = size > tol
+        mid = (lo[keep] + cuts[keep]) / 2.0
+        lot = np.minimum(np.searchsorted(open_end, mid, side="right"), len(rows) - 1)
+        exit_ = np.minimum(np.searchsorted(close_end, mid, side="right"), len(rows) - 1)
+        opens.append(rows[lot])
+        closes.append(rows[exit_])
+        sizes.append(size[keep])
+    if not sizes:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0), opening
+    return np.concatenate(opens), np.concatenate(closes), np.concatenate(sizes), opening
+
+
+class FillLog:
+    """
+    Columnar (struct-of-arrays) trade log.
+
+    Fills are appended into preallocated NumPy columns that double in capacity
+    when full, so logging a fill is a handful of scalar stores instead of a
+    Python object per fill. Timestamps are int64 ns (UTC for tz-aware data) and
+    symbols are integer codes into ``symbols``.
+
+    The log still behaves like the old ``List[Trade]`` for callers (``len``,
+    iteration and indexing build ``Trade`` records on demand). ``to_frame()``
+    exports the raw columns zero-copy as DataFrame columns and, with
+    ``match=True``, fills exit_time/exit_price/pnl/pnl_pct/holding_period from
+    FIFO round trips (see ``match_fifo``); ``to_arrow()`` does the same for a
+    pyarrow Table.
+    """
+
+    _NUMERIC = {
+        "symbol_idx": np.int32,
+        "entry_time": np.int64,
+        "entry_price": np.float64,
+        "quantity": np.float64,
+        "side": np.int8,
+        "order_type": np.int8,
+        "commission": np.float64,
+        "slippage": np.float64,
+        "volatility": np.float64,
+    }
+    _OBJECT = ("order_id", "strategy", "submission_date")
+
+    def __init__(self, symbols: List[str], capacity: int = 64) -> None:
+        self.symbols = list(symbols)
+        self._sym_idx = {sym: j for j, sym in enumerate(self.symbols)}
+        self._tz = None
+        self._n = 0
+        self._cols: Dict[str, np.ndarray] = {}
+        self._alloc(max(int(capacity), 1))
+
+    def _alloc(self, capacity: int) -> None:
+        old = self._cols
+        cols = {name: np.empty(capacity, dtype=dt) for name, dt in self._NUMERIC.items()}
+        cols.update({name: np.empty(capacity, dtype=object) for name in self._OBJECT})
+        for name, arr in old.items():
+            cols[name][:self._n] = arr[:self._n]
+        self._cols = cols
+        self._capacity = capacity
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __bool__(self) -> bool:
+        return self._n > 0
+
+    def __iter__(self):
+        for i in range(self._n):
+            yield self[i]
+
+    def __getitem__(self, i: int) -> Trade:
+        if i < 0:
+            i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError("fill index out of range")
+        c = self._cols
+        sym = self.symbols[int(c["symbol_idx"][i])]
+        return Trade(
+            trade_id=f"TRD_{i+1}_{sym}",
+            symbol=sym,
+            entry_time=self._timestamp(int(c["entry_time"][i])),
+            exit_time=None,
+            entry_price=float(c["entry_price"][i]),
+            exit_price=None,
+            quantity=float(c["quantity"][i]),
+            direction=OrderDirection(int(c["side"][i])),
+            order_type=_ORDER_TYPES[int(c["order_type"][i])],
+            commission=float(c["commission"][i]),
+            slippage=float(c["slippage"][i]),
+            pnl=None,
+            pnl_pct=None,
+            holding_period=None,
+            volatility=float(c["volatility"][i]),
+            metadata={name: c[name][i] for name in self._OBJECT},
+        )
+
+    def append(self, trade: Trade) -> None:
+        if self._n == self._capacity:
+            self._alloc(2 * self._capacity)
+        ts = pd.Timestamp(trade.entry_time)
+        if self._n == 0 and ts.tz is not None:
+            self._tz = ts.tz
+        i = self._n
+        c = self._cols
+        meta = trade.metadata or {}
+        c["symbol_idx"][i] = self._sym_idx[trade.symbol]
+        c["entry_time"][i] = ts.value
+        c["entry_price"][i] = trade.entry_price
+        c["quantity"][i] = trade.quantity
+        c["side"][i] = trade.direction.value
+        c["order_type"][i] = trade.order_type.value
+        c["commission"][i] = trade.commission
+        c["slippage"][i] = trade.slippage
+        c["volatility"][i] = trade.volatility
+        for name in self._OBJECT:
+            c[name][i] = meta.get(name)
+        self._n += 1
+
+    def column(self, name: str) -> np.ndarray:
+        """Read-only view of the filled part of a raw column."""
+        view = self._cols[name][:self._n]
+        view.flags.writeable = False
+        return view
+
+    def signed_quantity(self) -> np.ndarray:
+        return self.column("quantity") * self.column("side")
+
+    # ---------------------- Export ----------------------
+    def _timestamp(self, ns: int) -> pd.Timestamp:
+        ts = pd.Timestamp(ns)
+        return ts.tz_localize("UTC").tz_convert(self._tz) if self._tz is not None else ts
+
+    def _times(self, ns: np.ndarray):
+        """int64 ns -> datetime64 column (a zero-copy view for tz-naive data)."""
+        if self._tz is None:
+            return ns.view("M8[ns]")
+        return pd.DatetimeIndex(ns.view("M8[ns]")).tz_localize("UTC").tz_convert(self._tz)
+
+    def round_trips(self) -> pd.DataFrame:
+        """One row per FIFO-matched lot segment (entry fill -> exit fill)."""
+        open_fill, close_fill, qty, _ = match_fifo(self.column("symbol_idx"), self.signed_quantity())
+        return pd.DataFrame(self._segments(open_fill, close_fill, qty), copy=False)
+
+    def _segments(self, open_fill: np.ndarray, close_fill: np.ndarray, qty: np.ndarray) -> Dict[str, Any]:
+        c = {name: self.column(name) for name in ("symbol_idx", "entry_time", "entry_price", "quantity", "side", "commission")}
+        unit_cost = c["commission"] / np.where(c["quantity"] > 0, c["quantity"], 1.0)
+        side = c["side"][open_fill].astype(float)
+        entry_px = c["entry_price"][open_fill]
+        exit_px = c["entry_price"][close_fill]
+        pnl = side * (exit_px - entry_px) * qty - (unit_cost[open_fill] + unit_cost[close_fill]) * qty
+        held_ns = c["entry_time"][close_fill] - c["entry_time"][open_fill]
+        return {
+            "symbol": np.asarray(self.symbols, dtype=object)[c["symbol_idx"][open_fill]],
+            "entry_fill": open_fill,
+            "exit_fill": close_fill,
+            "entry_time": self._times(c["entry_time"][open_fill]),
+            "exit_time": self._times(c["entry_time"][close_fill]),
+            "entry_price": entry_px,
+            "exit_price": exit_px,
+            "quantity": qty,
+            "direction": _DIRECTION_NAMES[c["side"][open_fill] + 1],
+            "pnl": pnl,
+            "holding_period": held_ns / _NS_PER_DAY,
+        }
+
+    def _columns(self, match: bool = True) -> Dict[str, Any]:
+        n = self._n
+        c = {name: self.column(name) for name in self._NUMERIC}
+        symbols = np.asarray(self.symbols, dtype=object)[c["symbol_idx"]]
+        exit_ns = np.full(n, _NAT, dtype=np.int64)
+        exit_px = np.full(n, np.nan)
+        pnl = np.full(n, np.nan)
+        pnl_pct = np.full(n, np.nan)
+        holding = np.full(n, np.nan)
+        if match and n:
+            open_fill, close_fill, qty, opening = match_fifo(c["symbol_idx"], c["quantity"] * c["side"])
+            seg = self._segments(open_fill, close_fill, qty)
+            matched = np.bincount(open_fill, weights=qty, minlength=n)
+            # an entry gets its round-trip fields once its whole opening quantity is closed
+            done = (opening > 0) & (matched >= opening * (1.0 - 1e-9))
+            last_exit = np.full(n, _NAT, dtype=np.int64)
+            np.maximum.at(last_exit, open_fill, c["entry_time"][close_fill])
+            exit_ns[done] = last_exit[done]
+            exit_px[done] = (np.bincount(open_fill, weights=qty * seg["exit_price"], minlength=n) / np.where(matched > 0, matched, 1.0))[done]
+            pnl[done] = np.bincount(open_fill, weights=seg["pnl"], minlength=n)[done]
+            pnl_pct[done] = pnl[done] / (c["entry_price"][done] * matched[done])
+            holding[done] = (exit_ns[done] - c["entry_time"][done]) / _NS_PER_DAY
+        return {
+            "trade_id": np.array([f"TRD_{i+1}_{s}" for i, s in enumerate(symbols)], dtype=object),
+            "symbol": symbols,
+            "entry_time": self._times(c["entry_time"]),
+            "exit_time": self._times(exit_ns),
+            "entry_price": c["entry_price"],
+            "exit_price": exit_px,
+            "quantity": c["quantity"],
+            "direction": _DIRECTION_NAMES[c["side"] + 1],
+            "order_type": np.array([_ORDER_TYPES[int(v)].name for v in c["order_type"]], dtype=object),
+            "commission": c["commission"],
+            "slippage": c["slippage"],
+            "pnl": pnl,
+            "pnl_pct": pnl_pct,
+            "holding_period": holding,
+            "volatility": c["volatility"],
+            "sharpe_ratio": np.full(n, np.nan),
+            "max_drawdown": np.full(n, np.nan),
+            "metadata": [{name: self._cols[name][i] for name in self._OBJECT} for i in range(n)],
+        }
+
+    def to_frame(self, match: bool = True) -> pd.DataFrame:
+        """Trade table with the ``Trade`` columns; numeric fill columns are views of the log."""
+        return pd.DataFrame(self._columns(match), copy=False)
+
+    def to_arrow(self, match: bool = True):
+        """Same table as ``to_frame`` as a pyarrow Table."""
+        try:
+            import pyarrow as pa
+        except ImportError as e:
+            raise ImportError("FillLog.to_arrow requires pyarrow (pip install pyarrow)") from e
+        return pa.Table.from_pandas(self.to_frame(match), preserve_index=False)
+
+
+def _atomic_pickle(obj: Any, path: Union[str, os.PathLike]) -> None:
+    """Pickle `obj` to a temp file in the target directory, fsync, then rename over `path`."""
+    path = os.fspath(path)
+    fd, tmp = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=os.path.dirname(path) or ".")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            pickle.dump(obj, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
 
 
 class BacktestEngine:
@@ -95,72 +672,262 @@ class BacktestEngine:
      - 1-bar execution delay
      - Commission/slippage plug-ins
      - Multi-asset portfolio accounting
-     - Detailed trade log
+     - Detailed trade log (columnar FillLog with FIFO round trips)
      - Robust metrics (Sharpe, MaxDD, win rate, turnover, etc.)
+
+    ``mode="array"`` aligns every symbol into one preallocated NumPy OHLCV panel
+    (time x symbol x field) at construction and runs the bar loop on integer bar
+    positions, writing into preallocated equity/return arrays. Reports are the
+    same as the default ``mode="pandas"`` path.
+
+    ``price_data`` may also be a ``SharedPanel`` or its picklable handle: worker
+    processes then read the published OHLCV pages zero-copy (and array mode uses the
+    shared array as its panel directly).
+
+    ``dtype_policy="compact"`` stores prices/volumes as float32 (the price frames, and
+    the panel in array mode) while cash, positions and equity stay float64; see
+    ``data_layer.dtypes`` for the error bound against float64 runs.
     """
 
     def __init__(
         self,
-        price_data: Dict[str, pd.DataFrame],
+        price_data: Union[Dict[str, pd.DataFrame], SharedPanel, SharedPanelHandle],
         initial_capital: float = 1_000_000.0,
         commission_model: Optional[CommissionModel] = None,
         slippage_model: Optional[SlippageModel] = None,
         risk_free_rate: float = 0.0,
+        mode: str = "pandas",
+        dtype_policy: Union[None, str, DtypePolicy] = None,
     ) -> None:
+        if mode not in ENGINE_MODES:
+            raise ValueError(f"mode must be one of {ENGINE_MODES}, got {mode!r}")
+        price_data, self._shared = resolve_price_data(price_data)
+        if dtype_policy is None and self._shared is not None and self._shared.array.dtype == np.float32:
+            dtype_policy = "compact"  # a float32 shared panel is used as published
+        self.dtype_policy = resolve_policy(dtype_policy)
         self._validate_price_data(price_data)
-        self.price_data = {sym: df.sort_index() for sym, df in price_data.items()}
+        # shared panels are published sorted; sort_index() would materialize private copies
+        if self._shared is not None:
+            self.price_data = dict(price_data)
+        elif self.dtype_policy == FLOAT64:
+            self.price_data = {sym: df.sort_index() for sym, df in price_data.items()}
+        else:
+            self.price_data = {sym: apply_dtype_policy(df.sort_index(), self.dtype_policy) for sym, df in price_data.items()}
         self.initial_capital = float(initial_capital)
         self.commission_model = commission_model or PercentageCommissionModel(0.0005, min_commission=0.0)
         self.slippage_model = slippage_model or VolatilityProportionalSlippage()
         self.risk_free_rate = float(risk_free_rate)
 
+        self.mode = mode
+
         # Derived
         self._common_dates = self._compute_common_dates()
+        self.symbols: List[str] = list(self.price_data.keys())
+        self._sym_idx: Dict[str, int] = {sym: j for j, sym in enumerate(self.symbols)}
+        self._panel: Optional[np.ndarray] = self._build_panel() if mode == "array" else None
 
         # State
         self.current_date: Optional[pd.Timestamp] = None
         self.portfolio_cash: float = float(initial_capital)
         self.positions: Dict[str, float] = {sym: 0.0 for sym in self.price_data.keys()}  # qty (+ long, - short)
         self.avg_price: Dict[str, float] = {sym: 0.0 for sym in self.price_data.keys()}  # avg entry for position
-        self.trade_log: List[Trade] = []
-        self.order_book: List[Dict[str, Any]] = []
+        self.trade_log = FillLog(self.symbols)
+        self.orders = OrderScheduler()
+        self._order_counter = 0
+        self._pos_vec = np.zeros(len(self.symbols), dtype=float)  # mirrors `positions` by symbol index
+        self._bar: Optional[int] = None  # integer position of current_date in _common_dates
+        self.metrics_acc = PerformanceAccumulator(self.risk_free_rate)
+        self._checkpoint: Optional[tuple] = None  # (every N bars, path) while a checkpointed run is active
 
         # History
         self.portfolio_history = pd.Series(dtype=float)
         self.returns = pd.Series(dtype=float)
 
     # ---------------------- Lifecycle ----------------------
-    def run(self, start_date: pd.Timestamp, end_date: pd.Timestamp) -> Dict[str, Any]:
+    def run(self, start_date: pd.Timestamp, end_date: pd.Timestamp, checkpoint_every: Optional[int] = None,
+            checkpoint_path: Optional[str] = None) -> Dict[str, Any]:
+        """Run the window; with ``checkpoint_every``/``checkpoint_path`` the full engine state is
+        written atomically to ``checkpoint_path`` every N bars (see ``resume``)."""
         start_date = pd.Timestamp(start_date)
         end_date = pd.Timestamp(end_date)
         if start_date > end_date:
             raise ValueError("start_date cannot be after end_date")
+        if (checkpoint_every is None) != (checkpoint_path is None):
+            raise ValueError("checkpoint_every and checkpoint_path must be given together")
+        if checkpoint_every is not None and checkpoint_every < 1:
+            raise ValueError("checkpoint_every must be >= 1")
 
         window_dates = self._window_dates(start_date, end_date)
         if len(window_dates) < 2:
             raise ValueError("Not enough common dates in the given window.")
 
         # schedule pre-submitted orders lacking dates to T+1 of start
-        for order in self.order_book:
+        for order in self.orders.unscheduled():
             if order.get("submission_date") is None:
                 order["submission_date"] = window_dates[0]
-            if order.get("execution_date") is None:
-                order["execution_date"] = self._next_trading_day_from(order["submission_date"], window_dates)
+            order["execution_date"] = self._next_trading_day_from(order["submission_date"], window_dates)
+            self.orders.schedule(order["order_id"], self._bar_index(order["execution_date"]))
+
+        self._checkpoint = (checkpoint_every, checkpoint_path) if checkpoint_every is not None else None
+        self._run_window(window_dates, 0, None, None)
+        return self._generate_report()
+
+    def resume(self, checkpoint: Union[str, os.PathLike]) -> Dict[str, Any]:
+        """
+        Continue an interrupted ``run`` from its last checkpoint file.
+
+        Call it on an engine built with the same price data and cost models; the
+        report is identical to the one the uninterrupted run would have returned.
+        Checkpointing continues at the same interval and path.
+        """
+        with open(checkpoint, "rb") as fh:
+            state = pickle.load(fh)
+        if state.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version: {state.get('version')!r}")
+        if (state["mode"] != self.mode or state.get("dtype_policy", "float64") != self.dtype_policy.name
+                or state["symbols"] != self.symbols or state["dates"] != self._dates_fingerprint()):
+            raise ValueError("Checkpoint was written by an engine with different mode, dtype policy, symbols or dates")
+        window_dates = self._window_dates(*state["window"])
+        self._restore_state(state)
+        self._checkpoint = (state["every"], os.fspath(checkpoint))
+        self._run_window(window_dates, state["next_k"], state["last_value"], state["buffers"])
+        return self._generate_report()
+
+    def extend(self, end_date: pd.Timestamp) -> Dict[str, Any]:
+        """
+        Continue a finished run over the bars after its last processed date up to ``end_date``.
 
-        last_value = None
-        for dt in window_dates:
+        The engine must hold the longer price history (e.g. a new engine restored
+        from ``state_snapshot()``, see core.backtest_incremental); the report equals a
+        full run over the whole window with the same orders.
+        """
+        if self.portfolio_history.empty:
+            raise ValueError("extend() needs a previous run (or a restored state)")
+        last_dt = self.portfolio_history.index[-1]
+        dates = self._common_dates
+        window_dates = dates[(dates > last_dt) & (dates <= pd.Timestamp(end_date))]
+        # orders left without an execution bar (submitted on/after the old last bar) get one now
+        for order in self.orders.unscheduled():
+            if order.get("submission_date") is None:
+                order["submission_date"] = last_dt
+            order["execution_date"] = self._next_trading_day_from(order["submission_date"], dates)
+            self.orders.schedule(order["order_id"], self._bar_index(order["execution_date"]))
+        if len(window_dates):
+            self._checkpoint = None
+            self._run_window(window_dates, 0, float(self.portfolio_history.iloc[-1]), None)
+        return self._generate_report()
+
+    def _run_window(self, window_dates: pd.DatetimeIndex, k0: int, last_value: Optional[float],
+                    buffers: Optional[tuple]) -> None:
+        if self._panel is not None:
+            self._run_bars_array(window_dates, k0, last_value, buffers)
+            return
+        start = int(self._common_dates.get_loc(window_dates[0]))
+        for k in range(k0, len(window_dates)):
+            dt = window_dates[k]
+            self._bar = start + k
             self.current_date = dt
             # process orders scheduled for today
             self._process_orders_for_today()
             # MTM valuation
-            value = self._mark_to_market()
+            value, gross, net = self._valuation()
             self.portfolio_history.loc[dt] = value
+            ret = None
+            if last_value is not None and last_value > 0:
+                ret = (value / last_value) - 1.0
+                self.returns.loc[dt] = ret
+            self.metrics_acc.on_bar(value, ret, gross, net)
+            last_value = value
+            self._maybe_checkpoint(window_dates, k + 1, last_value, None)
+
+    def _run_bars_array(self, window_dates: pd.DatetimeIndex, k0: int = 0, last_value: Optional[float] = None,
+                        buffers: Optional[tuple] = None) -> None:
+        """Bar loop over integer panel positions with preallocated equity/return buffers."""
+        start = int(self._common_dates.get_loc(window_dates[0]))
+        n = len(window_dates)
+        equity = np.empty(n, dtype=float)
+        rets = np.empty(n, dtype=float)
+        has_ret = np.zeros(n, dtype=bool)
+        if buffers is not None:
+            equity[:k0], rets[:k0], has_ret[:k0] = buffers
+
+        for k in range(k0, n):
+            self._bar = start + k
+            self.current_date = window_dates[k]
+            self._process_orders_for_today()
+            value, gross, net = self._valuation()
+            equity[k] = value
+            ret = None
             if last_value is not None and last_value > 0:
-                self.returns.loc[dt] = (value / last_value) - 1.0
+                ret = rets[k] = (value / last_value) - 1.0
+                has_ret[k] = True
+            self.metrics_acc.on_bar(value, ret, gross, net)
             last_value = value
+            self._maybe_checkpoint(window_dates, k + 1, last_value, (equity, rets, has_ret))
+
+        history = pd.Series(equity, index=window_dates, dtype=float)
+        returns = pd.Series(rets[has_ret], index=window_dates[has_ret], dtype=float)
+        self.portfolio_history = history if self.portfolio_history.empty else pd.concat([self.portfolio_history, history])
+        self.returns = returns if self.returns.empty else pd.concat([self.returns, returns])
+
+    # ---------------------- Checkpoints ----------------------
+    def _maybe_checkpoint(self, window_dates: pd.DatetimeIndex, next_k: int, last_value: float,
+                          buffers: Optional[tuple]) -> None:
+        if self._checkpoint is None or next_k >= len(window_dates):
+            return
+        every, path = self._checkpoint
+        if next_k % every:
+            return
+        state = self.state_snapshot()
+        state.update({
+            "window": (window_dates[0], window_dates[-1]),
+            "every": every,
+            "next_k": next_k,
+            "last_value": last_value,
+            "buffers": tuple(b[:next_k] for b in buffers) if buffers is not None else None,
+        })
+        _atomic_pickle(state, path)
+        logger.debug(f"Checkpoint written at bar {self._bar} ({self.current_date}) -> {path}")
 
-        report = self._generate_report()
-        return report
+    def state_snapshot(self) -> Dict[str, Any]:
+        """Portfolio, order-book, fill-log and accumulator state (picklable; prices are not included)."""
+        return {
+            "version": CHECKPOINT_VERSION,
+            "mode": self.mode,
+            "dtype_policy": self.dtype_policy.name,
+            "symbols": self.symbols,
+            "dates": self._dates_fingerprint(),
+            "current_date": self.current_date,
+            "bar": self._bar,
+            "cash": self.portfolio_cash,
+            "positions": self.positions,
+            "avg_price": self.avg_price,
+            "pos_vec": self._pos_vec,
+            "orders": self.orders,
+            "order_counter": self._order_counter,
+            "trade_log": self.trade_log,
+            "metrics_acc": self.metrics_acc,
+            "portfolio_history": self.portfolio_history,
+            "returns": self.returns,
+        }
+
+    def _restore_state(self, state: Dict[str, Any]) -> None:
+        self.current_date = state["current_date"]
+        self._bar = state["bar"]
+        self.portfolio_cash = state["cash"]
+        self.positions = state["positions"]
+        self.avg_price = state["avg_price"]
+        self._pos_vec = state["pos_vec"]
+        self.orders = state["orders"]
+        self._order_counter = state["order_counter"]
+        self.trade_log = state["trade_log"]
+        self.metrics_acc = state["metrics_acc"]
+        self.portfolio_history = state["portfolio_history"]
+        self.returns = state["returns"]
+
+    def _dates_fingerprint(self) -> tuple:
+        dates = self._common_dates
+        return (len(dates), dates[0], dates[-1]) if len(dates) else (0, None, None)
 
     # ---------------------- Orders & Execution ----------------------
     def submit_order(
@@ -181,7 +948,8 @@ class BacktestEngine:
         if order_type == OrderType.LIMIT and limit_price is None:
             raise ValueError("limit_price required for LIMIT orders")
 
-        order_id = f"ORD_{len(self.order_book)+1}_{symbol}"
+        self._order_counter += 1
+        order_id = f"ORD_{self._order_counter}_{symbol}"
         order = {
             "order_id": order_id,
             "symbol": symbol,
@@ -195,69 +963,123 @@ class BacktestEngine:
         }
 
         # if we are mid-run and have a current date, schedule to next trading day
+        bar = None
         if self.current_date is not None:
             order["submission_date"] = self.current_date
             order["execution_date"] = self._next_trading_day_from(self.current_date, self._common_dates)
+            bar = self._bar_index(order["execution_date"])
 
-        self.order_book.append(order)
+        self.orders.add(order, bar)
         logger.debug(f"Order submitted: {order}")
         return order_id
 
+    @property
+    def order_book(self) -> List[Dict[str, Any]]:
+        """Pending orders in submission order (read-only snapshot of the scheduler)."""
+        return list(self.orders)
+
+    def cancel_order(self, order_id: str) -> bool:
+        """Cancel a pending order in O(1). Returns False if it is unknown or already executed."""
+        return self.orders.cancel(order_id) is not None
+
+    def amend_order(self, order_id: str, quantity: Optional[float] = None, limit_price: Optional[float] = None) -> Dict[str, Any]:
+        """Amend quantity and/or limit price of a pending order in O(1)."""
+        if order_id not in self.orders:
+            raise ValueError(f"Unknown order: {order_id}")
+        changes: Dict[str, Any] = {}
+        if quantity is not None:
+            if quantity <= 0:
+                raise ValueError("quantity must be positive")
+            changes["quantity"] = float(quantity)
+        if limit_price is not None:
+            changes["limit_price"] = float(limit_price)
+        return self.orders.amend(order_id, **changes)
+
     def _process_orders_for_today(self) -> None:
-        """Execute all orders whose execution_date is today."""
-        to_remove = []
-        for order in self.order_book:
-            if order["execution_date"] is None:
-                # If not scheduled (shouldn't happen mid-run), skip
-                continue
-            if order["execution_date"] != self.current_date:
+        """Execute all orders whose execution bar is today; their costs are computed in one batch."""
+        quotes = []
+        for order in self.orders.pop_due(self._bar):
+            try:
+                quote = self._quote_order(order)
+            except Exception as e:
+                logger.error(f"Execution failed for {order['order_id']}: {e}")
                 continue
+            if quote is not None:
+                quotes.append((order,) + quote)
+        if not quotes:
+            return
+        notional = np.fromiter((float(o["quantity"]) * px for o, px, _ in quotes), dtype=float, count=len(quotes))
+        vol = np.fromiter((v for _, _, v in quotes), dtype=float, count=len(quotes))
+        sym_idx = np.fromiter((self._sym_idx[o["symbol"]] for o, _, _ in quotes), dtype=np.int64, count=len(quotes))
+        try:
+            slip, commission = self._order_costs(notional, vol, sym_idx)
+        except Exception:
+            # a failing cost model is a configuration error, not a per-order one: put the
+            # orders back on the book so the engine state stays consistent, then surface it
+            for order, _, _ in quotes:
+                self.orders.add(order, bar=self._bar)
+            raise
+        for k, (order, exec_price, bar_vol) in enumerate(quotes):
             try:
-                trade = self._execute_order(order)
-                if trade is not None:
-                    self.trade_log.append(trade)
-                to_remove.append(order)
+                trade = self._fill_order(order, exec_price, bar_vol, notional[k], slip[k], commission[k])
+                self.trade_log.append(trade)
+                self.metrics_acc.on_fill(trade)
             except Exception as e:
                 logger.error(f"Execution failed for {order['order_id']}: {e}")
-                to_remove.append(order)
 
-        # Remove processed
-        self.order_book = [o for o in self.order_book if o not in to_remove]
+    def _order_costs(self, notional: np.ndarray, vol: np.ndarray, sym_idx: np.ndarray) -> tuple:
+        """(slippage fractions, commissions) for a batch of fills; duck-typed models without
+        ``calculate_batch`` go through the base classes' per-element fallback."""
+        slip_batch = getattr(self.slippage_model, "calculate_batch", None)
+        if slip_batch is None:
+            slip = _slippage_per_fill(self.slippage_model, self.symbols, notional, vol, sym_idx)
+        else:
+            if isinstance(self.slippage_model, SlippageModel):
+                self.slippage_model.symbol_names = self.symbols
+            slip = slip_batch(notional, vol, sym_idx)
+        comm_batch = getattr(self.commission_model, "calculate_batch", None)
+        if comm_batch is None:
+            commission = CommissionModel.calculate_batch(self.commission_model, notional, vol, sym_idx)
+        else:
+            commission = comm_batch(notional, vol, sym_idx)
+        return np.asarray(slip, dtype=float), np.asarray(commission, dtype=float)
 
-    def _execute_order(self, order: Dict[str, Any]) -> Optional[Trade]:
+    def _quote_order(self, order: Dict[str, Any]) -> Optional[tuple]:
+        """(execution price before slippage, bar volatility), or None if the symbol has no bar today."""
         sym = order["symbol"]
         # fetch today's bar for execution (1-bar delay already applied by scheduling)
         try:
-            bar = self.price_data[sym].loc[self.current_date]
+            bar_open, bar_high, bar_low = self._current_ohl(sym)
         except KeyError:
             logger.warning(f"No bar for {sym} on {self.current_date}")
             return None
 
         # base execution price
         if order["order_type"] == OrderType.MARKET:
-            exec_price = float(bar["open"])
+            exec_price = float(bar_open)
         elif order["order_type"] == OrderType.LIMIT:
             # simplistic limit: filled at best of limit/open depending on side
             if order["direction"] == OrderDirection.LONG:
-                exec_price = float(min(order["limit_price"], bar["open"]))
+                exec_price = float(min(order["limit_price"], bar_open))
             else:
-                exec_price = float(max(order["limit_price"], bar["open"]))
+                exec_price = float(max(order["limit_price"], bar_open))
         else:
             raise ValueError("STOP orders not implemented in this hotfix")
 
-        # slippage as fraction
-        bar_vol = float((bar["high"] - bar["low"]) / max(bar["open"], 1e-12))
-        notional = float(order["quantity"]) * exec_price
-        slip_frac = float(self.slippage_model.calculate(sym, notional, bar_vol))
+        bar_vol = float((bar_high - bar_low) / max(bar_open, 1e-12))
+        return exec_price, bar_vol
+
+    def _fill_order(self, order: Dict[str, Any], exec_price: float, bar_vol: float, notional: float,
+                    slip_frac: float, commission: float) -> Trade:
+        sym = order["symbol"]
+        slip_frac = float(slip_frac)
+        notional = float(notional)
         # apply slippage against us
         if order["direction"] == OrderDirection.LONG:
             exec_price *= (1.0 + slip_frac)
         else:
             exec_price *= (1.0 - slip_frac)
 
-        # commission in dollars
-        commission = float(self.commission_model.calculate(notional))
-
         trade = Trade(
             trade_id=f"TRD_{len(self.trade_log)+1}_{sym}",
             symbol=sym,
@@ -268,7 +1090,7 @@ class BacktestEngine:
             quantity=float(order["quantity"]),
             direction=order["direction"],
             order_type=order["order_type"],
-            commission=commission,
+            commission=float(commission),
             slippage=slip_frac * notional,
             pnl=None,
             pnl_pct=None,
@@ -311,10 +1133,29 @@ class BacktestEngine:
                 self.avg_price[sym] = 0.0
 
         self.positions[sym] = new_qty
+        self._pos_vec[self._sym_idx[sym]] = new_qty
+
+    def _current_ohl(self, sym: str) -> tuple:
+        """Open/high/low of `sym` on the current bar; raises KeyError if there is no bar."""
+        if self._panel is not None:
+            row = self._panel[self._bar, self._sym_idx[sym]]
+            return float(row[_F_OPEN]), float(row[_F_HIGH]), float(row[_F_LOW])
+        bar = self.price_data[sym].loc[self.current_date]
+        return float(bar["open"]), float(bar["high"]), float(bar["low"])
 
     def _mark_to_market(self) -> float:
         """Compute current portfolio value (cash + positions @ close)."""
+        return self._valuation()[0]
+
+    def _valuation(self) -> tuple:
+        """(portfolio value, gross position value, net position value) at the current close."""
+        if self._panel is not None:
+            held = np.flatnonzero(self._pos_vec)
+            vals = self._pos_vec[held] * self._panel[self._bar, held, _F_CLOSE]
+            net = float(vals.sum())
+            return float(self.portfolio_cash) + net, float(np.abs(vals).sum()), net
         total = float(self.portfolio_cash)
+        gross = net = 0.0
         for sym, qty in self.positions.items():
             if qty == 0:
                 continue
@@ -323,7 +1164,17 @@ class BacktestEngine:
             except KeyError:
                 continue
             total += qty * px
-        return total
+            gross += abs(qty * px)
+            net += qty * px
+        return total, gross, net
+
+    def interim_metrics(self) -> Dict[str, float]:
+        """Metrics so far (safe to call mid-run, e.g. from a dashboard or an order callback)."""
+        out = self.metrics_acc.report(self._closes_at(self.current_date)) if self.current_date is not None else self.metrics_acc.report()
+        out["gross_exposure"] = self.metrics_acc.gross_exposure
+        out["net_exposure"] = self.metrics_acc.net_exposure
+        out["equity"] = self.metrics_acc.last_equity
+        return out
 
     # ---------------------- Reports & Metrics ----------------------
     def _generate_report(self) -> Dict[str, Any]:
@@ -337,91 +1188,27 @@ class BacktestEngine:
         }
 
     def _trades_dataframe(self) -> pd.DataFrame:
-        if not self.trade_log:
-            return pd.DataFrame(columns=[f.name for f in Trade.__dataclass_fields__.values()])
-        rows = []
-        for t in self.trade_log:
-            rows.append({
-                "trade_id": t.trade_id,
-                "symbol": t.symbol,
-                "entry_time": t.entry_time,
-                "exit_time": t.exit_time,
-                "entry_price": t.entry_price,
-                "exit_price": t.exit_price,
-                "quantity": t.quantity,
-                "direction": t.direction.name,
-                "order_type": t.order_type.name,
-                "commission": t.commission,
-                "slippage": t.slippage,
-                "pnl": t.pnl,
-                "pnl_pct": t.pnl_pct,
-                "holding_period": t.holding_period,
-                "volatility": t.volatility,
-                "sharpe_ratio": t.sharpe_ratio,
-                "max_drawdown": t.max_drawdown,
-                "metadata": t.metadata or {},
-            })
-        return pd.DataFrame(rows)
+        # round-trip fields (exit_time/exit_price/pnl/holding_period) come from FIFO lot matching
+        return self.trade_log.to_frame(match=True)
 
     def _calculate_performance_metrics(self) -> Dict[str, float]:
-        out: Dict[str, float] = {}
-        rets = self.returns.dropna()
-        if len(rets) >= 2 and float(rets.std()) != 0.0:
-            rf_daily = self.risk_free_rate / 252.0
-            excess = rets - rf_daily
-            sharpe = np.sqrt(252.0) * float(excess.mean()) / float(excess.std())
-            out["sharpe_ratio"] = sharpe
-        else:
-            out["sharpe_ratio"] = float("nan")
-
-        # Max Drawdown on equity curve
-        eq = self.portfolio_history.dropna()
-        if len(eq) >= 2:
-            cummax = eq.cummax()
-            dd = (eq - cummax) / cummax
-            out["max_drawdown"] = float(dd.min())
-            out["calmar"] = (eq.iloc[-1] / eq.iloc[0] - 1.0) / abs(out["max_drawdown"]) if out["max_drawdown"] != 0 else float("nan")
-        else:
-            out["max_drawdown"] = float("nan")
-            out["calmar"] = float("nan")
-
-        # Turnover (sum abs(position change in $) / average equity)
-        dollar_turnover = 0.0
-        last_positions_value = None
-        for dt in self.portfolio_history.index:
-            pv = 0.0
-            for sym, qty in self.positions.items():
-                try:
-                    px = float(self.price_data[sym].loc[dt]["close"])
-                    pv += abs(qty) * px
-                except KeyError:
-                    continue
-            if last_positions_value is not None:
-                dollar_turnover += abs(pv - last_positions_value)
-            last_positions_value = pv
-        avg_equity = float(self.portfolio_history.mean()) if len(self.portfolio_history) else 0.0
-        out["turnover"] = dollar_turnover / avg_equity if avg_equity > 0 else float("nan")
-
-        out["total_return"] = (eq.iloc[-1] / eq.iloc[0] - 1.0) if len(eq) >= 2 else float("nan")
-        out["num_trades"] = float(len(self.trade_log))
-
-        # Win rate (requires exits; for this hotfix, we compute MTM wins at end vs entry price)
-        if self.trade_log:
-            wins = 0
-            for t in self.trade_log:
-                # MTM against close at final date
-                last_dt = self.portfolio_history.index[-1]
-                try:
-                    last_px = float(self.price_data[t.symbol].loc[last_dt]["close"])
-                except Exception:
-                    last_px = t.entry_price
-                pnl = (last_px - t.entry_price) * (t.quantity if t.direction == OrderDirection.LONG else -t.quantity) - t.commission
-                if pnl > 0:
-                    wins += 1
-            out["win_rate"] = wins / len(self.trade_log)
-        else:
-            out["win_rate"] = float("nan")
+        last_dt = self.portfolio_history.index[-1] if len(self.portfolio_history) else None
+        # win rate marks every fill at the final close (round trips are reported per trade)
+        return self.metrics_acc.report(self._closes_at(last_dt) if last_dt is not None else {})
 
+    def _closes_at(self, dt: pd.Timestamp) -> Dict[str, float]:
+        """Closes on `dt` for the symbols that have fills."""
+        out: Dict[str, float] = {}
+        if self._panel is not None:
+            pos = self._common_dates.get_loc(dt)
+            for sym in self.metrics_acc.symbols_traded():
+                out[sym] = float(self._panel[pos, self._sym_idx[sym], _F_CLOSE])
+            return out
+        for sym in self.metrics_acc.symbols_traded():
+            try:
+                out[sym] = float(self.price_data[sym].loc[dt]["close"])
+            except KeyError:
+                continue
         return out
 
     # ---------------------- Helpers ----------------------
@@ -438,6 +1225,23 @@ class BacktestEngine:
             if missing:
                 raise ValueError(f"{sym}: missing OHLCV columns: {missing}")
 
+    def _build_panel(self) -> np.ndarray:
+        """Align all symbols on the common dates into a (time x symbol x field) float array."""
+        dates = self._common_dates
+        shared = self._shared
+        dtype = self.dtype_policy.panel_dtype
+        if (shared is not None and shared.fields[:len(PANEL_FIELDS)] == PANEL_FIELDS
+                and tuple(self.symbols) == shared.symbols and shared.index.equals(dates)
+                and shared.array.dtype == dtype):
+            return shared.array[:, :, :len(PANEL_FIELDS)]
+        panel = np.empty((len(dates), len(self.symbols), len(PANEL_FIELDS)), dtype=dtype)
+        for j, sym in enumerate(self.symbols):
+            df = self.price_data[sym]
+            if not df.index.is_unique:
+                raise ValueError(f"{sym}: array mode requires a unique DatetimeIndex")
+            panel[:, j, :] = df.reindex(dates)[list(PANEL_FIELDS)].to_numpy(dtype=dtype)
+        return panel
+
     def _compute_common_dates(self) -> pd.DatetimeIndex:
         common = None
         for df in self.price_data.values():
@@ -450,6 +1254,12 @@ class BacktestEngine:
         mask = (self._common_dates >= start) & (self._common_dates <= end)
         return self._common_dates[mask]
 
+    def _bar_index(self, date: Optional[pd.Timestamp]) -> Optional[int]:
+        """Integer position of `date` in the common dates (None if unscheduled)."""
+        if date is None:
+            return None
+        return int(self._common_dates.get_loc(date))
+
     def _next_trading_day_from(self, current: pd.Timestamp, dates: pd.DatetimeIndex) -> Optional[pd.Timestamp]:
         try:
             idx = dates.get_loc(current)
@@ -0,0 +1,183 @@
+"""Incremental BacktestEngine runs for growing histories.
+
+A nightly re-run only has to process the bars appended since the last run.
+`run_incremental` persists the terminal engine state (portfolio, pending
+orders, fill log, metric accumulators) under a key built from
+(strategy, params, data version) together with a digest of the price history
+and of the orders it has seen. On the next call:
+
+ - same key, unchanged prefix  -> restore the state and `extend()` over the new bars only
+ - anything else (no state, restated/adjusted bars, different past orders,
+   new start date, engine settings changed) -> full recompute
+
+Either way the report is the one a full run over the whole window would give;
+`report["incremental"]` says which path was taken and why.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from core.backtest_engine import CHECKPOINT_VERSION, PANEL_FIELDS, BacktestEngine, _atomic_pickle
+
+logger = logging.getLogger(__name__)
+
+
+def incremental_key(strategy: str, params: Optional[Dict[str, Any]], data_version: str) -> str:
+    """Stable key for one (strategy, params, data version) run."""
+    payload = json.dumps({"strategy": strategy, "params": params or {}, "data_version": data_version},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:24]
+
+
+def history_digest(price_data: Dict[str, pd.DataFrame], until: pd.Timestamp) -> str:
+    """sha256 of every symbol's index + OHLCV values up to and including `until`."""
+    h = hashlib.sha256()
+    for sym in sorted(price_data):
+        df = price_data[sym].sort_index()
+        df = df.loc[:until]
+        h.update(sym.encode("utf-8"))
+        h.update(df.index.asi8.tobytes())
+        h.update(np.ascontiguousarray(df[list(PANEL_FIELDS)].to_numpy(dtype=float)).tobytes())
+    return h.hexdigest()
+
+
+def orders_digest(orders: Iterable[Dict[str, Any]]) -> str:
+    h = hashlib.sha256()
+    for o in orders:
+        h.update(json.dumps(_order_record(o), sort_keys=True, default=str).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _order_record(order: Dict[str, Any]) -> Dict[str, Any]:
+    direction, order_type = order["direction"], order.get("order_type")
+    return {
+        "symbol": order["symbol"],
+        "direction": getattr(direction, "name", direction),
+        "quantity": float(order["quantity"]),
+        "order_type": getattr(order_type, "name", order_type),
+        "limit_price": order.get("limit_price"),
+        "strategy": order.get("strategy"),
+        "submission_date": pd.Timestamp(order["submission_date"]).isoformat(),
+    }
+
+
+class IncrementalStore:
+    """One pickle per key in `directory`, replaced atomically."""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.state")
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.path(key), "rb") as fh:
+                return pickle.load(fh)
+        except FileNotFoundError:
+            return None
+        except Exception as e:  # a corrupt/old file is just a cache miss
+            logger.warning(f"Ignoring unreadable incremental state {self.path(key)}: {e}")
+            return None
+
+    def save(self, key: str, entry: Dict[str, Any]) -> None:
+        _atomic_pickle(entry, self.path(key))
+
+    def clear(self, key: str) -> None:
+        if os.path.exists(self.path(key)):
+            os.remove(self.path(key))
+
+
+def _engine_config(engine: BacktestEngine) -> str:
+    """Settings that change results besides data and orders."""
+    return json.dumps({
+        "initial_capital": engine.initial_capital,
+        "risk_free_rate": engine.risk_free_rate,
+        "mode": engine.mode,
+        "dtype_policy": engine.dtype_policy.name,
+        "commission": [type(engine.commission_model).__name__, vars(engine.commission_model)],
+        "slippage": [type(engine.slippage_model).__name__, vars(engine.slippage_model)],
+    }, sort_keys=True, default=str)
+
+
+def run_incremental(price_data: Dict[str, pd.DataFrame], orders: List[Dict[str, Any]], store: IncrementalStore,
+                    key: str, start_date: pd.Timestamp, end_date: Optional[pd.Timestamp] = None,
+                    **engine_kwargs: Any) -> Dict[str, Any]:
+    """
+    Run (or extend) a BacktestEngine backtest for `key`.
+
+    `orders` is the full order stream as ``submit_order`` keyword dicts, each with a
+    ``submission_date``; only orders submitted after the stored last bar are new.
+    """
+    engine = BacktestEngine(price_data, **engine_kwargs)
+    start_date = pd.Timestamp(start_date)
+    end_date = pd.Timestamp(end_date) if end_date is not None else engine._common_dates[-1]
+    orders = sorted(orders, key=lambda o: pd.Timestamp(o["submission_date"]))
+    config = _engine_config(engine)
+
+    entry = store.load(key)
+    reason = _stale_reason(entry, engine, price_data, orders, start_date, config)
+    if reason is None:
+        last_dt = entry["last_date"]
+        engine._restore_state(entry["state"])
+        engine.current_date = None  # new orders keep their own submission dates
+        new_orders = [o for o in orders if pd.Timestamp(o["submission_date"]) > last_dt]
+        for o in new_orders:
+            engine.submit_order(**o)
+        report = engine.extend(end_date)
+        new_bars = int(((engine._common_dates > last_dt) & (engine._common_dates <= end_date)).sum())
+        info = {"mode": "extend", "reason": "prefix unchanged", "new_bars": new_bars, "new_orders": len(new_orders)}
+    else:
+        for o in orders:
+            engine.submit_order(**o)
+        report = engine.run(start_date, end_date)
+        info = {"mode": "full", "reason": reason, "new_bars": len(report["portfolio_history"]), "new_orders": len(orders)}
+
+    last_dt = report["portfolio_history"].index[-1]
+    seen = [o for o in orders if pd.Timestamp(o["submission_date"]) <= last_dt]
+    store.save(key, {
+        "version": CHECKPOINT_VERSION,
+        "start_date": start_date,
+        "last_date": last_dt,
+        "config": config,
+        "history": history_digest(price_data, last_dt),
+        "orders": orders_digest(seen),
+        "n_orders": len(seen),
+        "state": engine.state_snapshot(),
+    })
+    logger.info(f"Incremental backtest {key}: {info['mode']} ({info['reason']}), {info['new_bars']} bars")
+    report["incremental"] = info
+    return report
+
+
+def _stale_reason(entry: Optional[Dict[str, Any]], engine: BacktestEngine, price_data: Dict[str, pd.DataFrame],
+                  orders: List[Dict[str, Any]], start_date: pd.Timestamp, config: str) -> Optional[str]:
+    """Why the stored state cannot be extended (None if it can)."""
+    if entry is None:
+        return "no stored state"
+    if entry.get("version") != CHECKPOINT_VERSION:
+        return "state version changed"
+    state = entry["state"]
+    if entry["start_date"] != start_date or entry["config"] != config:
+        return "run settings changed"
+    if state["mode"] != engine.mode or state["symbols"] != engine.symbols:
+        return "symbols changed"
+    last_dt = entry["last_date"]
+    dates = engine._common_dates
+    if last_dt not in dates or dates[0] != state["dates"][1]:
+        return "history prefix changed"
+    if history_digest(price_data, last_dt) != entry["history"]:
+        return "history prefix changed"
+    seen = [o for o in orders if pd.Timestamp(o["submission_date"]) <= last_dt]
+    if len(seen) != entry["n_orders"] or orders_digest(seen) != entry["orders"]:
+        return "orders before the last bar changed"
+    return None
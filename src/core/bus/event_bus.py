@@ -1,12 +1,12 @@
-# core/event_bus.py
+# core/bus/event_bus.py
 from dataclasses import dataclass
-from typing import Type, Callable, Dict, List, Any, Set, Coroutine
+from typing import Type, Callable, Dict, List, Any, Set, Coroutine, Optional
 from collections import defaultdict, deque
 import pandas as pd
 import inspect
 import warnings
 from enum import Enum, auto
-from threading import Lock, Thread
+from threading import Event as ThreadEvent, Lock, Thread, current_thread
 import asyncio
 import logging
 import time
@@ -32,13 +32,19 @@ class EventBus:
     - Thread-safe singleton
     - Priority-based dispatch
     - Async/await support
-    - Queue + backpressure (rate limited)
+    - Bounded queue with event-driven wakeup (overflowing events are dropped and counted)
+    - Fixed-size ring-buffer audit log, optionally sampled
     - Metrics export hooks
     - Replay mode
     """
     _instance = None
     _lock = Lock()
 
+    max_queue_size = 10_000
+    audit_log_size = 4_096     # ring capacity; older entries are overwritten
+    audit_sample_every = 1     # log every Nth dispatched event
+    _initial_slots = 64        # per-handler counter slots; doubled when exhausted
+
     def __new__(cls):
         with cls._lock:
             if cls._instance is None:
@@ -47,31 +53,94 @@ class EventBus:
         return cls._instance
 
     def _initialize(self):
-        self._handlers = defaultdict(list)
-        self._event_log = []
-        self._handler_stats = defaultdict(int)
+        self._handlers = defaultdict(list)   # event type -> [(priority, handler, slot, is_coroutine)]
+        self._dispatch_table = {}  # concrete event type -> handler tuples for it and its direct bases
         self._subscription_map = defaultdict(set)
         self._active = True
         self.logger = logging.getLogger("EventBus")
 
-        # Queue & backpressure
+        # Per-handler counters: each handler gets a slot index at subscribe time
+        self._slots: Dict[Callable, int] = {}
+        self._slot_names: List[str] = []
+        self._calls = [0] * self._initial_slots
+        self._errors = [0] * self._initial_slots
+
+        # Audit ring: (timestamp, event type name, handlers triggered, event)
+        self._audit = [None] * self.audit_log_size
+        self._audit_next = 0       # total entries written; slot is _audit_next % size
+        self._events_dispatched = 0
+        self._events_dropped = 0
+        self._middleware_errors = 0
+
+        # Queue & wakeup: publishers append and only signal the loop when it is parked
         self._queue = deque()
-        self._max_queue_size = 10000
+        self._max_queue_size = self.max_queue_size
+        self._idle = False
+        self._space = ThreadEvent()       # set by the loop when a blocked publisher may retry
+        self._publishers_waiting = False
+        self._middleware: List[Callable[[Event], Optional[Event]]] = []
         self._loop = asyncio.new_event_loop()
+        self._wakeup = asyncio.Event()
         self._thread = Thread(target=self._run_loop, daemon=True)
         self._thread.start()
 
+    def configure(self, max_queue_size: Optional[int] = None, audit_log_size: Optional[int] = None,
+                  audit_sample_every: Optional[int] = None):
+        """Resize the queue bound / audit ring or change sampling; resizing the ring drops its contents."""
+        if max_queue_size is not None:
+            self._max_queue_size = int(max_queue_size)
+        if audit_sample_every is not None:
+            if int(audit_sample_every) < 1:
+                raise ValueError("audit_sample_every must be >= 1")
+            self.audit_sample_every = int(audit_sample_every)
+        if audit_log_size is not None:
+            if int(audit_log_size) < 1:
+                raise ValueError("audit_log_size must be >= 1")
+            self.audit_log_size = int(audit_log_size)
+            self._audit = [None] * self.audit_log_size
+            self._audit_next = 0
+
     def _run_loop(self):
         asyncio.set_event_loop(self._loop)
-        self._loop.run_until_complete(self._process_queue())
+        try:
+            self._loop.run_until_complete(self._process_queue())
+        finally:
+            self._loop.close()
 
     async def _process_queue(self):
+        queue, wakeup = self._queue, self._wakeup
         while self._active:
-            if self._queue:
-                event = self._queue.popleft()
+            if queue:
+                event = queue.popleft()
+                if self._publishers_waiting:
+                    self._publishers_waiting = False
+                    self._space.set()
                 await self._dispatch(event)
-            else:
-                await asyncio.sleep(0.001)
+                continue
+            # Park until publish() signals. Clear before advertising idle and re-check the
+            # queue afterwards so an append racing with us is never missed.
+            wakeup.clear()
+            self._idle = True
+            if not queue and self._active:
+                await wakeup.wait()
+            self._idle = False
+
+    def _wake(self):
+        try:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:  # loop already closed
+            pass
+
+    def _slot_for(self, handler: Callable) -> int:
+        slot = self._slots.get(handler)
+        if slot is None:
+            slot = len(self._slot_names)
+            if slot == len(self._calls):
+                self._calls.extend([0] * slot)
+                self._errors.extend([0] * slot)
+            self._slots[handler] = slot
+            self._slot_names.append(handler.__qualname__)
+        return slot
 
     def subscribe(self, event_type: Type[Event], handler: Callable, priority: int = 0):
         if not callable(handler):
@@ -83,59 +152,110 @@ class EventBus:
         if len(sig.parameters) != 1:
             raise ValueError("Handler must accept exactly one parameter (event)")
 
-        self._handlers[event_type].append((priority, handler))
+        self._handlers[event_type].append((priority, handler, self._slot_for(handler), inspect.iscoroutinefunction(handler)))
         self._handlers[event_type].sort(key=lambda x: x[0])
         self._subscription_map[handler.__qualname__].add(event_type.__name__)
+        self._dispatch_table.clear()
 
         self.logger.debug(f"Handler {handler.__qualname__} subscribed to {event_type.__name__}")
 
-    async def _dispatch(self, event: Event):
-        log_entry = {
-            'timestamp': event.timestamp,
-            'event_type': type(event).__name__,
-            'event_data': str(event),
-            'handlers_triggered': 0
-        }
+    def _handlers_for(self, event_type: type) -> List[tuple]:
+        """(priority, handler, slot, is_coroutine) tuples for `event_type`, then for each of its
+        direct base classes, each group priority-sorted; cached per type."""
+        table = self._dispatch_table.get(event_type)
+        if table is None:
+            table = [h for klass in (event_type,) + event_type.__bases__ for h in self._handlers.get(klass, ())]
+            self._dispatch_table[event_type] = table
+        return table
 
-        handled = False
-        for event_type in [type(event)] + list(type(event).__bases__):
-            if event_type in self._handlers:
-                for priority, handler in self._handlers[event_type]:
-                    try:
-                        if inspect.iscoroutinefunction(handler):
-                            await handler(event)
-                        else:
-                            handler(event)
-                        self._handler_stats[handler.__qualname__] += 1
-                        log_entry['handlers_triggered'] += 1
-                        handled = True
-                    except Exception as e:
-                        self.logger.error(
-                            f"Handler {handler.__qualname__} failed for {type(event).__name__}: {str(e)}",
-                            exc_info=True
-                        )
-        if not handled:
+    def add_middleware(self, fn: Callable[[Event], Optional[Event]]):
+        """Run `fn(event)` on the bus thread before the handlers; returning None drops the event.
+        A middleware that raises is logged and skipped for that event, which is still dispatched."""
+        self._middleware.append(fn)
+
+    async def _dispatch(self, event: Event):
+        for mw in self._middleware:
+            try:
+                out = mw(event)
+            except Exception as e:
+                self._middleware_errors += 1
+                self.logger.error(f"Middleware {getattr(mw, '__qualname__', type(mw).__qualname__)} failed for "
+                                  f"{type(event).__name__}: {str(e)}", exc_info=True)
+                continue
+            if out is None:
+                return
+            event = out
+        calls, errors = self._calls, self._errors
+        triggered = 0
+        for priority, handler, slot, is_coro in self._handlers_for(type(event)):
+            try:
+                if is_coro:
+                    await handler(event)
+                else:
+                    handler(event)
+                calls[slot] += 1
+                triggered += 1
+            except Exception as e:
+                errors[slot] += 1
+                self.logger.error(
+                    f"Handler {handler.__qualname__} failed for {type(event).__name__}: {str(e)}",
+                    exc_info=True
+                )
+        if not triggered:
             self.logger.debug(f"No handlers for {type(event).__name__}")
-        self._event_log.append(log_entry)
+        n = self._events_dispatched
+        self._events_dispatched = n + 1
+        if n % self.audit_sample_every == 0:
+            i = self._audit_next
+            self._audit[i % len(self._audit)] = (event.timestamp, type(event).__name__, triggered, event)
+            self._audit_next = i + 1
 
-    def publish(self, event: Event):
+    def get_event_log(self, last: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Audit entries still in the ring, oldest first; `event_data` is rendered here, not on the hot path."""
+        size = len(self._audit)
+        end = self._audit_next
+        start = max(end - size, 0 if last is None else end - last, 0)
+        entries = [self._audit[i % size] for i in range(start, end)]
+        return [{'timestamp': ts, 'event_type': name, 'event_data': str(ev), 'handlers_triggered': n, 'event': ev}
+                for ts, name, n, ev in entries]
+
+    def publish(self, event: Event, block: bool = False):
+        """Queue `event`. When the queue is full it is dropped, or with `block=True` the caller
+        waits for the bus to make room (not from a handler: the bus thread would wait on itself)."""
         if not isinstance(event, Event):
             raise TypeError("Only Event instances can be published")
         if not self._active:
             warnings.warn("EventBus inactive, event discarded")
             return
 
-        if len(self._queue) >= self._max_queue_size:
-            self.logger.warning("EventBus queue overflow, dropping event")
-            return
+        while len(self._queue) >= self._max_queue_size:
+            if not block or not self._active or current_thread() is self._thread:
+                self._events_dropped += 1
+                self.logger.warning("EventBus queue overflow, dropping event")
+                return
+            self._space.clear()
+            self._publishers_waiting = True
+            if len(self._queue) >= self._max_queue_size:
+                self._space.wait(0.1)
         self._queue.append(event)
+        if self._idle:
+            self._wake()
 
     def get_stats(self) -> Dict[str, Any]:
+        handlers: Dict[str, int] = defaultdict(int)
+        handler_errors: Dict[str, int] = defaultdict(int)
+        for slot, name in enumerate(self._slot_names):
+            handlers[name] += self._calls[slot]
+            handler_errors[name] += self._errors[slot]
         return {
-            'total_events': len(self._event_log),
-            'handlers': dict(self._handler_stats),
+            'total_events': self._events_dispatched,
+            'dropped_events': self._events_dropped,
+            'middleware_errors': self._middleware_errors,
+            'handlers': dict(handlers),
+            'handler_errors': dict(handler_errors),
             'subscriptions': {k: len(v) for k, v in self._handlers.items()},
-            'queue_size': len(self._queue)
+            'queue_size': len(self._queue),
+            'audit_log_size': min(self._audit_next, len(self._audit)),
         }
 
     def export_metrics(self) -> Dict[str, Any]:
@@ -144,27 +264,30 @@ class EventBus:
         return {
             "eventbus_total_events": stats["total_events"],
             "eventbus_queue_size": stats["queue_size"],
-            "eventbus_handler_calls": sum(stats["handlers"].values())
+            "eventbus_dropped_events": stats["dropped_events"],
+            "eventbus_handler_calls": sum(stats["handlers"].values()),
+            "eventbus_handler_errors": sum(stats["handler_errors"].values()),
         }
 
     def replay(self, from_idx: int = 0, to_idx: int = None):
-        """Replay events from log for backtest/diagnostic"""
-        to_idx = to_idx or len(self._event_log)
-        for log in self._event_log[from_idx:to_idx]:
-            # Burada sadece publish ederek tekrar gönderiyoruz
-            # Daha gelişmiş replay için delay/time-travel eklenebilir
-            event_type = log['event_type']
-            self.logger.info(f"Replaying event {event_type}")
-            # Orijinal event objesini saklamak daha doğru olurdu
-            # Basitlik için burada log stringi publish edilmiyor
+        """Re-publish audited events (indices into `get_event_log()`) for backtest/diagnostic"""
+        for log in self.get_event_log()[from_idx:to_idx]:
+            self.logger.info(f"Replaying event {log['event_type']}")
+            self.publish(log['event'])
 
     def reset(self):
         with self._lock:
+            self._stop_loop()
             self._initialize()
 
-    def shutdown(self):
+    def _stop_loop(self, timeout: float = 1.0):
         self._active = False
-        self._loop.stop()
+        self._wake()
+        if self._thread.is_alive() and self._thread is not current_thread():
+            self._thread.join(timeout)
+
+    def shutdown(self):
+        self._stop_loop()
         self.logger.info("EventBus shutting down")
 
 # Örnek eventler
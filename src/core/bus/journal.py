@@ -0,0 +1,323 @@
+# core/bus/journal.py
+"""Append-only event journal and replayer for the event buses.
+
+`EventJournal` is a middleware (`fn(event) -> event`): add it with
+`EventBus.add_middleware` (core.bus.event_bus) or `add_pre_middleware` (core.event_bus)
+and every event is appended to the journal directory before dispatch.
+
+Layout of a journal directory:
+
+ - ``seg-000000.evj``: records packed back to back, each
+   ``<u32 length><i64 ts_ns><EventCodec frame body>``. Segments are preallocated and
+   written through mmap; a zero length marks the end (files are trimmed on close, and
+   a crash leaves zero-filled tails that readers stop at).
+ - ``seg-000000.idx``: one fixed 18-byte entry per record, ``<i64 ts_ns><i64 offset><u16 type>``,
+   loadable with `numpy.fromfile` (rebuilt by scanning the segment if it is short).
+ - ``manifest.json``: the event classes (``module:qualname``) in codec type-id order; a
+   codec passed to the journal or replayer must register them in that order.
+
+``ts_ns`` is the event's own ``timestamp`` when it has one, else the wall clock at append.
+`JournalReplayer` mmaps the segments, selects records by time range and type through the
+index, and re-publishes them as fast as the bus accepts them or at a scaled wall clock.
+"""
+from __future__ import annotations
+
+import importlib
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .transport import EventCodec
+
+_HEAD = struct.Struct("<Iq")       # record length (ts + body), ts_ns
+_IDX = struct.Struct("<qqH")
+INDEX_DTYPE = np.dtype([("ts", "<i8"), ("offset", "<i8"), ("type", "<u2")])
+SEGMENT_BYTES = 64 * 1024 * 1024
+
+
+def _seg_name(i: int) -> str:
+    return f"seg-{i:06d}.evj"
+
+
+def _event_ts_ns(event: Any) -> int:
+    ts = getattr(event, "timestamp", None)
+    if isinstance(ts, pd.Timestamp):
+        return int(ts.value)
+    if isinstance(ts, datetime):
+        return int(pd.Timestamp(ts).value)
+    return time.time_ns()
+
+
+class EventJournal:
+    """Append events to segment files under `path` (created if missing).
+
+    Reopening an existing journal starts a new segment after the last one. Thread-safe.
+    """
+
+    def __init__(self, path: str, codec: Optional[EventCodec] = None, segment_bytes: int = SEGMENT_BYTES,
+                 event_types: Sequence[type] = ()):
+        self.path = path
+        self.segment_bytes = int(segment_bytes)
+        os.makedirs(path, exist_ok=True)
+        self.codec = _journal_codec(path, codec)
+        for cls in event_types:
+            self.codec.register(cls)
+        self._known = len(self.codec.event_types)
+        self._write_manifest()
+        existing = sorted(f for f in os.listdir(path) if f.endswith(".evj"))
+        self._seg = int(existing[-1][4:10]) + 1 if existing else 0
+        self._lock = threading.Lock()
+        self._buf = bytearray()
+        self._mm: Optional[mmap.mmap] = None
+        self._file = None
+        self._idx = None
+        self._pos = 0
+        self.records = 0
+        self.closed = False
+
+    def __call__(self, event: Any) -> Any:
+        self.append(event)
+        return event
+
+    def append(self, event: Any) -> None:
+        with self._lock:
+            if self.closed:
+                raise ValueError("journal is closed")
+            if type(event) not in self.codec._ids:
+                self.codec.register(type(event))
+            if len(self.codec.event_types) != self._known:
+                self._known = len(self.codec.event_types)
+                self._write_manifest()
+            buf = self._buf
+            del buf[:]
+            buf += _HEAD.pack(0, 0)
+            self.codec.encode_into(buf, event)
+            ts = _event_ts_ns(event)
+            _HEAD.pack_into(buf, 0, len(buf) - 4, ts)
+            if self._mm is None or self._pos + len(buf) + 4 > len(self._mm):
+                self._roll(len(buf) + 4)
+            self._mm[self._pos:self._pos + len(buf)] = buf
+            self._idx.write(_IDX.pack(ts, self._pos, self.codec.type_id(type(event))))
+            self._pos += len(buf)
+            self.records += 1
+
+    def _roll(self, need: int) -> None:
+        self._seal()
+        size = max(self.segment_bytes, need)
+        name = os.path.join(self.path, _seg_name(self._seg))
+        self._seg += 1
+        self._file = open(name, "w+b")
+        self._file.truncate(size)
+        self._mm = mmap.mmap(self._file.fileno(), size)
+        self._idx = open(name[:-4] + ".idx", "ab", buffering=1 << 16)
+        self._pos = 0
+
+    def _seal(self) -> None:
+        if self._mm is None:
+            return
+        self._mm.flush()
+        self._mm.close()
+        self._file.truncate(self._pos)
+        self._file.close()
+        self._idx.close()
+        self._mm = self._file = self._idx = None
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._mm is not None:
+                self._mm.flush()
+                self._idx.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if not self.closed:
+                self._seal()
+                self.closed = True
+
+    def __enter__(self) -> "EventJournal":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _write_manifest(self) -> None:
+        names = [_type_name(c) for c in self.codec.event_types]
+        tmp = os.path.join(self.path, "manifest.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump({"version": 1, "event_types": names}, f)
+        os.replace(tmp, os.path.join(self.path, "manifest.json"))
+
+
+def _type_name(cls: type) -> str:
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+def _load_manifest(path: str) -> List[str]:
+    p = os.path.join(path, "manifest.json")
+    if not os.path.exists(p):
+        return []
+    with open(p) as f:
+        return json.load(f)["event_types"]
+
+
+def _import_event_type(name: str, path: str) -> type:
+    mod, qual = name.split(":")
+    hint = "pass an EventCodec with it registered to replay this journal"
+    if "<locals>" in qual:
+        raise ValueError(f"journal {path}: event class {name} was defined inside a function "
+                         f"and cannot be imported; {hint}")
+    try:
+        obj: Any = importlib.import_module(mod)
+        for part in qual.split("."):
+            obj = getattr(obj, part)
+    except (ImportError, AttributeError) as e:
+        raise ValueError(f"journal {path}: cannot import event class {name} ({e}); {hint}") from e
+    return obj
+
+
+def _journal_codec(path: str, codec: Optional[EventCodec]) -> EventCodec:
+    """The codec for the journal at `path`: type ids must follow its manifest.
+
+    A passed codec must register the manifest's classes in manifest order (any it lacks
+    are imported and registered after them); otherwise the manifest's classes are imported.
+    Journals are local files written by the application itself, so the default codec
+    allows pickled values (DataFrames).
+    """
+    names = _load_manifest(path)
+    if codec is None:
+        return EventCodec([_import_event_type(n, path) for n in names], allow_pickle=True)
+    have = [_type_name(c) for c in codec.event_types]
+    k = min(len(have), len(names))
+    if have[:k] != names[:k]:
+        diff = next(i for i in range(k) if have[i] != names[i])
+        raise ValueError(f"journal {path}: codec type id {diff} is {have[diff]} but the manifest "
+                         f"has {names[diff]}; register event types in manifest order")
+    for name in names[k:]:
+        codec.register(_import_event_type(name, path))
+    return codec
+
+
+class JournalReplayer:
+    """Read a journal directory through mmap and re-publish its events."""
+
+    def __init__(self, path: str, codec: Optional[EventCodec] = None):
+        self.path = path
+        self.codec = _journal_codec(path, codec)
+        self.segments: List[Tuple[mmap.mmap, np.ndarray]] = []
+        for name in sorted(f for f in os.listdir(path) if f.endswith(".evj")):
+            seg = os.path.join(path, name)
+            if os.path.getsize(seg) == 0:
+                continue
+            with open(seg, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.segments.append((mm, self._index(seg, mm)))
+
+    @staticmethod
+    def _index(seg: str, mm: mmap.mmap) -> np.ndarray:
+        idx_path = seg[:-4] + ".idx"
+        raw = b""
+        if os.path.exists(idx_path):
+            with open(idx_path, "rb") as f:
+                raw = f.read()
+        idx = np.frombuffer(raw[:len(raw) - len(raw) % INDEX_DTYPE.itemsize], dtype=INDEX_DTYPE)
+        # an index written ahead of its segment (crash before the data reached disk) is cut
+        # back to records that are really there; anything after its last entry is scanned
+        while len(idx) and (int(idx["offset"][-1]) + _HEAD.size > len(mm) or _HEAD.unpack_from(mm, int(idx["offset"][-1]))[0] == 0):
+            idx = idx[:-1]
+        pos = 0
+        if len(idx):
+            last = int(idx["offset"][-1])
+            pos = last + 4 + _HEAD.unpack_from(mm, last)[0]
+        extra = []
+        while pos + _HEAD.size <= len(mm):
+            n, ts = _HEAD.unpack_from(mm, pos)
+            if n == 0 or pos + 4 + n > len(mm):
+                break
+            extra.append((ts, pos, struct.unpack_from("<H", mm, pos + _HEAD.size)[0]))
+            pos += 4 + n
+        if extra:
+            idx = np.concatenate([idx, np.array(extra, dtype=INDEX_DTYPE)])
+        return idx
+
+    def __len__(self) -> int:
+        return sum(len(idx) for _, idx in self.segments)
+
+    @property
+    def index(self) -> np.ndarray:
+        """All index entries (ts, offset, type) in journal order."""
+        return np.concatenate([idx for _, idx in self.segments]) if self.segments else np.empty(0, INDEX_DTYPE)
+
+    def _select(self, idx: np.ndarray, start: Optional[int], end: Optional[int],
+                types: Optional[Sequence[type]]) -> np.ndarray:
+        mask = np.ones(len(idx), dtype=bool)
+        if start is not None:
+            mask &= idx["ts"] >= start
+        if end is not None:
+            mask &= idx["ts"] < end
+        if types is not None:
+            ids = [self.codec.type_id(t) for t in types if t in self.codec._ids]
+            mask &= np.isin(idx["type"], ids)
+        return np.flatnonzero(mask)
+
+    def events(self, start: Any = None, end: Any = None, types: Optional[Sequence[type]] = None) -> Iterator[Tuple[int, Any]]:
+        """(ts_ns, event) in journal order, filtered by [start, end) and event type through the index."""
+        start_ns = None if start is None else int(pd.Timestamp(start).value)
+        end_ns = None if end is None else int(pd.Timestamp(end).value)
+        decode = self.codec.decode
+        for mm, idx in self.segments:
+            rows = self._select(idx, start_ns, end_ns, types)
+            if not len(rows):
+                continue
+            offsets = idx["offset"][rows].tolist()
+            stamps = idx["ts"][rows].tolist()
+            with memoryview(mm) as view:
+                for off, ts in zip(offsets, stamps):
+                    n = _HEAD.unpack_from(mm, off)[0]
+                    yield ts, decode(view[off + _HEAD.size:off + 4 + n])
+
+    def replay(self, bus=None, speed: Optional[float] = None, start: Any = None, end: Any = None,
+               types: Optional[Sequence[type]] = None, publish: Optional[Callable[[Any], None]] = None) -> int:
+        """Publish the selected events; returns how many.
+
+        `speed=None` replays as fast as `publish` returns. `speed=k` keeps the original
+        spacing of event timestamps scaled down k times (60 replays an hour in a minute).
+        `publish` defaults to `bus.publish(event, block=True)` when the bus supports
+        blocking (core.bus.event_bus), else `bus.publish`.
+        """
+        if publish is None:
+            publish = _blocking_publish(bus)
+        n = 0
+        t0_wall = ts0 = None
+        for ts, ev in self.events(start, end, types):
+            if speed is not None:
+                if ts0 is None:
+                    ts0, t0_wall = ts, time.perf_counter()
+                delay = (ts - ts0) / 1e9 / speed - (time.perf_counter() - t0_wall)
+                if delay > 0:
+                    time.sleep(delay)
+            publish(ev)
+            n += 1
+        return n
+
+    def close(self) -> None:
+        for mm, _ in self.segments:
+            mm.close()
+        self.segments = []
+
+
+def _blocking_publish(bus) -> Callable[[Any], None]:
+    import inspect
+    try:
+        if "block" in inspect.signature(bus.publish).parameters:
+            return lambda ev: bus.publish(ev, block=True)
+    except (TypeError, ValueError):
+        pass
+    return bus.publish
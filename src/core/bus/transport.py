@@ -0,0 +1,512 @@
+# core/bus/transport.py
+"""Cross-process event transport for the event buses.
+
+Events are dataclasses; `EventCodec` packs one positionally (no field names) after a
+2-byte type id, with tagged values: ints/floats as 8 bytes, strings length-prefixed,
+datetimes / pandas Timestamps as int64 ns, enums by value (restored from the field's
+type hint, so only enum-typed fields may hold enums), and lists/dicts recursively.
+Anything else (DataFrames) is pickled only when the codec is built with
+`allow_pickle=True`; unpickling runs arbitrary code, so enable it only between
+processes that trust each other. Both ends must register the same event classes in
+the same order.
+
+`UnixSocketTransport` carries length-prefixed frames over a Unix domain socket, so a
+parked reader costs nothing and wakes on the kernel's signal, unlike a polled shared-memory
+ring. `UnixSocketHub` accepts any number of worker connections; any local user that can open
+the socket file can inject events, so the hub creates it mode 0o600 and the directory
+holding it should be private too. `TransportBridge` joins a
+transport to a bus: selected local event types are forwarded, and received events are
+re-published locally. A typical layout runs strategies in worker processes that export
+signal events to one risk/execution process:
+
+    # hub process                                    # each worker process
+    hub = UnixSocketHub(path, codec)                  t = UnixSocketTransport.connect(path, codec)
+    TransportBridge(event_bus, hub, codec,            TransportBridge(event_bus, t, codec,
+                    export=[FeaturesReady]).start()                 export=[StrategySignalGenerated]).start()
+
+A process should not both export and import the same event type (it would echo back).
+`python -m core.bus.transport` runs a local events/sec and round-trip benchmark.
+"""
+from __future__ import annotations
+
+import dataclasses
+import enum
+import os
+import pickle
+import socket
+import struct
+import threading
+import time
+import typing
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Type
+
+import numpy as np
+import pandas as pd
+
+_FRAME = struct.Struct("<I")      # frame length, excluding itself
+_TYPE = struct.Struct("<H")
+_I64 = struct.Struct("<q")
+_F64 = struct.Struct("<d")
+_U32 = struct.Struct("<I")
+_I32 = struct.Struct("<i")
+_NAIVE = -(2 ** 31)                # utc-offset sentinel for naive datetimes
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_EPOCH_NAIVE = datetime(1970, 1, 1)
+
+
+class EventCodec:
+    """Compact binary encoding for dataclass events registered with `register`.
+
+    `allow_pickle` lets values with no native tag (DataFrames, arbitrary objects) through
+    as pickles, on both encode and decode; off by default because decoding them executes
+    whatever the peer sent.
+    """
+
+    def __init__(self, event_types: Iterable[type] = (), allow_pickle: bool = False):
+        self.allow_pickle = bool(allow_pickle)
+        self._ids: Dict[type, int] = {}
+        self._types: List[Tuple[type, Tuple[str, ...], Tuple[Optional[type], ...]]] = []
+        for cls in event_types:
+            self.register(cls)
+
+    def register(self, cls: type) -> int:
+        if cls in self._ids:
+            return self._ids[cls]
+        if not dataclasses.is_dataclass(cls):
+            raise TypeError(f"{cls!r} is not a dataclass event")
+        try:
+            hints = typing.get_type_hints(cls)
+        except Exception:
+            hints = {}
+        fields = tuple(f for f in dataclasses.fields(cls) if f.init)
+        enums = tuple(h if isinstance(h, type) and issubclass(h, enum.Enum) else None
+                      for h in (hints.get(f.name) for f in fields))
+        self._ids[cls] = len(self._types)
+        self._types.append((cls, tuple(f.name for f in fields), enums))
+        return self._ids[cls]
+
+    @property
+    def event_types(self) -> Tuple[type, ...]:
+        return tuple(t[0] for t in self._types)
+
+    def encode(self, event: Any) -> bytes:
+        """One frame: length prefix, type id, then the field values in declaration order."""
+        out = bytearray(_FRAME.size)
+        self.encode_into(out, event)
+        _FRAME.pack_into(out, 0, len(out) - _FRAME.size)
+        return bytes(out)
+
+    def encode_into(self, out: bytearray, event: Any) -> None:
+        """Append a frame body (type id and values, no length prefix) to `out`."""
+        try:
+            tid = self._ids[type(event)]
+        except KeyError:
+            raise TypeError(f"{type(event).__name__} is not registered with this codec") from None
+        out += _TYPE.pack(tid)
+        _, names, enums = self._types[tid]
+        for name, enum_cls in zip(names, enums):
+            v = getattr(event, name)
+            _put(out, v.value if enum_cls is not None and isinstance(v, enum_cls) else v, self.allow_pickle)
+
+    def type_id(self, event_type: type) -> int:
+        return self._ids[event_type]
+
+    def decode(self, body: memoryview) -> Any:
+        """Decode a frame body (without its length prefix)."""
+        cls, names, enums = self._types[_TYPE.unpack_from(body, 0)[0]]
+        pos = _TYPE.size
+        kwargs = {}
+        for name, enum_cls in zip(names, enums):
+            value, pos = _get(body, pos, self.allow_pickle)
+            kwargs[name] = enum_cls(value) if enum_cls is not None and value is not None else value
+        return cls(**kwargs)
+
+
+def _put(out: bytearray, v: Any, allow_pickle: bool) -> None:
+    if v is None:
+        out += b"N"
+    elif v is True or v is False:
+        out += b"T" if v else b"F"
+    elif isinstance(v, enum.Enum):
+        # only a field's type hint says which enum to rebuild on decode
+        raise TypeError(f"{v!r} is not in an enum-typed field and would decode as {v.value!r}; "
+                        "send its .value instead")
+    elif isinstance(v, (int, np.integer)) and -2 ** 63 <= v < 2 ** 63:
+        out += b"i"; out += _I64.pack(int(v))
+    elif isinstance(v, (float, np.floating)):
+        out += b"d"; out += _F64.pack(float(v))
+    elif isinstance(v, str):
+        raw = v.encode("utf-8")
+        out += b"s"; out += _U32.pack(len(raw)); out += raw
+    elif isinstance(v, pd.Timestamp):
+        tz = "" if v.tz is None else str(v.tz)
+        raw = tz.encode("utf-8")
+        out += b"P"; out += _I64.pack(v.value); out += bytes((len(raw),)); out += raw
+    elif isinstance(v, datetime):
+        off = v.utcoffset()
+        delta = v - (_EPOCH_NAIVE if off is None else _EPOCH)
+        ns = (delta.days * 86_400 + delta.seconds) * 1_000_000_000 + delta.microseconds * 1000
+        out += b"D"; out += _I64.pack(ns); out += _I32.pack(_NAIVE if off is None else int(off.total_seconds()))
+    elif isinstance(v, (list, tuple)):
+        out += b"l" if isinstance(v, list) else b"t"; out += _U32.pack(len(v))
+        for item in v:
+            _put(out, item, allow_pickle)
+    elif type(v) is dict:
+        out += b"m"; out += _U32.pack(len(v))
+        for k, item in v.items():
+            _put(out, k, allow_pickle); _put(out, item, allow_pickle)
+    elif isinstance(v, bytes):
+        out += b"b"; out += _U32.pack(len(v)); out += v
+    else:
+        if not allow_pickle:
+            raise TypeError(f"cannot encode {type(v).__name__} without EventCodec(allow_pickle=True)")
+        raw = pickle.dumps(v, protocol=5)
+        out += b"x"; out += _U32.pack(len(raw)); out += raw
+
+
+def _get(buf: memoryview, pos: int, allow_pickle: bool) -> Tuple[Any, int]:
+    tag = buf[pos]; pos += 1
+    if tag == 0x69:    # i
+        return _I64.unpack_from(buf, pos)[0], pos + 8
+    if tag == 0x64:    # d
+        return _F64.unpack_from(buf, pos)[0], pos + 8
+    if tag == 0x73:    # s
+        n = _U32.unpack_from(buf, pos)[0]; pos += 4
+        return bytes(buf[pos:pos + n]).decode("utf-8"), pos + n
+    if tag == 0x4E:    # N
+        return None, pos
+    if tag == 0x54:    # T
+        return True, pos
+    if tag == 0x46:    # F
+        return False, pos
+    if tag == 0x50:    # P
+        ns = _I64.unpack_from(buf, pos)[0]; n = buf[pos + 8]; pos += 9
+        tz = bytes(buf[pos:pos + n]).decode("utf-8")
+        return pd.Timestamp(ns, tz="UTC").tz_convert(tz) if tz else pd.Timestamp(ns), pos + n
+    if tag == 0x44:    # D
+        ns = _I64.unpack_from(buf, pos)[0]; off = _I32.unpack_from(buf, pos + 8)[0]
+        micro = timedelta(microseconds=ns // 1000)
+        if off == _NAIVE:
+            return _EPOCH_NAIVE + micro, pos + 12
+        tz = timezone.utc if off == 0 else timezone(timedelta(seconds=off))
+        return (_EPOCH + micro).astimezone(tz), pos + 12
+    if tag in (0x6C, 0x74):    # l, t
+        n = _U32.unpack_from(buf, pos)[0]; pos += 4
+        items = []
+        for _ in range(n):
+            item, pos = _get(buf, pos, allow_pickle); items.append(item)
+        return (items if tag == 0x6C else tuple(items)), pos
+    if tag == 0x6D:    # m
+        n = _U32.unpack_from(buf, pos)[0]; pos += 4
+        d = {}
+        for _ in range(n):
+            k, pos = _get(buf, pos, allow_pickle); d[k], pos = _get(buf, pos, allow_pickle)
+        return d, pos
+    if tag == 0x62:    # b
+        n = _U32.unpack_from(buf, pos)[0]; pos += 4
+        return bytes(buf[pos:pos + n]), pos + n
+    if tag == 0x78:    # x
+        if not allow_pickle:
+            raise ValueError(f"pickled value at offset {pos - 1} rejected: codec built without allow_pickle")
+        n = _U32.unpack_from(buf, pos)[0]; pos += 4
+        return pickle.loads(buf[pos:pos + n]), pos + n
+    raise ValueError(f"unknown value tag {tag!r} at offset {pos - 1}")
+
+
+class UnixSocketTransport:
+    """One connected Unix domain socket carrying `EventCodec` frames.
+
+    `send` is safe from several threads; `recv`/iteration belongs to one reader.
+    """
+
+    def __init__(self, sock: socket.socket, codec: EventCodec, recv_size: int = 1 << 16):
+        self.sock = sock
+        self.codec = codec
+        self.recv_size = int(recv_size)
+        self._buf = bytearray()
+        self._pos = 0               # start of the first undecoded frame in _buf
+        self._send_lock = threading.Lock()
+        self.closed = False
+
+    @classmethod
+    def connect(cls, path: str, codec: EventCodec, timeout: float = 5.0) -> "UnixSocketTransport":
+        deadline = time.monotonic() + timeout
+        while True:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(path)
+                return cls(sock, codec)
+            except (FileNotFoundError, ConnectionRefusedError):
+                sock.close()
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.01)
+
+    @classmethod
+    def pair(cls, codec: EventCodec) -> Tuple["UnixSocketTransport", "UnixSocketTransport"]:
+        a, b = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+        return cls(a, codec), cls(b, codec)
+
+    def send(self, event: Any) -> None:
+        frame = self.codec.encode(event)
+        with self._send_lock:
+            self.sock.sendall(frame)
+
+    def send_many(self, events: Iterable[Any]) -> None:
+        """Encode a burst and write it with one syscall."""
+        data = b"".join(self.codec.encode(ev) for ev in events)
+        with self._send_lock:
+            self.sock.sendall(data)
+
+    def recv(self) -> Optional[Any]:
+        """Next event, blocking; None once the peer has closed."""
+        for ev in self._frames(limit=1):
+            return ev
+        return None
+
+    def __iter__(self) -> Iterator[Any]:
+        return self._frames()
+
+    def _frames(self, limit: Optional[int] = None) -> Iterator[Any]:
+        buf = self._buf
+        yielded = 0
+        while limit is None or yielded < limit:
+            pos = self._pos
+            if len(buf) - pos >= _FRAME.size:
+                end = pos + _FRAME.size + _FRAME.unpack_from(buf, pos)[0]
+                if len(buf) >= end:
+                    with memoryview(buf) as view:
+                        ev = self.codec.decode(view[pos + _FRAME.size:end])
+                    self._pos = end
+                    yielded += 1
+                    yield ev
+                    continue
+            del buf[:pos]
+            self._pos = 0
+            try:
+                chunk = self.sock.recv(self.recv_size)
+            except OSError:
+                chunk = b""
+            if not chunk:
+                return
+            buf += chunk
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+class UnixSocketHub:
+    """Listening end: accepts worker connections, broadcasts `send`, and reads every peer.
+
+    `iter_events` merges what all peers send, in arrival order per peer. The socket file
+    is made owner-only (0o600) before it starts listening.
+    """
+
+    def __init__(self, path: str, codec: EventCodec, backlog: int = 64):
+        self.path = path
+        self.codec = codec
+        if os.path.exists(path):
+            os.unlink(path)
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(path)
+        os.chmod(path, 0o600)
+        self._server.listen(backlog)
+        self.peers: List[UnixSocketTransport] = []
+        self._lock = threading.Lock()
+        self._on_event: Optional[Callable[[Any], None]] = None
+        self._accept_thread = threading.Thread(target=self._accept_loop, name="transport-accept", daemon=True)
+        self._accept_thread.start()
+
+    def _accept_loop(self) -> None:
+        while True:
+            try:
+                sock, _ = self._server.accept()
+            except OSError:
+                return
+            peer = UnixSocketTransport(sock, self.codec)
+            with self._lock:
+                self.peers.append(peer)
+            threading.Thread(target=self._read_peer, args=(peer,), name="transport-peer", daemon=True).start()
+
+    def _read_peer(self, peer: UnixSocketTransport) -> None:
+        for ev in peer:
+            if self._on_event is not None:
+                self._on_event(ev)
+        with self._lock:
+            if peer in self.peers:
+                self.peers.remove(peer)
+
+    def on_event(self, fn: Callable[[Any], None]) -> None:
+        self._on_event = fn
+
+    def wait_for_peers(self, n: int, timeout: float = 5.0) -> bool:
+        deadline = time.monotonic() + timeout
+        while len(self.peers) < n and time.monotonic() < deadline:
+            time.sleep(0.005)
+        return len(self.peers) >= n
+
+    def send(self, event: Any) -> None:
+        frame = self.codec.encode(event)
+        with self._lock:
+            peers = list(self.peers)
+        for peer in peers:
+            with peer._send_lock:
+                peer.sock.sendall(frame)
+
+    def close(self) -> None:
+        try:
+            self._server.close()
+        finally:
+            with self._lock:
+                peers, self.peers = self.peers, []
+            for peer in peers:
+                peer.close()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+
+class TransportBridge:
+    """Forward `export` event types from `bus` over `transport`; publish received events on `bus`.
+
+    `publish` overrides how received events enter the bus (e.g. a thread-safe wrapper for
+    an asyncio bus); it is called from the transport's reader thread.
+    """
+
+    def __init__(self, bus, transport, codec: EventCodec, export: Sequence[Type] = (),
+                 publish: Optional[Callable[[Any], None]] = None):
+        self.bus = bus
+        self.transport = transport
+        self.codec = codec
+        self.export = tuple(export)
+        self._publish = publish or bus.publish
+        self._reader: Optional[threading.Thread] = None
+        for cls in self.export:
+            codec.register(cls)
+        self.sent = 0
+        self.received = 0
+
+    def _forward(self, event) -> None:
+        self.transport.send(event)
+        self.sent += 1
+
+    def _deliver(self, event) -> None:
+        self.received += 1
+        self._publish(event)
+
+    def start(self) -> "TransportBridge":
+        for cls in self.export:
+            self.bus.subscribe(cls, self._forward)
+        if isinstance(self.transport, UnixSocketHub):
+            self.transport.on_event(self._deliver)
+        else:
+            self._reader = threading.Thread(target=self._read, name="transport-bridge", daemon=True)
+            self._reader.start()
+        return self
+
+    def _read(self) -> None:
+        for ev in self.transport:
+            self._deliver(ev)
+
+    def close(self) -> None:
+        self.transport.close()
+        if self._reader is not None:
+            self._reader.join(1.0)
+
+
+# -- benchmark -----------------------------------------------------------------
+
+@dataclasses.dataclass
+class _BenchSignal:
+    source: str
+    symbol: str
+    timestamp: pd.Timestamp
+    direction: int
+    strength: float
+    price: float
+    info: dict
+
+
+def _bench_event(i: int) -> _BenchSignal:
+    return _BenchSignal("bench", "BTC-USD", pd.Timestamp(1_700_000_000_000_000_000 + i, tz="UTC"),
+                        1, 0.25, 101.5, {"in_sample": True})
+
+
+def _bench_child(path: str, mode: str, n: int, batch: int) -> None:
+    codec = EventCodec([_BenchSignal])
+    t = UnixSocketTransport.connect(path, codec)
+    if mode == "throughput":
+        ev = _bench_event(0)
+        for start in range(0, n, batch):
+            t.send_many([ev] * min(batch, n - start))
+    else:
+        for ev in t:
+            t.send(ev)
+    t.close()
+
+
+def benchmark(n: int = 200_000, rtt_samples: int = 5_000, batch: int = 256) -> Dict[str, float]:
+    """One-way events/sec (worker process -> hub) and ping-pong round-trip latency."""
+    import multiprocessing as mp
+    import tempfile
+
+    codec = EventCodec([_BenchSignal])
+    frame_bytes = len(codec.encode(_bench_event(0)))
+    path = os.path.join(tempfile.mkdtemp(prefix="evt-"), "bus.sock")
+    ctx = mp.get_context("fork" if "fork" in mp.get_all_start_methods() else "spawn")
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path); server.listen(1)
+    proc = ctx.Process(target=_bench_child, args=(path, "throughput", n, batch))
+    proc.start()
+    conn = UnixSocketTransport(server.accept()[0], codec)
+    t0 = time.perf_counter()
+    got = sum(1 for _ in conn)
+    elapsed = time.perf_counter() - t0
+    proc.join(); conn.close()
+    assert got == n, (got, n)
+
+    proc = ctx.Process(target=_bench_child, args=(path, "echo", 0, 0))
+    proc.start()
+    conn = UnixSocketTransport(server.accept()[0], codec)
+    rtts = np.empty(rtt_samples)
+    for i in range(rtt_samples):
+        ev = _bench_event(i)
+        s = time.perf_counter()
+        conn.send(ev)
+        back = conn.recv()
+        rtts[i] = time.perf_counter() - s
+        assert back == ev
+    conn.close(); proc.join(); server.close(); os.unlink(path)
+
+    return {
+        "events": n,
+        "frame_bytes": frame_bytes,
+        "pickle_bytes": len(pickle.dumps(_bench_event(0), protocol=5)),
+        "events_per_sec": n / elapsed,
+        "rtt_p50_us": float(np.percentile(rtts, 50) * 1e6),
+        "rtt_p99_us": float(np.percentile(rtts, 99) * 1e6),
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    import argparse
+    import json
+    ap = argparse.ArgumentParser(description="Local Unix-socket event transport benchmark")
+    ap.add_argument("--events", type=int, default=200_000)
+    ap.add_argument("--rtt-samples", type=int, default=5_000)
+    ap.add_argument("--batch", type=int, default=256, help="events per send_many call")
+    args = ap.parse_args(argv)
+    print(json.dumps(benchmark(args.events, args.rtt_samples, args.batch), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
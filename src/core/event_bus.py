@@ -8,9 +8,15 @@ import uuid
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Any, Awaitable, Callable, DefaultDict, Dict, List, Optional, Tuple, Type, Union
-from collections import defaultdict
+from collections import OrderedDict, defaultdict, deque
+from itertools import count
 from weakref import WeakMethod, ReferenceType
 
+try:
+    from monitoring.metrics import REGISTRY, HistogramSeries
+except ImportError:  # imported as src.core
+    from ..monitoring.metrics import REGISTRY, HistogramSeries  # type: ignore
+
 logger = logging.getLogger("EventBus")
 
 try:
@@ -76,6 +82,9 @@ class _Subscription:
     once: bool = False
     filter_fn: Optional[Callable[[BaseEvent], bool]] = None
     weakref: bool = False
+    event_cls: Optional[Type[BaseEvent]] = None   # key of the list that owns it
+    active: bool = True                           # False once removed (tables in flight skip it)
+    latency: Optional[HistogramSeries] = None     # handler latency series, bound at subscribe time
 
     def resolve(self) -> HandlerT:
         if self.weakref and isinstance(self.handler, ReferenceType):
@@ -93,6 +102,24 @@ class DropPolicy:
     DROP_OLDEST = "drop_oldest"
     DROP_NEW = "drop_new"
 
+class Lane:
+    CONTROL = "control"   # orders, fills, risk, kill-switch: served first, never dropped
+    DATA = "data"         # market data: bounded, subject to the drop policy / conflation
+
+_BUS_IDS = count()
+
+# Telemetry shared by all buses, labelled by bus name. Series are created once per
+# handler / event type and kept on the bus, so dispatch only observes into them.
+HANDLER_LATENCY = REGISTRY.histogram("eventbus_handler_latency_seconds", "handler call time", ["bus", "handler"])
+EVENT_LATENCY = REGISTRY.histogram("eventbus_event_latency_seconds", "dispatch time per event type", ["bus", "event_type"])
+QUEUE_WAIT = REGISTRY.histogram("eventbus_queue_wait_seconds", "time from publish to dequeue", ["bus"])
+QUEUE_DEPTH = REGISTRY.gauge("eventbus_queue_depth", "events waiting", ["bus"])
+QUEUE_DEPTH_MAX = REGISTRY.gauge("eventbus_queue_depth_max", "queue high-water mark", ["bus"])
+QUEUE_WAIT_LAST = REGISTRY.gauge("eventbus_queue_wait_seconds_last", "time in queue of the last dequeued event", ["bus"])
+DROPPED = REGISTRY.counter("eventbus_dropped_total", "events dropped or displaced", ["bus", "policy"])
+BLOCKED = REGISTRY.counter("eventbus_blocked_total", "events that waited for room (BLOCK publishes, post)", ["bus"])
+_BUS_METRICS = (HANDLER_LATENCY, EVENT_LATENCY, QUEUE_WAIT, QUEUE_DEPTH, QUEUE_DEPTH_MAX, QUEUE_WAIT_LAST, DROPPED, BLOCKED)
+
 class EventBus:
     def __init__(
         self,
@@ -107,7 +134,17 @@ class EventBus:
         validate_schema: bool = False,
         max_retries: int = 0,
         retry_backoff: float = 0.2,
+        name: Optional[str] = None,
+        partitioned: bool = False,
+        partition_key: Union[str, Callable[[BaseEvent], Any]] = "symbol",
+        partition_batch: int = 32,
+        lanes: bool = False,
+        data_events: Tuple[Type[BaseEvent], ...] = (),
+        control_max_queue: Optional[int] = None,
+        conflate: bool = False,
+        conflate_key: Union[str, Callable[[BaseEvent], Any]] = "symbol",
     ):
+        self.name = name or f"eventbus-{next(_BUS_IDS)}"
         self.loop = loop or asyncio.get_event_loop()
         self.queue: asyncio.Queue[BaseEvent] = asyncio.Queue(maxsize=max_queue)
         self.drop_policy = drop_policy
@@ -116,6 +153,8 @@ class EventBus:
 
         self._subs: DefaultDict[Type[BaseEvent], List[_Subscription]] = defaultdict(list)
         self._subs_any: List[_Subscription] = []
+        # concrete event type -> MRO-resolved, priority-sorted subscriptions
+        self._dispatch_table: Dict[type, Tuple[_Subscription, ...]] = {}
 
         self._workers: List[asyncio.Task] = []
         self._stopped = asyncio.Event()
@@ -128,10 +167,70 @@ class EventBus:
         self.max_retries = max_retries
         self.retry_backoff = retry_backoff
 
-        self.metrics = {"published":0,"processed":0,"dropped":0,"errors":0,"latency_ms_avg":0.0}
+        self.metrics = {"published":0,"processed":0,"dropped":0,"blocked":0,"errors":0,"latency_ms_avg":0.0}
+        # queue entries are (enqueue perf_counter, event); drops are counted per policy,
+        # "middleware" for events a pre-middleware discarded. BLOCK never discards: events that
+        # wait for room count under "blocked", and as published once they are queued.
+        self._dropped_by: Dict[str, int] = {DropPolicy.DROP_OLDEST: 0, DropPolicy.DROP_NEW: 0, "middleware": 0}
+        self._depth_max = 0
+        self._wait_last = 0.0
+        self._queue_wait = QUEUE_WAIT.series(bus=self.name)
+        self._type_latency: Dict[type, HistogramSeries] = {}
+        REGISTRY.add_collector(self._collect_metrics)
+        # [item, future, conflation key] entries, in arrival order, for events that found the
+        # bus full: post() callers and BLOCK publishes. Workers move them in as room frees, so a
+        # later event never overtakes one that is waiting.
+        self._waiting: deque = deque()
+
+        # Partitioned dispatch: events are grouped per key (default: the `symbol` attribute)
+        # into FIFO mailboxes; a key hashes to one partition per initial worker, and only one
+        # worker runs a key at a time, so per-key order holds. Idle workers steal ready keys.
+        # At `max_queue` pending events post() and BLOCK publishes wait in `_waiting`, in order.
+        self.partitioned = partitioned
+        if partitioned:
+            self._key_fn = partition_key if callable(partition_key) else (lambda ev, a=partition_key: getattr(ev, a, None))
+            self.partition_batch = max(1, int(partition_batch))
+            self._partitions = max(1, workers)
+            self._mailboxes: Dict[Any, deque] = {}
+            self._ready: List[deque] = [deque() for _ in range(self._partitions)]
+            self._scheduled: set = set()   # keys that are ready or running
+            self._busy = 0
+            self._wakes: List[asyncio.Event] = []
+            self._idle: List[int] = []
+            self._pending = 0
+            self._drained = asyncio.Event(); self._drained.set()
+            self._unkeyed = count()
+            self.max_queue = max_queue
+            self.steals = 0
+
+        # Priority lanes: events of `data_events` types (or with class attribute
+        # `lane = Lane.DATA`) go on the data lane, everything else on the control lane, which
+        # workers always drain first. Each lane has `max_queue` credits (`control_max_queue`
+        # for control); `post()` awaits a credit, `publish()` applies the drop policy to data
+        # and never drops control (it waits in line). With `conflate`, a data event replaces the
+        # queued or waiting one with the same type and key (default: `symbol`), so only the
+        # latest bar per symbol waits.
+        self.lanes = lanes
+        if lanes:
+            if partitioned:
+                raise ValueError("lanes and partitioned dispatch cannot be combined: a control lane would reorder keys")
+            self.data_events = tuple(data_events)
+            self.conflate = conflate
+            self._conflate_fn = conflate_key if callable(conflate_key) else (lambda ev, a=conflate_key: getattr(ev, a, None))
+            self._lane_of_type: Dict[type, str] = {}
+            self._control: deque = deque()
+            self._data: Union[deque, "OrderedDict[Any, Tuple[float, BaseEvent]]"] = OrderedDict() if conflate else deque()
+            self._capacity = {Lane.CONTROL: control_max_queue or max_queue, Lane.DATA: max_queue}
+            self._credit_waiters: Dict[str, deque] = {Lane.CONTROL: deque(), Lane.DATA: deque()}
+            self._waiting_keys: Dict[Any, list] = {}   # conflation key -> its waiting entry
+            self._work = asyncio.Event()
+            self._busy = 0
+            self._drained = asyncio.Event(); self._drained.set()
+            self._unkeyed = count()
+            self.conflated = 0
 
         for i in range(workers):
-            self._workers.append(self.loop.create_task(self._worker(i)))
+            self._workers.append(self._start_worker(i))
 
     def add_pre_middleware(self, fn: PreMW): self._pre.append(fn)
     def add_post_middleware(self, fn: PostMW): self._post.append(fn)
@@ -152,7 +251,9 @@ class EventBus:
             is_async = inspect.iscoroutinefunction(handler)
         sub = _Subscription(
             handler=handler if not weakref else WeakMethod(handler) if inspect.ismethod(handler) else handler,
-            priority=priority, is_async=is_async, once=once, filter_fn=filter_fn, weakref=weakref
+            priority=priority, is_async=is_async, once=once, filter_fn=filter_fn, weakref=weakref,
+            event_cls=event_cls,
+            latency=HANDLER_LATENCY.series(bus=self.name, handler=getattr(handler, "__qualname__", repr(handler))),
         )
         if event_cls is BaseEvent:
             self._subs_any.append(sub)
@@ -160,6 +261,7 @@ class EventBus:
         else:
             self._subs[event_cls].append(sub)
             self._subs[event_cls].sort(key=lambda s: -s.priority)
+        self._dispatch_table.clear()
 
         if self.sticky_enabled and replay_sticky:
             for etype, ev in self._sticky.items():
@@ -172,29 +274,89 @@ class EventBus:
                 try:
                     res = s.resolve()
                 except ReferenceError:
-                    lst.remove(s); continue
+                    lst.remove(s); s.active = False; continue
                 if res == handler:
-                    lst.remove(s)
+                    lst.remove(s); s.active = False
         if event_cls is BaseEvent: _rm(self._subs_any)
-        else: _rm(self._subs[event_cls])
+        elif event_cls in self._subs: _rm(self._subs[event_cls])
+        self._dispatch_table.clear()
+
+    def handlers_for(self, event_cls: type) -> Tuple[_Subscription, ...]:
+        """Subscriptions an event of exactly `event_cls` is dispatched to, in call order.
+
+        Built once per concrete type by walking its MRO (subscriptions to BaseEvent
+        included) and sorting by priority, highest first; ties keep MRO order (most
+        specific class first), then subscription order.
+        """
+        table = self._dispatch_table.get(event_cls)
+        if table is None:
+            subs: List[_Subscription] = []
+            for klass in event_cls.__mro__:
+                if klass is BaseEvent:
+                    subs.extend(self._subs_any)
+                elif klass in self._subs:
+                    subs.extend(self._subs[klass])
+            subs.sort(key=lambda s: -s.priority)  # stable: MRO / subscription order within a priority
+            table = self._dispatch_table[event_cls] = tuple(subs)
+        return table
+
+    def _remove_subscription(self, sub: _Subscription) -> None:
+        """Drop one subscription (fired `once`, or dead weakref) from its list and the cached tables."""
+        if not sub.active:
+            return
+        sub.active = False
+        owner = self._subs_any if sub.event_cls is BaseEvent else self._subs.get(sub.event_cls, [])
+        try: owner.remove(sub)
+        except ValueError: pass
+        for etype, table in list(self._dispatch_table.items()):
+            if issubclass(etype, sub.event_cls):
+                self._dispatch_table[etype] = tuple(s for s in table if s is not sub)
 
     def publish(self, event: BaseEvent) -> None:
         ev = self._preprocess(event)
         if ev is None: return
-        try:
-            self.queue.put_nowait(ev)
+        if self.partitioned:
+            self._publish_partitioned(ev); return
+        if self.lanes:
+            self._enqueue_lane(ev, self.lane_of(ev)); return
+        item = (time.perf_counter(), ev)
+        if self._waiting or self.queue.full():
+            self._handle_full_queue(item)
+        else:
+            self.queue.put_nowait(item)
             self.metrics["published"] += 1
-        except asyncio.QueueFull:
-            self._handle_full_queue(ev)
+        self._note_depth()
 
     async def post(self, event: BaseEvent) -> None:
         ev = self._preprocess(event)
         if ev is None: return
-        try:
-            await self.queue.put(ev)
+        if self.partitioned:
+            item = (time.perf_counter(), ev)
+            if self._partitions_full(): await self._wait_in_line(self._waiting, item)
+            else: self._admit_partitioned(item)
+            return
+        if self.lanes:
+            await self._post_lane(ev, self.lane_of(ev)); return
+        item = (time.perf_counter(), ev)
+        if self._waiting or self.queue.full():
+            await self._wait_in_line(self._waiting, item)
+        else:
+            self.queue.put_nowait(item)
             self.metrics["published"] += 1
-        except asyncio.QueueFull:
-            self._handle_full_queue(ev)
+        self._note_depth()
+
+    def qsize(self) -> int:
+        """Events waiting for a worker."""
+        if self.partitioned:
+            return self._pending
+        if self.lanes:
+            return len(self._control) + len(self._data)
+        return self.queue.qsize()
+
+    def _note_depth(self) -> None:
+        depth = self.qsize()
+        if depth > self._depth_max:
+            self._depth_max = depth
 
     def publish_sync(self, event: BaseEvent) -> None:
         ev = self._preprocess(event)
@@ -213,23 +375,64 @@ class EventBus:
             ev = mw(ev)
             if ev is None:
                 self.metrics["dropped"] += 1
+                self._dropped_by["middleware"] += 1
                 return None
         if self.sticky_enabled:
             self._sticky[type(ev)] = ev
         return ev
 
-    def _handle_full_queue(self, ev: BaseEvent):
+    def _count_drop(self) -> None:
         self.metrics["dropped"] += 1
-        if self.drop_policy == "block":
-            self.loop.run_until_complete(self.queue.put(ev))
-        elif self.drop_policy == "drop_oldest":
+        self._dropped_by[self.drop_policy] = self._dropped_by.get(self.drop_policy, 0) + 1
+
+    def _handle_full_queue(self, item: Tuple[float, BaseEvent]):
+        if self.drop_policy == DropPolicy.BLOCK:
+            self._defer(self._waiting, item)
+            return
+        self._count_drop()
+        if self.drop_policy == DropPolicy.DROP_OLDEST:
             try:
                 self.queue.get_nowait()
-                self.loop.run_until_complete(self.queue.put(ev))
-            except Exception:
+                self.queue.task_done()
+                self.queue.put_nowait(item)
+                self.metrics["published"] += 1
+            except (asyncio.QueueEmpty, asyncio.QueueFull):
                 pass
         else:
-            if self.audit_logs: logger.warning("Event dropped (queue full): %s", ev.event_type)
+            if self.audit_logs: logger.warning("Event dropped (queue full): %s", item[1].event_type)
+
+    def _release_queue(self) -> None:
+        """Move waiting events onto the queue while there is room, oldest first."""
+        waiting = self._waiting
+        while waiting and not self.queue.full():
+            item, fut, _ = waiting.popleft()
+            self.queue.put_nowait(item)
+            self.metrics["published"] += 1
+            if fut is not None and not fut.done(): fut.set_result(None)
+
+    async def _wait_in_line(self, waiting: deque, item: Tuple[float, BaseEvent], key: Any = None) -> None:
+        """Queue `item` behind earlier waiters; returns once a worker has moved it onto the bus."""
+        entry = [item, self.loop.create_future(), key]
+        waiting.append(entry)
+        self.metrics["blocked"] += 1
+        if key is not None: self._waiting_keys[key] = entry
+        try:
+            await entry[1]
+        except asyncio.CancelledError:
+            try: waiting.remove(entry)
+            except ValueError: pass
+            else:
+                if key is not None: del self._waiting_keys[key]
+            raise
+
+    def _defer(self, waiting: deque, item: Tuple[float, BaseEvent], key: Any = None) -> None:
+        """BLOCK for publish(): inside the running loop the event waits in line without a caller."""
+        if self.loop.is_running():
+            waiting.append([item, None, key])
+            self.metrics["blocked"] += 1
+            if key is not None: self._waiting_keys[key] = waiting[-1]
+        else:
+            self.loop.run_until_complete(self._wait_in_line(waiting, item, key))
 
     async def request(self, event: BaseEvent, response_cls: Type[BaseEvent], timeout: float = 3.0) -> BaseEvent:
         fut: asyncio.Future = self.loop.create_future()
@@ -241,32 +444,271 @@ class EventBus:
         await self.post(event)
         return await asyncio.wait_for(fut, timeout=timeout)
 
+    def lane_of(self, ev: BaseEvent) -> str:
+        lane = self._lane_of_type.get(type(ev))
+        if lane is None:
+            lane = getattr(type(ev), "lane", None) or (Lane.DATA if issubclass(type(ev), self.data_events) else Lane.CONTROL)
+            self._lane_of_type[type(ev)] = lane
+        return lane
+
+    def _lane_len(self, lane: str) -> int:
+        return len(self._control) if lane == Lane.CONTROL else len(self._data)
+
+    def _lane_full(self, lane: str) -> bool:
+        return bool(self._credit_waiters[lane]) or 0 < self._capacity[lane] <= self._lane_len(lane)
+
+    def _conflation_key(self, ev: BaseEvent) -> Any:
+        key = self._conflate_fn(ev)
+        return (type(ev), key) if key is not None else ("", next(self._unkeyed))
+
+    def _waiting_key(self, ev: BaseEvent, lane: str) -> Any:
+        if lane != Lane.DATA or not self.conflate:
+            return None
+        key = self._conflate_fn(ev)
+        return (type(ev), key) if key is not None else None
+
+    def _conflate_into(self, item: Tuple[float, BaseEvent], lane: str) -> bool:
+        """Replace the queued or waiting data event with the same key; True if `item` was absorbed."""
+        key = self._waiting_key(item[1], lane)
+        if key is None:
+            return False
+        entry = self._waiting_keys.get(key)
+        if entry is not None:
+            entry[0] = item
+        elif key in self._data:
+            self._data[key] = item   # keeps its place in line, carries the newest event
+        else:
+            return False
+        self.conflated += 1
+        self.metrics["published"] += 1
+        return True
+
+    async def _post_lane(self, ev: BaseEvent, lane: str) -> None:
+        """Wait in line for a credit on `lane` (a conflating data event needs none), then enqueue."""
+        item = (time.perf_counter(), ev)
+        if self._conflate_into(item, lane):
+            return
+        if self._lane_full(lane):
+            await self._wait_in_line(self._credit_waiters[lane], item, self._waiting_key(ev, lane))
+        else:
+            self._put_lane(item, lane)
+
+    def _enqueue_lane(self, ev: BaseEvent, lane: str) -> None:
+        item = (time.perf_counter(), ev)
+        if self._conflate_into(item, lane):
+            return
+        if not self._lane_full(lane):
+            self._put_lane(item, lane)
+        elif lane == Lane.CONTROL:
+            if self.audit_logs: logger.warning("Control lane full (%d), %s waits for a credit", len(self._control), ev.event_type)
+            self._credit_waiters[Lane.CONTROL].append([item, None, None])
+            self.metrics["blocked"] += 1
+        else:
+            self._make_data_room(item)
+
+    def _put_lane(self, item: Tuple[float, BaseEvent], lane: str, key: Any = None) -> None:
+        if lane == Lane.CONTROL:
+            self._control.append(item)
+        elif self.conflate:
+            self._data[key if key is not None else self._conflation_key(item[1])] = item
+        else:
+            self._data.append(item)
+        self.metrics["published"] += 1
+        self._drained.clear()
+        self._work.set()
+        self._note_depth()
+
+    def _make_data_room(self, item: Tuple[float, BaseEvent]) -> None:
+        """Apply the drop policy to a full data lane."""
+        if self.drop_policy == DropPolicy.BLOCK:
+            self._defer(self._credit_waiters[Lane.DATA], item, self._waiting_key(item[1], Lane.DATA))
+            return
+        self._count_drop()
+        if self.drop_policy == DropPolicy.DROP_OLDEST and self._data:
+            if self.conflate: self._data.popitem(last=False)
+            else: self._data.popleft()
+            self._put_lane(item, Lane.DATA)
+        elif self.audit_logs:
+            logger.warning("Event dropped (data lane full): %s", item[1].event_type)
+
+    def _take_lane(self) -> Optional[Tuple[float, BaseEvent]]:
+        if self._control:
+            item, lane = self._control.popleft(), Lane.CONTROL
+        elif self._data:
+            item = self._data.popitem(last=False)[1] if self.conflate else self._data.popleft()
+            lane = Lane.DATA
+        else:
+            return None
+        waiting = self._credit_waiters[lane]
+        while waiting and not 0 < self._capacity[lane] <= self._lane_len(lane):
+            queued, fut, key = waiting.popleft()
+            if key is not None: del self._waiting_keys[key]
+            self._put_lane(queued, lane, key)
+            if fut is not None and not fut.done(): fut.set_result(None)
+        return item
+
+    async def _lane_worker(self, wid: int):
+        while not self._stopped.is_set():
+            item = self._take_lane()
+            if item is None:
+                if not self._busy: self._drained.set()
+                self._work.clear()
+                await self._work.wait()
+                continue
+            self._busy += 1
+            try:
+                await self._process(wid, *item)
+            finally:
+                self._busy -= 1
+
+    def _start_worker(self, wid: int) -> asyncio.Task:
+        if self.lanes:
+            return self.loop.create_task(self._lane_worker(wid))
+        if not self.partitioned:
+            return self.loop.create_task(self._worker(wid))
+        while len(self._wakes) <= wid:
+            self._wakes.append(asyncio.Event())
+        return self.loop.create_task(self._partition_worker(wid))
+
     async def adjust_workers(self, new_count: int):
+        """Grow or shrink the pool. With partitioning the partition count stays fixed: extra
+        workers only steal, and partitions whose owner was removed are served by stealing."""
         while len(self._workers) < new_count:
-            self._workers.append(self.loop.create_task(self._worker(len(self._workers))))
+            self._workers.append(self._start_worker(len(self._workers)))
         while len(self._workers) > new_count:
             t = self._workers.pop()
+            if self.partitioned and len(self._workers) in self._idle:
+                self._idle.remove(len(self._workers))
             t.cancel()
             try: await t
-            except Exception: pass
+            except BaseException: pass
+            if self.partitioned:
+                self._wake_for_ready()   # it may have been woken for a key it never took
+
+    def _wake_for_ready(self) -> None:
+        n = sum(map(len, self._ready))
+        while n and self._idle:
+            self._wakes[self._idle.pop()].set()
+            n -= 1
 
     async def _worker(self, wid: int):
         while not self._stopped.is_set():
-            ev = await self.queue.get()
-            start = time.perf_counter()
+            enqueued, ev = await self.queue.get()
+            if self._waiting: self._release_queue()
             try:
-                await self._dispatch_with_retry(ev)
-            except Exception as e:
-                self.metrics["errors"] += 1
-                logger.exception("Worker-%d dispatch failed: %s", wid, e)
-                if self.dlq is not None:
-                    try: self.dlq.put_nowait((ev, str(e)))
-                    except Exception: pass
+                await self._process(wid, enqueued, ev)
             finally:
                 self.queue.task_done()
-                elapsed = (time.perf_counter() - start) * 1000.0
-                a = 0.05
-                self.metrics["latency_ms_avg"] = a * elapsed + (1 - a) * self.metrics["latency_ms_avg"]
+
+    async def _process(self, wid: int, enqueued: float, ev: BaseEvent):
+        start = time.perf_counter()
+        self._wait_last = start - enqueued
+        self._queue_wait.observe(self._wait_last)
+        try:
+            await self._dispatch_with_retry(ev)
+        except Exception as e:
+            self.metrics["errors"] += 1
+            logger.exception("Worker-%d dispatch failed: %s", wid, e)
+            if self.dlq is not None:
+                try: self.dlq.put_nowait((ev, str(e)))
+                except Exception: pass
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000.0
+            a = 0.05
+            self.metrics["latency_ms_avg"] = a * elapsed + (1 - a) * self.metrics["latency_ms_avg"]
+
+    def partition_of(self, key: Any) -> int:
+        return hash(key) % self._partitions
+
+    def _partitions_full(self) -> bool:
+        return bool(self._waiting) or self._pending >= self.max_queue > 0
+
+    def _publish_partitioned(self, ev: BaseEvent) -> None:
+        item = (time.perf_counter(), ev)
+        if not self._partitions_full():
+            self._admit_partitioned(item); return
+        if self.drop_policy == DropPolicy.BLOCK:
+            self._defer(self._waiting, item); return
+        self._count_drop()
+        key = self._key_fn(ev)
+        box = self._mailboxes.get(key) if key is not None else None
+        if self.drop_policy != DropPolicy.DROP_OLDEST or not box:
+            if self.audit_logs: logger.warning("Event dropped (queue full): %s", ev.event_type)
+            return
+        box.popleft(); self._pending -= 1   # displace this key's oldest event; order is kept
+        self._admit_partitioned(item)
+
+    def _release_partitioned(self) -> None:
+        """Move waiting events onto the mailboxes while there is room, oldest first."""
+        waiting = self._waiting
+        while waiting and not self._pending >= self.max_queue > 0:
+            item, fut, _ = waiting.popleft()
+            self._admit_partitioned(item)
+            if fut is not None and not fut.done(): fut.set_result(None)
+
+    def _admit_partitioned(self, item: Tuple[float, BaseEvent]) -> None:
+        key = self._key_fn(item[1])
+        if key is None:  # unkeyed events carry no ordering constraint: spread them round-robin
+            key = ("", next(self._unkeyed))
+        box = self._mailboxes.get(key)
+        if box is None:
+            box = self._mailboxes[key] = deque()
+        box.append(item)
+        self._pending += 1
+        self._drained.clear()
+        self.metrics["published"] += 1
+        self._note_depth()
+        if key not in self._scheduled:
+            self._scheduled.add(key)
+            self._make_ready(key)
+
+    def _make_ready(self, key: Any) -> None:
+        p = self.partition_of(key)
+        self._ready[p].append(key)
+        idle = self._idle
+        if idle:
+            wid = p if p in idle else idle[-1]   # owner first, else any idle worker steals it
+            idle.remove(wid)
+            self._wakes[wid].set()
+
+    def _next_key(self, wid: int) -> Any:
+        own = self._ready[wid] if wid < self._partitions else None
+        if own:
+            return own.popleft()
+        victim = max(self._ready, key=len)
+        if victim:
+            self.steals += 1
+            return victim.pop()   # newest ready key: the owner keeps its oldest work
+        return None
+
+    async def _partition_worker(self, wid: int):
+        wake = self._wakes[wid]
+        while not self._stopped.is_set():
+            key = self._next_key(wid)
+            if key is None:
+                wake.clear()
+                self._idle.append(wid)
+                await wake.wait()
+                if wid in self._idle: self._idle.remove(wid)
+                continue
+            box = self._mailboxes[key]
+            self._busy += 1
+            try:
+                for _ in range(self.partition_batch):
+                    if not box: break
+                    enqueued, ev = box.popleft()
+                    self._pending -= 1
+                    if self._waiting: self._release_partitioned()
+                    await self._process(wid, enqueued, ev)
+            finally:
+                self._busy -= 1
+                if box:
+                    self._make_ready(key)   # batch used up: requeue behind other keys
+                else:
+                    del self._mailboxes[key]
+                    self._scheduled.discard(key)
+                if not self._pending and not self._busy:
+                    self._drained.set()
 
     async def _dispatch_with_retry(self, ev: BaseEvent):
         retries = 0
@@ -280,35 +722,37 @@ class EventBus:
                 await asyncio.sleep(backoff); backoff *= 2
 
     async def _dispatch(self, ev: BaseEvent):
-        subs: List[_Subscription] = []
-        for cls, lst in self._subs.items():
-            if isinstance(ev, cls): subs.extend(lst)
-        subs.extend(self._subs_any)
+        subs = self.handlers_for(type(ev))
+        t_event = time.perf_counter()
 
         span_ctx = None
         if _tracer is not None:  # pragma: no cover
             span_ctx = _tracer.start_span(ev.event_type)
 
         results: List[Tuple[str, Any]] = []
-        remove: List[Tuple[Type[BaseEvent], _Subscription]] = []
 
         for sub in subs:
+            if not sub.active:
+                continue
             try:
                 h = sub.resolve()
             except ReferenceError:
-                for k, lst in self._subs.items():
-                    if sub in lst: lst.remove(sub)
-                if sub in self._subs_any: self._subs_any.remove(sub)
+                self._remove_subscription(sub)
                 continue
 
             if sub.filter_fn and not sub.filter_fn(ev):
                 continue
+            if sub.once:
+                self._remove_subscription(sub)  # before awaiting, so concurrent workers cannot fire it again
 
+            t0 = time.perf_counter()
             try:
                 if sub.is_async: res = await h(ev)  # type: ignore
                 else: res = h(ev)  # type: ignore
+                sub.latency.observe(time.perf_counter() - t0)
                 results.append((getattr(h, "__name__", str(h)), res))
             except Exception as e:
+                sub.latency.observe(time.perf_counter() - t0)
                 self.metrics["errors"] += 1
                 logger.exception("Handler error (%s): %s", getattr(h, "__name__", h), e)
                 results.append((getattr(h, "__name__", str(h)), e))
@@ -316,24 +760,45 @@ class EventBus:
                     try: self.dlq.put_nowait((ev, f"handler:{getattr(h,'__name__',h)}:{e}"))
                     except Exception: pass
 
-            if sub.once: remove.append((type(ev), sub))
-
         for mw in self._post:
             try: mw(ev, results)
             except Exception as e:
                 logger.exception("post-middleware error: %s", e)
 
-        for et, sub in remove:
-            if sub in self._subs_any: self._subs_any.remove(sub)
-            else:
-                try: self._subs[et].remove(sub)
-                except ValueError: pass
-
         if span_ctx is not None:  # pragma: no cover
             try: span_ctx.end()
             except Exception: pass
 
         self.metrics["processed"] += 1
+        lat = self._type_latency.get(type(ev))
+        if lat is None:
+            lat = self._type_latency[type(ev)] = EVENT_LATENCY.series(bus=self.name, event_type=type(ev).__name__)
+        lat.observe(time.perf_counter() - t_event)
+
+    def _collect_metrics(self) -> None:
+        QUEUE_DEPTH.set(self.qsize(), bus=self.name)
+        QUEUE_DEPTH_MAX.set(self._depth_max, bus=self.name)
+        QUEUE_WAIT_LAST.set(self._wait_last, bus=self.name)
+        for policy, n in self._dropped_by.items():
+            DROPPED.set(n, bus=self.name, policy=policy)
+        BLOCKED.set(self.metrics["blocked"], bus=self.name)
+
+    def latency_quantiles(self, qs: Tuple[float, ...] = (0.5, 0.99, 0.999)) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """{"handler"|"event_type": {name: {"p50": s, "p99": s, "p999": s}}} for this bus, in seconds."""
+        def summary(series: HistogramSeries) -> Dict[str, float]:
+            return {"p" + f"{q * 100:g}".replace(".", ""): series.quantile(q) for q in qs}
+        out: Dict[str, Dict[str, Dict[str, float]]] = {"handler": {}, "event_type": {}}
+        for metric, kind in ((HANDLER_LATENCY, "handler"), (EVENT_LATENCY, "event_type")):
+            for labels, series in metric.series_items(bus=self.name):
+                if series.count:
+                    out[kind][labels[kind]] = summary(series)
+        return out
+
+    def _unregister_metrics(self) -> None:
+        """Drop this bus's collector and label sets from the shared registry."""
+        REGISTRY.remove_collector(self._collect_metrics)
+        for metric in _BUS_METRICS:
+            metric.remove(bus=self.name)
 
     async def _dispatch_one(self, ev: BaseEvent, sub: _Subscription):
         try: h = sub.resolve()
@@ -343,14 +808,20 @@ class EventBus:
         else: h(ev)  # type: ignore
 
     async def shutdown(self, timeout: float = 5.0):
+        if self.partitioned or self.lanes:
+            try: await asyncio.wait_for(self._drained.wait(), timeout=timeout)
+            except asyncio.TimeoutError: pass
         self._stopped.set()
-        try: await asyncio.wait_for(self.queue.join(), timeout=timeout)
-        except asyncio.TimeoutError: pass
+        if self.lanes: self._work.set()
+        if not (self.partitioned or self.lanes):
+            try: await asyncio.wait_for(self.queue.join(), timeout=timeout)
+            except asyncio.TimeoutError: pass
         for t in self._workers:
             t.cancel()
         await asyncio.gather(*self._workers, return_exceptions=True)
+        self._unregister_metrics()
 
-event_bus = EventBus()
+event_bus = EventBus(name="event_bus")
 
 def tracing_middleware_pre(ev: BaseEvent) -> Optional[BaseEvent]:
     logger.debug("[EVT PUBLISH] %s | src=%s | id=%s", ev.event_type, ev.source, ev.event_id)
@@ -3,6 +3,7 @@ Features:
  - ATR-based stop calculation
  - position_size_percent_risk (percent risk per trade using ATR)
  - portfolio-level risk checks (max_exposure_pct, max_open_positions)
+ - array variants (atr_from_panel, position_size_percent_risk_array) for (T x N) panels
 API (simple):
  from src.core.risk.advanced import AdvancedRisk
  risk = AdvancedRisk(cfg)
@@ -35,6 +36,15 @@ class AdvancedRisk:
         atr = tr.rolling(lookback, min_periods=1).mean()
         return atr
 
+    @staticmethod
+    def atr_from_panel(high, low, close, lookback=14):
+        """Rolling ATR for wide (time x symbol) high/low/close frames; same values as atr_from_df per column."""
+        prev_close = close.shift()
+        tr = np.fmax(np.fmax((high - low).abs().to_numpy(), (high - prev_close).abs().to_numpy()),
+                     (low - prev_close).abs().to_numpy())
+        tr = pd.DataFrame(tr, index=close.index, columns=close.columns)
+        return tr.rolling(lookback, min_periods=1).mean()
+
     def atr_stop_long(self, entry_price, atr, multiplier=3.0):
         return entry_price - multiplier * atr
 
@@ -57,3 +67,16 @@ class AdvancedRisk:
         # enforce max exposure
         max_units = (self.cfg['max_exposure_pct'] * capital) / price
         return float(max(-max_units, min(max_units, units)))
+
+    def position_size_percent_risk_array(self, price, atr, capital, pct_risk=None, stop_multiplier=3.0):
+        """Element-wise position_size_percent_risk over arrays of price/atr/capital."""
+        price = np.asarray(price, dtype=float)
+        atr = np.asarray(atr, dtype=float)
+        capital = np.asarray(capital, dtype=float)
+        pct_risk = pct_risk if pct_risk is not None else self.cfg['pct_risk_per_trade']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            units = (pct_risk * capital) / (stop_multiplier * atr + 1e-12)
+            max_units = (self.cfg['max_exposure_pct'] * capital) / price
+        valid = (price > 0) & (atr > 0) & ~(units < self.cfg['min_units'])
+        units = np.maximum(-max_units, np.minimum(max_units, units))
+        return np.where(valid, units, 0.0)
@@ -1,8 +1,9 @@
 from __future__ import annotations
 import pandas as pd
 import numpy as np
-from typing import Optional, Dict
+from typing import Optional, Dict, Union
 from datetime import datetime
+from data_layer.dtypes import DtypePolicy, apply_dtype_policy
 from core.data_normalizer import FinancialDataNormalizer, NormalizationConfig, NormalizationMethod, NaNPolicy
 
 def _try_import_yf():
@@ -12,8 +13,16 @@ def _try_import_yf():
     except Exception:
         return None
 
-def load_ohlcv(source: str = "yfinance", symbol: str = "BTC-USD", start: Optional[str] = None, end: Optional[str] = None, interval: str = "1d") -> pd.DataFrame:
-    """Load OHLCV with a standardized schema and timezone-aware index."""
+def load_ohlcv(source: str = "yfinance", symbol: str = "BTC-USD", start: Optional[str] = None, end: Optional[str] = None, interval: str = "1d",
+               dtype_policy: Union[None, str, DtypePolicy] = None) -> pd.DataFrame:
+    """Load OHLCV with a standardized schema and timezone-aware index.
+
+    `dtype_policy="compact"` returns float32 prices/volumes (see data_layer.dtypes).
+    """
+    df = _load_ohlcv(source, symbol, start, end, interval)
+    return apply_dtype_policy(df, dtype_policy) if dtype_policy is not None else df
+
+def _load_ohlcv(source: str, symbol: str, start: Optional[str], end: Optional[str], interval: str) -> pd.DataFrame:
     if source == "yfinance":
         yf = _try_import_yf()
         if yf is None:
@@ -0,0 +1,137 @@
+"""Dtype policy for price/feature panels.
+
+A `DtypePolicy` says how loaders and engines store market data:
+
+ - prices (open/high/low/close), volumes and other numeric features: float64
+   (default) or float32 under ``COMPACT``, which halves panel memory
+ - timestamps: int64 epoch-ns (``datetime64[ns]`` indexes/columns, raw int64 in
+   shared panels); coarser resolutions from the source are converted
+ - symbols: pandas ``category`` in long (timestamp, symbol, ...) frames
+
+Accumulators -- cash, positions, equity, PnL, fees -- always stay float64: the
+engines read float32 prices into float64 scalars/arrays before any arithmetic, so
+the only error a compact run adds is the rounding of each input price.
+
+Error bound (float32 panels, float64 accumulators). With unit roundoff
+u = 2**-24 (~6e-8), every stored price p32 satisfies |p32 - p| <= u|p|. Each fill
+then moves cash by at most u|notional| more than the float64 run, plus the same
+relative error on commission/slippage (<= u|notional| while costs stay below the
+notional), and marking open positions adds at most u * gross exposure. So, for
+runs with the same orders (fixed quantities, no decisions taken on price
+thresholds),
+
+    |equity32_t - equity64_t| <= u * (gross_t + 2 * sum_{fills <= t} |notional_i|)
+
+`equity_error_bound` evaluates the right-hand side; tests check it against
+float64 runs. Strategies whose sizing or entry rules depend on prices can still
+diverge once a threshold flips; compare such runs statistically, not bar by bar.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+PRICE_FIELDS = ("open", "high", "low", "close")
+VOLUME_FIELDS = ("volume",)
+
+
+@dataclass(frozen=True)
+class DtypePolicy:
+    price: str = "float64"
+    volume: str = "float64"
+    feature: str = "float64"
+    symbol: str = "category"
+    accumulator: str = "float64"   # documented invariant; engines never store cash/equity narrower
+
+    @property
+    def name(self) -> str:
+        return "float64" if self == FLOAT64 else "compact" if self == COMPACT else f"{self.price}/{self.volume}/{self.feature}"
+
+    @property
+    def panel_dtype(self) -> np.dtype:
+        """Single dtype for a (time x symbol x field) panel holding prices and volumes."""
+        return np.result_type(np.dtype(self.price), np.dtype(self.volume))
+
+    @property
+    def unit_roundoff(self) -> float:
+        """Relative rounding error of a stored price (2**-24 for float32, 2**-53 for float64)."""
+        return float(np.finfo(np.dtype(self.price)).eps) / 2.0
+
+    def column_dtype(self, column: str) -> str:
+        if column in PRICE_FIELDS:
+            return self.price
+        if column in VOLUME_FIELDS:
+            return self.volume
+        return self.feature
+
+
+FLOAT64 = DtypePolicy()
+COMPACT = DtypePolicy(price="float32", volume="float32", feature="float32")
+POLICIES: Dict[str, DtypePolicy] = {"float64": FLOAT64, "compact": COMPACT, "float32": COMPACT}
+
+
+def resolve_policy(policy: Union[None, str, DtypePolicy]) -> DtypePolicy:
+    """None -> FLOAT64; "float64" / "compact" / "float32" -> preset; a DtypePolicy passes through."""
+    if policy is None:
+        return FLOAT64
+    if isinstance(policy, DtypePolicy):
+        return policy
+    try:
+        return POLICIES[str(policy).lower()]
+    except KeyError:
+        raise ValueError(f"dtype policy must be one of {sorted(POLICIES)} or a DtypePolicy, got {policy!r}") from None
+
+
+def apply_dtype_policy(df: pd.DataFrame, policy: Union[None, str, DtypePolicy] = None) -> pd.DataFrame:
+    """Cast an OHLCV/feature frame to the policy; returns `df` itself when nothing changes.
+
+    Float and integer columns become price/volume/feature dtypes (booleans are left alone),
+    a ``symbol`` column becomes categorical, and datetime index/``timestamp`` columns
+    are brought to ns resolution.
+    """
+    policy = resolve_policy(policy)
+    casts = {}
+    for col in df.columns:
+        dt = df[col].dtype
+        if col == "symbol":
+            if policy.symbol and str(dt) != policy.symbol:
+                casts[col] = policy.symbol
+        elif pd.api.types.is_float_dtype(dt) or (pd.api.types.is_integer_dtype(dt) and col in VOLUME_FIELDS + PRICE_FIELDS):
+            target = policy.column_dtype(str(col))
+            if np.dtype(dt) != np.dtype(target):
+                casts[col] = target
+    out = df.astype(casts) if casts else df
+    if isinstance(out.index, pd.DatetimeIndex) and out.index.unit != "ns":
+        out = out.copy(deep=False) if out is df else out
+        out.index = out.index.as_unit("ns")
+    if "timestamp" in out.columns and pd.api.types.is_datetime64_any_dtype(out["timestamp"]) and out["timestamp"].dt.unit != "ns":
+        out = out.copy(deep=False) if out is df else out
+        out["timestamp"] = out["timestamp"].dt.as_unit("ns")
+    return out
+
+
+def frame_nbytes(frames: Union[pd.DataFrame, Dict[str, pd.DataFrame]]) -> int:
+    """Deep memory footprint of a frame or {symbol: frame} dict, index included."""
+    if isinstance(frames, pd.DataFrame):
+        frames = {"": frames}
+    return int(sum(df.memory_usage(index=True, deep=True).sum() for df in frames.values()))
+
+
+def equity_error_bound(gross_exposure: Union[pd.Series, np.ndarray], fill_notional: Union[pd.Series, np.ndarray],
+                       policy: Union[None, str, DtypePolicy] = COMPACT,
+                       fill_bar: Optional[np.ndarray] = None) -> np.ndarray:
+    """Per-bar bound on |equity(policy) - equity(float64)|: u * (gross_t + 2 * cumulative |notional|).
+
+    `gross_exposure` is the per-bar gross position value of the float64 run; `fill_notional`
+    is either per-bar traded notional (same length) or per-fill notional with `fill_bar`
+    giving each fill's bar position.
+    """
+    u = resolve_policy(policy).unit_roundoff
+    gross = np.abs(np.asarray(gross_exposure, dtype=float))
+    notional = np.abs(np.asarray(fill_notional, dtype=float))
+    if fill_bar is not None:
+        notional = np.bincount(np.asarray(fill_bar, dtype=np.int64), weights=notional, minlength=gross.size)
+    return u * (gross + 2.0 * np.cumsum(notional))
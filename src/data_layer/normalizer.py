@@ -4,6 +4,8 @@ from typing import Any, Iterable, List, Optional, Sequence, Union
 import pandas as pd
 import numpy as np
 
+from .dtypes import DtypePolicy, apply_dtype_policy
+
 OHLCV_COLS = ["timestamp","open","high","low","close","volume"]
 
 def _from_ccxt_list(rows: Sequence[Sequence[Any]]) -> pd.DataFrame:
@@ -59,10 +61,13 @@ def normalize_ohlcv(
     source: str = "generic",
     symbol: Optional[str] = None,
     timeframe: Optional[str] = None,
+    dtype_policy: Union[None, str, DtypePolicy] = None,
 ) -> pd.DataFrame:
     """Normalize various OHLCV inputs into a standard dataframe.
 
     Output columns: timestamp (UTC tz-aware), [symbol], open, high, low, close, volume
+    With `dtype_policy` (e.g. "compact") prices/volumes, timestamps and symbol are cast per
+    `data_layer.dtypes`.
     """
     if isinstance(data, pd.DataFrame):
         df = data.copy()
@@ -113,4 +118,6 @@ def normalize_ohlcv(
     # remove duplicates
     subset = ["timestamp"] + (["symbol"] if "symbol" in df.columns else [])
     df = df.drop_duplicates(subset=subset, keep="last").reset_index(drop=True)
+    if dtype_policy is not None:
+        df = apply_dtype_policy(df, dtype_policy)
     return df
@@ -1,14 +1,26 @@
 
 from __future__ import annotations
 import pandas as pd
-from schemas.events import Event
+from schemas.events import LightEvent
+from schemas.bars import BarBatch
 
 class DataReplayer:
-    def __init__(self, df: pd.DataFrame, source: str = "replayer"):
-        self.df = df.sort_values("timestamp")
+    def __init__(self, df: pd.DataFrame, source: str = "replayer", batch_size: int = 65_536):
+        self.df = df.sort_values("timestamp", kind="stable")
+        self.source = source
+        self.batch_size = int(batch_size)
 
-    def run_sync(self, bus):
+    def run_sync(self, bus) -> int:
+        """Publish every bar on MARKET_DATA; returns the number of bars.
+
+        Buses with `publish_batch` get columnar `BarBatch`es of up to `batch_size` bars
+        (per-bar subscribers still see one event per bar); others get one event per row.
+        """
+        if hasattr(bus, "publish_batch"):
+            for batch in BarBatch.from_frame(self.df, source=self.source).split(self.batch_size):
+                bus.publish_batch("MARKET_DATA", batch)
+            return len(self.df)
         for _, row in self.df.iterrows():
             bar = {"t": row["timestamp"].isoformat(), "o": float(row["open"]), "h": float(row["high"]), "l": float(row["low"]), "c": float(row["close"]), "v": float(row["volume"])}
-            ev = Event.create("MARKET_DATA", "replayer", {"symbol": row["symbol"], "bar": bar})
-            bus.publish("MARKET_DATA", ev.asdict())
+            bus.publish("MARKET_DATA", LightEvent.create("MARKET_DATA", self.source, {"symbol": row["symbol"], "bar": bar}))
+        return len(self.df)
@@ -0,0 +1,246 @@
+"""Shared-memory price/feature panels for worker processes.
+
+`SharedPanel.publish` aligns a {symbol: DataFrame} dict once into a
+(time x symbol x field) array, in POSIX shared memory (`multiprocessing.shared_memory`)
+or in a memory-mapped file. Only the small, picklable `SharedPanelHandle` is sent
+to workers; `SharedPanel.attach` maps the same pages read-only and rebuilds
+per-symbol DataFrames as views, without copying the data.
+
+    with SharedPanel.publish(prices) as panel:
+        engine = BacktestEngine(panel.handle, mode="array")   # or pass panel.handle to a pool
+
+The publisher owns the memory: `close()` (or leaving the `with` block) unlinks it.
+"""
+from __future__ import annotations
+
+import os
+import tempfile
+import uuid
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .dtypes import DtypePolicy, resolve_policy
+
+DEFAULT_FIELDS = ("open", "high", "low", "close", "volume")
+BACKENDS = ("shm", "memmap")
+
+# attached panels per process, so repeated folds in one worker map the segment once
+_ATTACHED: Dict[str, "SharedPanel"] = {}
+
+
+@dataclass(frozen=True)
+class SharedPanelHandle:
+    """Picklable description of a published panel (no data)."""
+    name: str                  # shm name, or memmap file path
+    backend: str
+    shape: Tuple[int, int, int]
+    dtype: str
+    symbols: Tuple[str, ...]
+    fields: Tuple[str, ...]
+    tz: Optional[str] = None
+    index_name: Optional[str] = None
+
+    @property
+    def index_key(self) -> str:
+        return self.name + ".ts" if self.backend == "memmap" else self.name + "_ts"
+
+
+@dataclass(frozen=True)
+class PanelSlice:
+    """Picklable row range of one symbol in a shared panel; `frame()` resolves it in the worker."""
+    handle: SharedPanelHandle
+    symbol: str
+    start: int
+    stop: int
+
+    def frame(self) -> pd.DataFrame:
+        return SharedPanel.attach(self.handle).frame(self.symbol).iloc[self.start:self.stop]
+
+
+def as_frame(data: Union[pd.DataFrame, PanelSlice]) -> pd.DataFrame:
+    """Resolve a PanelSlice to its DataFrame view; DataFrames pass through."""
+    return data.frame() if isinstance(data, PanelSlice) else data
+
+
+class SharedPanel:
+    def __init__(self, handle: SharedPanelHandle, array: np.ndarray, timestamps: np.ndarray,
+                 owner: bool, segments: tuple = ()) -> None:
+        self.handle = handle
+        self.array = array              # (T, N, F)
+        self._timestamps = timestamps   # int64 ns since epoch (UTC)
+        self._owner = owner
+        self._segments = segments       # SharedMemory objects kept alive with the views
+        self._index: Optional[pd.DatetimeIndex] = None
+
+    # ---------------------- Publish / attach ----------------------
+    @classmethod
+    def publish(cls, price_data: Dict[str, pd.DataFrame], fields: Iterable[str] = DEFAULT_FIELDS,
+                backend: str = "shm", join: str = "inner", dtype=np.float64,
+                directory: Optional[str] = None) -> "SharedPanel":
+        """Align `price_data` on a common index (inner/outer join) and publish it once.
+
+        `dtype` may also be a `data_layer.dtypes` policy (e.g. "compact" for float32 pages).
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"backend must be one of {BACKENDS}, got {backend!r}")
+        if not price_data:
+            raise ValueError("price_data must be a non-empty dict of symbol->DataFrame")
+        fields = tuple(fields)
+        symbols = tuple(price_data.keys())
+        index = None
+        for sym, df in price_data.items():
+            if not isinstance(df.index, pd.DatetimeIndex):
+                raise TypeError(f"{sym}: index must be DatetimeIndex")
+            missing = set(fields) - set(df.columns)
+            if missing:
+                raise ValueError(f"{sym}: missing columns: {missing}")
+            index = df.index if index is None else (index.intersection(df.index) if join == "inner" else index.union(df.index))
+        index = index.sort_values()
+        tz = str(index.tz) if index.tz is not None else None
+        ts = (index.tz_convert("UTC") if tz else index).asi8
+
+        shape = (len(index), len(symbols), len(fields))
+        dtype = resolve_policy(dtype).panel_dtype if isinstance(dtype, DtypePolicy) or (isinstance(dtype, str) and dtype.lower() == "compact") else np.dtype(dtype)
+        name = f"panel_{os.getpid()}_{uuid.uuid4().hex[:12]}"
+        if backend == "memmap":
+            name = os.path.join(directory or tempfile.gettempdir(), name + ".bin")
+        handle = SharedPanelHandle(name=name, backend=backend, shape=shape, dtype=dtype.str,
+                                   symbols=symbols, fields=fields, tz=tz, index_name=index.name)
+        array, stamps, segments = cls._map(handle, create=True)
+        for j, sym in enumerate(symbols):
+            array[:, j, :] = price_data[sym].reindex(index)[list(fields)].to_numpy(dtype=dtype)
+        stamps[:] = ts
+        if backend == "memmap":
+            array.flush()
+            stamps.flush()
+        panel = _ATTACHED[handle.name] = cls(handle, array, stamps, owner=True, segments=segments)
+        return panel
+
+    @classmethod
+    def attach(cls, handle: Union[SharedPanelHandle, "SharedPanel"]) -> "SharedPanel":
+        """Map a published panel read-only (cached per process; the publisher gets its own panel back)."""
+        if isinstance(handle, SharedPanel):
+            return handle
+        panel = _ATTACHED.get(handle.name)
+        if panel is None:
+            array, stamps, segments = cls._map(handle, create=False)
+            array.flags.writeable = False
+            stamps.flags.writeable = False
+            panel = _ATTACHED[handle.name] = cls(handle, array, stamps, owner=False, segments=segments)
+        return panel
+
+    @staticmethod
+    def _map(handle: SharedPanelHandle, create: bool):
+        dtype = np.dtype(handle.dtype)
+        n_values = int(np.prod(handle.shape))
+        if handle.backend == "memmap":
+            mode = "w+" if create else "r"
+            array = np.memmap(handle.name, dtype=dtype, mode=mode, shape=handle.shape)
+            stamps = np.memmap(handle.index_key, dtype=np.int64, mode=mode, shape=(handle.shape[0],))
+            return array, stamps, ()
+        seg = _open_shm(handle.name, create, max(n_values * dtype.itemsize, 1))
+        ts_seg = _open_shm(handle.index_key, create, max(handle.shape[0] * 8, 1))
+        # frombuffer keeps a buffer export, so the mapping cannot be unmapped under live views
+        array = np.frombuffer(seg.buf, dtype=dtype, count=n_values).reshape(handle.shape)
+        stamps = np.frombuffer(ts_seg.buf, dtype=np.int64, count=handle.shape[0])
+        return array, stamps, (seg, ts_seg)
+
+    # ---------------------- Views ----------------------
+    @property
+    def symbols(self) -> Tuple[str, ...]:
+        return self.handle.symbols
+
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        return self.handle.fields
+
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        if self._index is None:
+            # the index is small: own a copy so it can outlive the mapping inside results
+            idx = pd.DatetimeIndex(self._timestamps.copy().view("M8[ns]"), name=self.handle.index_name)
+            self._index = idx.tz_localize("UTC").tz_convert(self.handle.tz) if self.handle.tz else idx
+        return self._index
+
+    def frame(self, symbol: str) -> pd.DataFrame:
+        """(time x field) DataFrame view of one symbol."""
+        j = self.handle.symbols.index(symbol)
+        return pd.DataFrame(self.array[:, j, :], index=self.index, columns=list(self.fields), copy=False)
+
+    def frames(self) -> Dict[str, pd.DataFrame]:
+        return {sym: self.frame(sym) for sym in self.symbols}
+
+    def slice(self, symbol: str, start: int, stop: int) -> PanelSlice:
+        return PanelSlice(self.handle, symbol, int(start), int(stop))
+
+    # ---------------------- Lifecycle ----------------------
+    def close(self) -> None:
+        """Drop this process' mapping; the publisher also removes the shared segment/files."""
+        _ATTACHED.pop(self.handle.name, None)
+        self.array = self._timestamps = None
+        self._index = None
+        for seg in self._segments:
+            try:
+                seg.close()
+            except BufferError:
+                # DataFrame views are still alive: hand the mapping over to them (it is
+                # unmapped when the last view is collected) and just release the descriptor
+                seg._buf = seg._mmap = None
+                seg.close()
+            if self._owner:
+                seg.unlink()
+        self._segments = ()
+        if self._owner and self.handle.backend == "memmap":
+            for path in (self.handle.name, self.handle.index_key):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def __enter__(self) -> "SharedPanel":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __reduce__(self):
+        # pickling a panel only ships the handle; the receiver re-attaches
+        return (SharedPanel.attach, (self.handle,))
+
+
+def _open_shm(name: str, create: bool, size: int) -> shared_memory.SharedMemory:
+    if create:
+        return shared_memory.SharedMemory(name=name, create=True, size=size)
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python >= 3.13
+    except TypeError:
+        seg = shared_memory.SharedMemory(name=name)
+        # readers must not let the resource tracker unlink the publisher's segment at exit
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(seg._name, "shared_memory")
+        except Exception:
+            pass
+        return seg
+
+
+def resolve_price_data(data) -> Tuple[Dict[str, pd.DataFrame], Optional[SharedPanel]]:
+    """Accept a {symbol: DataFrame} dict, a SharedPanel or a SharedPanelHandle."""
+    if isinstance(data, (SharedPanel, SharedPanelHandle)):
+        panel = SharedPanel.attach(data)
+        return panel.frames(), panel
+    return data, None
+
+
+def resolve_single_frame(data, symbol: Optional[str] = None) -> Tuple[pd.DataFrame, Optional[SharedPanel], Optional[str]]:
+    """Single-asset entry points: a DataFrame, or one symbol of a shared panel."""
+    if isinstance(data, (SharedPanel, SharedPanelHandle)):
+        panel = SharedPanel.attach(data)
+        if symbol is None:
+            if len(panel.symbols) != 1:
+                raise ValueError("symbol is required for a multi-symbol shared panel")
+            symbol = panel.symbols[0]
+        return panel.frame(symbol), panel, symbol
+    return data, None, None
@@ -2,9 +2,11 @@
 from __future__ import annotations
 import os
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Union
 import pandas as pd
 
+from .dtypes import DtypePolicy, apply_dtype_policy
+
 try:
     import pyarrow  # noqa: F401
     _HAS_PARQUET = True
@@ -31,12 +33,14 @@ class DataStorage:
             df.to_csv(p, index=False)
         return p
 
-    def read(self, symbol: str, timeframe: str) -> pd.DataFrame:
+    def read(self, symbol: str, timeframe: str, dtype_policy: Union[None, str, DtypePolicy] = None) -> pd.DataFrame:
         # try parquet then csv
         p_parq = self._file_path(symbol, timeframe, "parquet")
         p_csv  = self._file_path(symbol, timeframe, "csv")
         if p_parq.exists():
-            return pd.read_parquet(p_parq)
-        if p_csv.exists():
-            return pd.read_csv(p_csv, parse_dates=["timestamp"])
-        return pd.DataFrame()
+            df = pd.read_parquet(p_parq)
+        elif p_csv.exists():
+            df = pd.read_csv(p_csv, parse_dates=["timestamp"])
+        else:
+            return pd.DataFrame()
+        return apply_dtype_policy(df, dtype_policy) if dtype_policy is not None else df
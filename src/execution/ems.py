@@ -2,7 +2,7 @@
 from __future__ import annotations
 from typing import Dict, Any
 import uuid
-from schemas.events import Event
+from schemas.events import LightEvent
 
 class EMS:
     def __init__(self, bus, default_algo: str = "TWAP", bars_per_parent: int = 1):
@@ -14,4 +14,4 @@ class EMS:
         if not sig: return
         coid = str(uuid.uuid4())
         order = {"client_order_id": coid, "symbol": sig["symbol"], "side": sig["side"], "qty": sig.get("size", 0.1)}
-        self.bus.publish("ORDER_NEW", Event.create("ORDER","ems", {"order": order}).asdict())
+        self.bus.publish("ORDER_NEW", LightEvent.create("ORDER","ems", {"order": order}))
@@ -1,7 +1,7 @@
 
 from __future__ import annotations
 from typing import Dict, Any
-from schemas.events import Event
+from schemas.events import LightEvent
 
 class ExchangeGatewaySim:
     def __init__(self, bus):
@@ -12,4 +12,4 @@ class ExchangeGatewaySim:
         order = ev.get("payload", {}).get("order")
         if not order: return
         ack = {"client_order_id": order.get("client_order_id"), "status":"ACK"}
-        self.bus.publish("ORDER_ACK", Event.create("ORDER","gw_sim", {"ack": ack}).asdict())
+        self.bus.publish("ORDER_ACK", LightEvent.create("ORDER","gw_sim", {"ack": ack}))
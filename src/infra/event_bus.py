@@ -6,10 +6,30 @@ from collections import defaultdict
 class EventBus:
     def __init__(self):
         self.subs: Dict[str, List[Callable[[Dict[str, Any]], None]]] = defaultdict(list)
+        self._batch_handlers: set = set()  # handlers that take a BarBatch whole
 
-    def subscribe(self, topic: str, handler):
+    def subscribe(self, topic: str, handler, batch: bool = False):
+        """`batch=True` handlers receive `publish_batch` batches whole; others get them unrolled per bar."""
         self.subs[topic].append(handler)
+        if batch:
+            self._batch_handlers.add(handler)
 
     def publish(self, topic: str, event: Dict[str, Any]):
         for h in list(self.subs.get(topic, [])):
             h(event)
+
+    def publish_batch(self, topic: str, batch) -> None:
+        """Deliver a `schemas.bars.BarBatch`. Handlers run in subscription order; each run of
+        consecutive per-bar handlers sees the bars one by one, exactly as with `publish`."""
+        run: List[Callable] = []
+        for h in list(self.subs.get(topic, [])) + [None]:
+            if h is not None and h not in self._batch_handlers:
+                run.append(h)
+                continue
+            if run:
+                for ev in batch.events(topic):
+                    for legacy in run:
+                        legacy(ev)
+                run = []
+            if h is not None:
+                h(batch)
@@ -2,7 +2,7 @@
 from __future__ import annotations
 from typing import Dict, Any, List
 import pandas as pd
-from schemas.events import Event
+from schemas.events import LightEvent
 
 class AlertManager:
     def __init__(self, bus, dd_threshold: float = 0.1, risk_reject_streak: int = 5):
@@ -18,4 +18,4 @@ class AlertManager:
         dd = (df["equity"] / df["equity"].cummax() - 1.0).iloc[-1]
         if dd <= -abs(self.dd_threshold):
             alert = {"type":"DRAWDOWN", "severity":"CRITICAL", "drawdown": float(dd), "t": t}
-            self.bus.publish("ALERT", Event.create("ALERT","alerts", {"alert": alert}).asdict())
+            self.bus.publish("ALERT", LightEvent.create("ALERT","alerts", {"alert": alert}))
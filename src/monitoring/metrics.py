@@ -1,8 +1,13 @@
 from __future__ import annotations
-from typing import Dict, Tuple, Any, Optional, List
+from typing import Dict, Tuple, Any, Optional, List, Sequence, Callable
+from bisect import bisect_left
+import math
 import threading
+import weakref
 
 class _Metric:
+    kind = "gauge"
+
     def __init__(self, name: str, description: str = "", labels: Optional[List[str]] = None):
         self.name = name; self.description = description; self.labels = labels or []
         self._lock = threading.Lock(); self._samples: Dict[Tuple[Any, ...], float] = {}
@@ -10,30 +15,157 @@ class _Metric:
     def _key(self, label_values: Dict[str, Any]) -> Tuple[Any, ...]:
         return tuple(label_values.get(k) for k in self.labels)
 
+    def _matches(self, k: Tuple[Any, ...], label_values: Dict[str, Any]) -> bool:
+        return all(k[self.labels.index(lab)] == v for lab, v in label_values.items())
+
+    def _label_text(self, k: Tuple[Any, ...], extra: str = "") -> str:
+        parts = [f'{lab}="{k[i] if i < len(k) else ""}"' for i, lab in enumerate(self.labels)]
+        if extra: parts.append(extra)
+        return f"{{{','.join(parts)}}}" if parts else ""
+
     def inc(self, value: float = 1.0, **label_values):
         with self._lock:
             k = self._key(label_values); self._samples[k] = self._samples.get(k, 0.0) + float(value)
 
+    def set(self, value: float, **label_values):
+        with self._lock:
+            self._samples[self._key(label_values)] = float(value)
+
+    def remove(self, **label_values) -> None:
+        """Drop every label set matching `label_values` (e.g. all samples of one bus)."""
+        with self._lock:
+            for k in [k for k in self._samples if self._matches(k, label_values)]:
+                del self._samples[k]
+
     def export_prom(self) -> str:
-        lines = [f"# TYPE {self.name} gauge"]
+        lines = [f"# TYPE {self.name} {self.kind}"]
         with self._lock:
             for k, v in self._samples.items():
-                if not self.labels:
-                    lines.append(f"{self.name} {v}")
-                else:
-                    parts = []
-                    for i, lab in enumerate(self.labels):
-                        val = k[i] if i < len(k) else ""
-                        parts.append(f'{lab}="{val}"')
-                    lines.append(f"{self.name}{{{','.join(parts)}}} {v}")
+                lines.append(f"{self.name}{self._label_text(k)} {v}")
+        return "\n".join(lines)
+
+class Counter(_Metric):
+    """Monotonic total; exported with the Prometheus counter type."""
+    kind = "counter"
+
+# 1us .. ~134s in quarter-octave steps: any quantile is reported within +19% of the true value
+LATENCY_BUCKETS: Tuple[float, ...] = tuple(1e-6 * 2.0 ** (i / 4.0) for i in range(4 * 27 + 1))
+
+class HistogramSeries:
+    """Counts for one label set. Buckets are preallocated; `observe` is a bisect and two adds."""
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)   # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (nan when empty, inf past the last bucket)."""
+        if not self.count:
+            return math.nan
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                return self.bounds[i] if i < len(self.bounds) else math.inf
+        return math.inf
+
+    def reset(self) -> None:
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+class Histogram(_Metric):
+    """Prometheus-style histogram. Hot paths hold on to `series(...)` and call `observe` on it."""
+    def __init__(self, name: str, description: str = "", labels: Optional[List[str]] = None,
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, description, labels)
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+        self._series: Dict[Tuple[Any, ...], HistogramSeries] = {}
+
+    def series(self, **label_values) -> HistogramSeries:
+        k = self._key(label_values)
+        s = self._series.get(k)
+        if s is None:
+            with self._lock:
+                s = self._series.setdefault(k, HistogramSeries(self.buckets))
+        return s
+
+    def observe(self, value: float, **label_values):
+        self.series(**label_values).observe(value)
+
+    def quantile(self, q: float, **label_values) -> float:
+        return self.series(**label_values).quantile(q)
+
+    def series_items(self, **label_values) -> List[Tuple[Dict[str, Any], HistogramSeries]]:
+        """(labels, series) for every label set matching `label_values`."""
+        with self._lock:
+            items = list(self._series.items())
+        return [(dict(zip(self.labels, k)), s) for k, s in items if self._matches(k, label_values)]
+
+    def remove(self, **label_values) -> None:
+        with self._lock:
+            for k in [k for k in self._series if self._matches(k, label_values)]:
+                del self._series[k]
+
+    def export_prom(self) -> str:
+        lines = [f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = list(self._series.items())
+        for k, s in items:
+            cum = 0
+            for bound, c in zip(self.buckets + (math.inf,), list(s.counts)):
+                cum += c
+                le = "+Inf" if bound == math.inf else f"{bound:.6g}"
+                lines.append(self.name + "_bucket" + self._label_text(k, 'le="%s"' % le) + f" {cum}")
+            lines.append(f"{self.name}_sum{self._label_text(k)} {s.sum}")
+            lines.append(f"{self.name}_count{self._label_text(k)} {s.count}")
         return "\n".join(lines)
 
 class Registry:
-    def __init__(self): self.metrics: Dict[str, _Metric] = {}
-    def counter(self, name: str, description: str = "", labels: Optional[List[str]] = None) -> _Metric:
+    def __init__(self):
+        self.metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Optional[Callable[[], None]]]] = []
+
+    def counter(self, name: str, description: str = "", labels: Optional[List[str]] = None) -> Counter:
+        if name not in self.metrics: self.metrics[name] = Counter(name, description, labels)
+        return self.metrics[name]  # type: ignore[return-value]
+
+    def gauge(self, name: str, description: str = "", labels: Optional[List[str]] = None) -> _Metric:
         if name not in self.metrics: self.metrics[name] = _Metric(name, description, labels)
         return self.metrics[name]
+
+    def histogram(self, name: str, description: str = "", labels: Optional[List[str]] = None,
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        if name not in self.metrics: self.metrics[name] = Histogram(name, description, labels, buckets)
+        return self.metrics[name]  # type: ignore[return-value]
+
+    def add_collector(self, fn: Callable[[], None]) -> None:
+        """Run `fn` before each export to refresh gauges; bound methods are held weakly."""
+        ref = weakref.WeakMethod(fn) if hasattr(fn, "__self__") else (lambda fn=fn: fn)
+        self._collectors.append(ref)
+
+    def remove_collector(self, fn: Callable[[], None]) -> None:
+        self._collectors = [ref for ref in self._collectors if ref() not in (fn, None)]
+
+    def collect(self) -> None:
+        alive = []
+        for ref in self._collectors:
+            fn = ref()
+            if fn is not None:
+                fn(); alive.append(ref)
+        self._collectors = alive
+
     def to_prometheus_text(self) -> str:
+        self.collect()
         return "\n".join([m.export_prom() for m in self.metrics.values()])
 
 REGISTRY = Registry()
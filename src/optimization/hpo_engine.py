@@ -1,16 +1,19 @@
 # src/optimization/hpo_engine.py
-from typing import Type
+from typing import Optional, Type
 import numpy as np, pandas as pd, optuna, json
 from pathlib import Path
 from ..strategies.base import Strategy
 from ..strategies.xgboost_strategy import XGBoostStrategy
-from ..backtest.wf_engine import WalkForwardEngine, BacktestEngine
+from ..backtest.wf_engine import WalkForwardEngine
+from ..backtest.result_cache import ResultCache
 
 class HPOEngine:
-    def __init__(self, storage: str = "sqlite:///hpo.db"):
+    def __init__(self, storage: str = "sqlite:///hpo.db", metric: Optional[str] = None,
+                 cache: Optional[ResultCache] = None):
         self.storage = storage
+        self.cache = cache  # re-sampled parameter sets reuse cached WF reports
         cfg = json.loads(Path("config/config.json").read_text())
-        self.metric_key = cfg.get("HPO_METRIC", "sharpe")
+        self.metric_key = metric or cfg.get("HPO_METRIC", "sharpe")
         self.n_trials = int(cfg.get("HPO_TRIALS", 50))
         self.timeout = int(cfg.get("HPO_TIMEOUT", 0))
 
@@ -24,8 +27,9 @@ class HPOEngine:
         def objective(trial):
             params = strategy_class.suggest_hyperparameters(trial)
             strat = strategy_class(**params)
-            wf = WalkForwardEngine(BacktestEngine)
+            wf = WalkForwardEngine(cache=self.cache)
             rep = wf.run(strat, data)
+            trial.set_user_attr("cache", rep.metadata.get("cache", "off"))
             return self._metric_from_report(rep)
 
         study.optimize(objective, n_trials=self.n_trials, timeout=(self.timeout if self.timeout>0 else None))
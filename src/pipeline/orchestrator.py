@@ -1,10 +1,11 @@
 from __future__ import annotations
 import pandas as pd
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from data.loader import load_ohlcv, normalize_ohlcv
 from features.feature_pipeline import build_features, build_target
 from core.strategies.ai_unified import AIUnifiedStrategy
 from backtesting.adapter import run_backtest_adapter
+from core.backtest_incremental import IncrementalStore, incremental_key
 
 def _cfg_get(cfg, path: str, default):
     cur = cfg
@@ -14,10 +15,15 @@ def _cfg_get(cfg, path: str, default):
             return default
     return cur
 
-def run_pipeline(strategy: str, params: Dict[str, Any], cfg) -> tuple[pd.DataFrame, Dict[str, Any]]:
+def run_pipeline(strategy: str, params: Dict[str, Any], cfg, incremental: bool = False,
+                 state_dir: Optional[str] = None) -> tuple[pd.DataFrame, Dict[str, Any]]:
     """Used by UI: loads data -> features -> signals -> backtest -> returns (df, info)
 
     strategy: 'ai_unified' or others (future)
+    incremental: keep the engine state per (strategy, params, data version) in `state_dir`
+        (default cfg bt.state_dir or runs/incremental) and only simulate bars appended since
+        the last run; a restated history prefix or changed past signals force a full run.
+        info["incremental"] reports which path was taken.
     """
     symbol = _cfg_get(cfg, "data.symbol", "BTC-USD")
     source = _cfg_get(cfg, "data.source", "yfinance")
@@ -46,8 +52,15 @@ def run_pipeline(strategy: str, params: Dict[str, Any], cfg) -> tuple[pd.DataFra
     else:
         raise KeyError(f"Unknown strategy: {strategy}")
 
+    store = key = None
+    if incremental:
+        store = IncrementalStore(state_dir or _cfg_get(cfg, "bt.state_dir", "runs/incremental"))
+        data_version = _cfg_get(cfg, "data.version", f"{source}:{symbol}:{interval}:{start}")
+        key = incremental_key(strategy, params, str(data_version))
+
     info = run_backtest_adapter(df, signals,
                                 initial_cash=float(_cfg_get(cfg, "bt.initial_cash", 100_000.0)),
                                 commission_bps=int(_cfg_get(cfg, "fees.commission_bps", 5)),
-                                slippage_bps=int(_cfg_get(cfg, "fees.slippage_bps", 5)))
+                                slippage_bps=int(_cfg_get(cfg, "fees.slippage_bps", 5)),
+                                store=store, key=key)
     return df, info
\ No newline at end of file
@@ -3,7 +3,7 @@ from __future__ import annotations
 from typing import Dict, Any, List
 from dataclasses import dataclass
 import pandas as pd
-from schemas.events import Event
+from schemas.events import LightEvent
 
 @dataclass
 class Position:
@@ -56,7 +56,7 @@ class PortfolioLedger:
             px = self.last_px.get(s, float(bar["c"] if s == sym else 0.0))
             eq += pos.qty * px
         self.equity_hist.append({"t": bar["t"], "equity": eq})
-        self.bus.publish("EQUITY", Event.create("RISK","ledger", {"t": bar["t"], "equity": eq}).asdict())
+        self.bus.publish("EQUITY", LightEvent.create("RISK","ledger", {"t": bar["t"], "equity": eq}))
 
     def equity_curve(self):
         import pandas as pd
@@ -1,7 +1,7 @@
 
 from __future__ import annotations
 from typing import Dict, Any, Callable
-from schemas.events import Event
+from schemas.events import LightEvent
 from risk.limits import RiskLimits
 
 class RiskGate:
@@ -13,4 +13,4 @@ class RiskGate:
         sig = ev.get("payload", {}).get("signal")
         if not sig: return
         approved = dict(sig); approved["size"] = approved.pop("size_hint", 0.1)
-        self.bus.publish("SIGNAL_APPROVED", Event.create("RISK","gate", {"signal": approved}).asdict())
+        self.bus.publish("SIGNAL_APPROVED", LightEvent.create("RISK","gate", {"signal": approved}))
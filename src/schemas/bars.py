@@ -0,0 +1,70 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional, Union
+import numpy as np
+import pandas as pd
+from schemas.events import LightEvent
+
+FIELDS = ("o", "h", "l", "c", "v")
+_COLUMNS = {"o": "open", "h": "high", "l": "low", "c": "close", "v": "volume"}
+
+@dataclass
+class BarBatch:
+    """A columnar slice of bars: one array per field instead of one event per row.
+
+    `t` is int64 epoch-ns (UTC), `symbol` is one symbol for the whole batch or a
+    per-row array. Per-bar views (`bar`, `events`) are built only when a legacy
+    handler needs them.
+    """
+    t: np.ndarray
+    o: np.ndarray
+    h: np.ndarray
+    l: np.ndarray
+    c: np.ndarray
+    v: np.ndarray
+    symbol: Union[str, np.ndarray]
+    source: str = "replayer"
+    tz: Optional[str] = "UTC"
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, symbol: Optional[str] = None, source: str = "replayer") -> "BarBatch":
+        """From an OHLCV frame with a `timestamp` column (or DatetimeIndex) and, unless given, a `symbol` column."""
+        ts = pd.DatetimeIndex(df["timestamp"] if "timestamp" in df.columns else df.index)
+        tz = str(ts.tz) if ts.tz is not None else None
+        cols = {f: df[_COLUMNS[f]].to_numpy(dtype=float) for f in FIELDS}
+        sym = symbol if symbol is not None else df["symbol"].to_numpy()
+        return cls(t=(ts.tz_convert("UTC") if tz else ts).as_unit("ns").asi8, symbol=sym, source=source, tz=tz, **cols)
+
+    def __len__(self) -> int:
+        return len(self.t)
+
+    def __getitem__(self, sl: slice) -> "BarBatch":
+        sym = self.symbol if isinstance(self.symbol, str) else self.symbol[sl]
+        return BarBatch(t=self.t[sl], symbol=sym, source=self.source, tz=self.tz,
+                        **{f: getattr(self, f)[sl] for f in FIELDS})
+
+    def split(self, size: int) -> Iterator["BarBatch"]:
+        for start in range(0, len(self), int(size)):
+            yield self[start:start + int(size)]
+
+    def symbols(self) -> np.ndarray:
+        return np.full(len(self), self.symbol, dtype=object) if isinstance(self.symbol, str) else np.asarray(self.symbol)
+
+    def timestamps(self) -> pd.DatetimeIndex:
+        idx = pd.DatetimeIndex(self.t.view("datetime64[ns]"))
+        return idx.tz_localize("UTC").tz_convert(self.tz) if self.tz else idx
+
+    def bars(self) -> Iterator[tuple]:
+        """(symbol, {"t": iso, "o", "h", "l", "c", "v"}) per row, in the replayer's legacy bar format."""
+        cols = [getattr(self, f).tolist() for f in FIELDS]
+        for sym, ts, o, h, l, c, v in zip(self.symbols().tolist(), self.timestamps(), *cols):
+            yield sym, {"t": ts.isoformat(), "o": o, "h": h, "l": l, "c": c, "v": v}
+
+    def bar(self, i: int) -> Dict[str, Any]:
+        ts = self.timestamps()[i]
+        return {"t": ts.isoformat(), **{f: float(getattr(self, f)[i]) for f in FIELDS}}
+
+    def events(self, event_type: str = "MARKET_DATA") -> Iterator[Dict[str, Any]]:
+        """Unroll into per-bar `LightEvent`s, the dict-like events legacy subscribers expect."""
+        for sym, bar in self.bars():
+            yield LightEvent.create(event_type, self.source, {"symbol": sym, "bar": bar})
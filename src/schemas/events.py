@@ -1,8 +1,9 @@
-
 from __future__ import annotations
 from dataclasses import dataclass, asdict
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, Mapping
 from datetime import datetime, timezone
+import itertools
+import time
 import uuid
 
 @dataclass
@@ -25,3 +26,71 @@ class Event:
 
     def asdict(self) -> Dict[str, Any]:
         return asdict(self)
+
+
+_SEQ = itertools.count(1)
+_ID_PREFIX = uuid.uuid4().int >> 64 << 64   # random per process; the low 64 bits carry `seq`
+_KEYS = ("event_id", "timestamp", "event_type", "source", "payload")
+
+
+class LightEvent(Mapping):
+    """Cheap event for hot paths: a process-monotonic int `seq` and int64 epoch-ns `ts_ns`.
+
+    Reads like the `Event.asdict()` dict (`ev["payload"]`, `ev.get(...)`, `{**ev}`), so
+    dict-based subscribers such as `PortfolioLedger` and `RiskGate` take it unchanged;
+    `event_id` (a UUID string) and `timestamp` (ISO-8601 UTC) are rendered only when read.
+    `asdict()` gives a plain dict for serialization; unlike `Event.asdict()` the payload
+    is shared, not deep-copied.
+    """
+    __slots__ = ("seq", "ts_ns", "event_type", "source", "payload")
+
+    def __init__(self, seq: int, ts_ns: int, event_type: str, source: str, payload: Dict[str, Any]):
+        self.seq = seq
+        self.ts_ns = ts_ns
+        self.event_type = event_type
+        self.source = source
+        self.payload = payload
+
+    @staticmethod
+    def create(event_type: str, source: str, payload: Dict[str, Any]) -> 'LightEvent':
+        return LightEvent(next(_SEQ), time.time_ns(), event_type, source, payload)
+
+    @property
+    def event_id(self) -> str:
+        return str(uuid.UUID(int=_ID_PREFIX | (self.seq & 0xFFFFFFFFFFFFFFFF)))
+
+    @property
+    def timestamp(self) -> str:
+        sec, ns = divmod(self.ts_ns, 1_000_000_000)
+        return datetime.fromtimestamp(sec, timezone.utc).replace(microsecond=ns // 1000).isoformat()
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "payload":
+            return self.payload
+        if key in _KEYS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key == "payload":
+            return self.payload
+        return getattr(self, key) if key in _KEYS else default
+
+    def __contains__(self, key: object) -> bool:
+        return key in _KEYS
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_KEYS)
+
+    def __len__(self) -> int:
+        return len(_KEYS)
+
+    def __repr__(self) -> str:
+        return f"LightEvent(seq={self.seq}, ts_ns={self.ts_ns}, event_type={self.event_type!r}, source={self.source!r})"
+
+    def asdict(self) -> Dict[str, Any]:
+        return {"event_id": self.event_id, "timestamp": self.timestamp, "event_type": self.event_type,
+                "source": self.source, "payload": self.payload}
+
+    def to_event(self) -> Event:
+        return Event(**self.asdict())
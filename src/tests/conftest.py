@@ -0,0 +1,24 @@
+# src/tests/conftest.py
+import importlib
+import os
+import sys
+import types
+
+import pytest
+
+
+@pytest.fixture
+def core_backtest():
+    """Import a module of src/core/backtest/, e.g. ``core_backtest("engine_v2")``.
+
+    That directory has no __init__ and is shadowed by core/backtest.py, so it is
+    loaded under an alias package.
+    """
+    import core
+
+    alias = "core._backtest_pkg"
+    if alias not in sys.modules:
+        pkg = types.ModuleType(alias)
+        pkg.__path__ = [os.path.join(os.path.dirname(core.__file__), "backtest")]
+        sys.modules[alias] = pkg
+    return lambda name: importlib.import_module(f"{alias}.{name}")
@@ -30,3 +30,264 @@ def test_basic_run():
     report = engine.run(prices["AAPL"].index[0], prices["AAPL"].index[-1])
     assert "performance" in report and "trades" in report
     assert len(report["portfolio_history"]) > 0
+
+def _run_engine(mode):
+    prices = {"AAPL": _make_ohlcv(seed=1), "MSFT": _make_ohlcv(seed=2), "GOOG": _make_ohlcv(seed=3)}
+    engine = BacktestEngine(
+        price_data=prices,
+        initial_capital=100_000.0,
+        commission_model=PercentageCommissionModel(0.0005, min_commission=1.0),
+        slippage_model=VolatilityProportionalSlippage(0.0003),
+        risk_free_rate=0.01,
+        mode=mode,
+    )
+    idx = prices["AAPL"].index
+    engine.submit_order("AAPL", OrderDirection.LONG, 10, OrderType.MARKET, submission_date=idx[0])
+    engine.submit_order("MSFT", OrderDirection.SHORT, 5, OrderType.MARKET, submission_date=idx[3])
+    engine.submit_order("GOOG", OrderDirection.LONG, 7, OrderType.LIMIT, limit_price=99.0, submission_date=idx[5])
+    engine.submit_order("AAPL", OrderDirection.SHORT, 4, OrderType.MARKET, submission_date=idx[10])
+    return engine.run(idx[0], idx[-1])
+
+def test_array_mode_matches_pandas_mode():
+    ref = _run_engine("pandas")
+    arr = _run_engine("array")
+    np.testing.assert_allclose(arr["portfolio_history"].to_numpy(), ref["portfolio_history"].to_numpy(), rtol=1e-12)
+    np.testing.assert_allclose(arr["returns"].to_numpy(), ref["returns"].to_numpy(), rtol=1e-9, atol=1e-15)
+    assert list(arr["portfolio_history"].index) == list(ref["portfolio_history"].index)
+    for key, val in ref["performance"].items():
+        np.testing.assert_allclose(arr["performance"][key], val, rtol=1e-9, err_msg=key)
+    pd.testing.assert_frame_equal(arr["trades"], ref["trades"])
+
+def test_order_cancel_and_amend():
+    prices = {"AAPL": _make_ohlcv(), "MSFT": _make_ohlcv(seed=7)}
+    engine = BacktestEngine(price_data=prices, initial_capital=100_000.0)
+    idx = prices["AAPL"].index
+    keep = engine.submit_order("AAPL", OrderDirection.LONG, 10, OrderType.MARKET, submission_date=idx[0])
+    gone = engine.submit_order("MSFT", OrderDirection.LONG, 10, OrderType.MARKET, submission_date=idx[0])
+    assert engine.cancel_order(gone)
+    assert not engine.cancel_order(gone)
+    engine.amend_order(keep, quantity=25)
+    assert [o["order_id"] for o in engine.order_book] == [keep]
+
+    report = engine.run(idx[0], idx[-1])
+    trades = report["trades"]
+    assert len(trades) == 1 and trades.iloc[0]["quantity"] == 25
+    assert engine.positions["MSFT"] == 0.0 and len(engine.order_book) == 0
+
+def test_order_scheduler_buckets_by_bar():
+    from core.backtest_engine import OrderScheduler
+    book = OrderScheduler()
+    for i, (sym, bar) in enumerate([("A", 3), ("B", 3), ("A", 5), ("A", 3)]):
+        book.add({"order_id": f"o{i}", "symbol": sym}, bar)
+    assert book.due_count(3) == 3
+    assert [o["order_id"] for o in book.pop_due(3, symbol="A")] == ["o0", "o3"]
+    book.schedule("o2", 3)
+    assert [o["order_id"] for o in book.pop_due(3)] == ["o1", "o2"]
+    assert len(book) == 0 and book.pop_due(5) == []
+
+def test_streaming_metrics_match_history():
+    report = _run_engine("array")
+    perf, eq, rets, trades = report["performance"], report["portfolio_history"], report["returns"], report["trades"]
+    excess = rets - 0.01 / 252.0
+    np.testing.assert_allclose(perf["sharpe_ratio"], np.sqrt(252.0) * excess.mean() / excess.std(), rtol=1e-9)
+    np.testing.assert_allclose(perf["max_drawdown"], float(((eq - eq.cummax()) / eq.cummax()).min()), rtol=1e-12)
+    fill_notional = float((trades["entry_price"] * trades["quantity"]).sum())
+    np.testing.assert_allclose(perf["turnover"], fill_notional / eq.mean(), rtol=1e-12)
+    assert 0.0 <= perf["win_rate"] <= 1.0 and perf["avg_gross_exposure"] > 0.0
+
+def test_interim_metrics_mid_run():
+    prices = {"AAPL": _make_ohlcv()}
+    engine = BacktestEngine(price_data=prices, initial_capital=100_000.0)
+    idx = prices["AAPL"].index
+    engine.submit_order("AAPL", OrderDirection.LONG, 10, OrderType.MARKET, submission_date=idx[0])
+    engine.run(idx[0], idx[10])
+    mid = engine.interim_metrics()
+    assert mid["num_trades"] == 1.0 and mid["gross_exposure"] > 0.0
+    assert mid["equity"] == engine.portfolio_history.iloc[-1]
+
+def test_fill_log_fifo_round_trips():
+    from core.backtest_engine import FixedCommissionModel
+    prices = {"AAPL": _make_ohlcv()}
+    engine = BacktestEngine(price_data=prices, initial_capital=100_000.0, commission_model=FixedCommissionModel(1.0))
+    idx = prices["AAPL"].index
+    for side, qty, day in [(OrderDirection.LONG, 10, 0), (OrderDirection.LONG, 5, 1), (OrderDirection.SHORT, 12, 4),
+                           (OrderDirection.SHORT, 8, 6), (OrderDirection.LONG, 5, 9)]:
+        engine.submit_order("AAPL", side, qty, OrderType.MARKET, submission_date=idx[day])
+    trades = engine.run(idx[0], idx[-1])["trades"]
+
+    legs = engine.trade_log.round_trips()
+    assert list(zip(legs["entry_fill"], legs["exit_fill"], legs["quantity"])) == [(0, 2, 10.0), (1, 2, 2.0), (1, 3, 3.0), (3, 4, 5.0)]
+    px, fee = trades["entry_price"].to_numpy(), trades["commission"].to_numpy() / trades["quantity"].to_numpy()
+    np.testing.assert_allclose(trades.loc[0, "pnl"], 10 * (px[2] - px[0]) - 10 * (fee[0] + fee[2]))
+    assert trades.loc[1, "exit_time"] == trades.loc[3, "entry_time"]                    # closed last by fill 3
+    np.testing.assert_allclose(trades.loc[1, "exit_price"], (2 * px[2] + 3 * px[3]) / 5)
+    np.testing.assert_allclose(trades.loc[3, "pnl"], 5 * (px[3] - px[4]) - 5 * (fee[3] + fee[4]))
+    assert trades.loc[0, "holding_period"] == (trades.loc[2, "entry_time"] - trades.loc[0, "entry_time"]).days
+    assert trades[["pnl", "exit_time"]].iloc[[2, 4]].isna().all().all()                 # pure exit / still open
+
+def test_fill_log_grows_and_exports_zero_copy():
+    from core.backtest_engine import FillLog, Trade
+    log = FillLog(["AAPL"], capacity=2)
+    for i in range(5):
+        log.append(Trade(
+            trade_id="", symbol="AAPL", entry_time=pd.Timestamp("2022-01-03") + pd.Timedelta(days=i), exit_time=None,
+            entry_price=100.0 + i, exit_price=None, quantity=1.0, direction=OrderDirection.LONG, order_type=OrderType.MARKET,
+            commission=0.0, slippage=0.0, pnl=None, pnl_pct=None, holding_period=None, volatility=0.0))
+    assert len(log) == 5 and log.capacity == 8
+    frame = log.to_frame(match=False)
+    assert np.shares_memory(frame["entry_price"].to_numpy(), log.column("entry_price"))
+    assert log[-1].entry_price == 104.0 and [t.trade_id for t in log][:2] == ["TRD_1_AAPL", "TRD_2_AAPL"]
+
+def _checkpoint_engine(mode):
+    prices = {"AAPL": _make_ohlcv(seed=1), "MSFT": _make_ohlcv(seed=2)}
+    engine = BacktestEngine(price_data=prices, initial_capital=100_000.0,
+                            commission_model=PercentageCommissionModel(0.0005, min_commission=1.0), mode=mode)
+    idx = prices["AAPL"].index
+    for sym, side, qty, day in [("AAPL", OrderDirection.LONG, 10, 0), ("MSFT", OrderDirection.SHORT, 5, 8),
+                                ("AAPL", OrderDirection.SHORT, 4, 15), ("MSFT", OrderDirection.LONG, 5, 22)]:
+        engine.submit_order(sym, side, qty, OrderType.MARKET, submission_date=idx[day])
+    return engine, idx
+
+def test_resume_from_checkpoint_matches_uninterrupted_run(tmp_path):
+    import pytest
+    for mode in ("pandas", "array"):
+        engine, idx = _checkpoint_engine(mode)
+        ref = engine.run(idx[0], idx[-1])
+
+        path = tmp_path / f"{mode}.ckpt"
+        crashing, _ = _checkpoint_engine(mode)
+        valuation = crashing._valuation
+        def crash_at_bar_17():
+            if crashing._bar == 17:
+                raise RuntimeError("pre-empted")
+            return valuation()
+        crashing._valuation = crash_at_bar_17
+        with pytest.raises(RuntimeError):
+            crashing.run(idx[0], idx[-1], checkpoint_every=5, checkpoint_path=str(path))
+
+        fresh, _ = _checkpoint_engine(mode)
+        out = fresh.resume(path)
+        pd.testing.assert_series_equal(out["portfolio_history"], ref["portfolio_history"])
+        pd.testing.assert_series_equal(out["returns"], ref["returns"])
+        pd.testing.assert_frame_equal(out["trades"], ref["trades"])
+        assert pd.Series(out["performance"]).equals(pd.Series(ref["performance"]))
+
+def test_incremental_extend_matches_full_run_and_detects_restatement(tmp_path):
+    from core.backtest_incremental import IncrementalStore, incremental_key, run_incremental
+    full = {"AAPL": _make_ohlcv(periods=60, seed=1), "MSFT": _make_ohlcv(periods=60, seed=2)}
+    idx = full["AAPL"].index
+    orders = [dict(symbol="AAPL", direction=OrderDirection.LONG, quantity=10, submission_date=idx[2]),
+              dict(symbol="MSFT", direction=OrderDirection.SHORT, quantity=5, submission_date=idx[39]),  # fills on an appended bar
+              dict(symbol="AAPL", direction=OrderDirection.SHORT, quantity=4, submission_date=idx[45])]
+    store, key = IncrementalStore(str(tmp_path)), incremental_key("demo", {"n": 1}, "synthetic:v1")
+    for mode in ("pandas", "array"):
+        store.clear(key)
+        first = run_incremental({s: df.iloc[:40] for s, df in full.items()}, orders[:2], store, key, idx[0], mode=mode)
+        assert first["incremental"]["mode"] == "full"
+        nightly = run_incremental(full, orders, store, key, idx[0], mode=mode)
+        assert nightly["incremental"] == {"mode": "extend", "reason": "prefix unchanged", "new_bars": 20, "new_orders": 1}
+
+        engine = BacktestEngine(full, mode=mode)
+        for o in orders:
+            engine.submit_order(**o)
+        ref = engine.run(idx[0], idx[-1])
+        pd.testing.assert_series_equal(nightly["portfolio_history"], ref["portfolio_history"], check_freq=False)
+        pd.testing.assert_frame_equal(nightly["trades"], ref["trades"])
+        assert pd.Series(nightly["performance"]).equals(pd.Series(ref["performance"]))
+
+        restated = {s: df.copy() for s, df in full.items()}
+        restated["AAPL"].iloc[5, restated["AAPL"].columns.get_loc("close")] *= 0.5   # e.g. a split adjustment
+        again = run_incremental(restated, orders, store, key, idx[0], mode=mode)
+        assert again["incremental"]["mode"] == "full" and again["incremental"]["reason"] == "history prefix changed"
+
+def test_cost_model_batches_match_scalar_calculate():
+    import pytest
+    from core.backtest_engine import FixedCommissionModel, SlippageModel, CommissionModel
+    rs = np.random.RandomState(0)
+    notional = np.concatenate([[0.0, -5.0], rs.lognormal(10, 3, 500)])
+    vol = rs.rand(notional.size) * 0.05
+    sym_idx = rs.randint(0, 3, notional.size)
+    for model in (FixedCommissionModel(1.5), PercentageCommissionModel(0.0005, min_commission=1.0)):
+        np.testing.assert_array_equal(model.calculate_batch(notional, vol, sym_idx), [model.calculate(n) for n in notional])
+    slip = VolatilityProportionalSlippage(0.0003)
+    np.testing.assert_allclose(slip.calculate_batch(notional, vol, sym_idx),
+                               [slip.calculate("X", n, v) for n, v in zip(notional, vol)], rtol=1e-15, atol=0)
+
+    class PerSymbolSlippage(SlippageModel):  # custom models only implement calculate()
+        def calculate(self, symbol, order_notional, current_volatility):
+            return {"AAPL": 1e-4, "MSFT": 2e-4, "GOOG": 3e-4}[symbol]
+
+    class TieredCommission(CommissionModel):
+        def calculate(self, order_notional):
+            return 1.0 if order_notional < 1e4 else 5.0
+
+    per_symbol = PerSymbolSlippage()
+    with pytest.raises(ValueError, match="symbol_names"):
+        per_symbol.calculate_batch(notional[:4], vol[:4], np.array([0, 1, 2, 0]))
+    per_symbol.symbol_names = ["AAPL", "MSFT", "GOOG"]
+    out = per_symbol.calculate_batch(notional[:4], vol[:4], np.array([0, 1, 2, 0]))
+    np.testing.assert_array_equal(out, [1e-4, 2e-4, 3e-4, 1e-4])
+    np.testing.assert_array_equal(TieredCommission().calculate_batch(np.array([10.0, 2e4]), None, None), [1.0, 5.0])
+
+    # the engine costs a bar's fills in one batch, including through the fallback
+    prices = {"AAPL": _make_ohlcv(seed=1), "MSFT": _make_ohlcv(seed=2)}
+    engine = BacktestEngine(prices, initial_capital=100_000.0, commission_model=TieredCommission(),
+                            slippage_model=PerSymbolSlippage())
+    idx = prices["AAPL"].index
+    engine.submit_order("AAPL", OrderDirection.LONG, 10, submission_date=idx[0])
+    engine.submit_order("MSFT", OrderDirection.LONG, 500, submission_date=idx[0])
+    trades = engine.run(idx[0], idx[-1])["trades"]
+    assert list(trades["commission"]) == [1.0, 5.0]
+    np.testing.assert_allclose(trades["entry_price"], [prices["AAPL"]["open"].iloc[1] * (1 + 1e-4),
+                                                       prices["MSFT"]["open"].iloc[1] * (1 + 2e-4)])
+
+
+def test_custom_calculate_batch_override_and_failing_cost_model():
+    import pytest
+    from core.backtest_engine import FixedCommissionModel, SlippageModel
+    class SizeTieredSlippage(SlippageModel):  # overrides the 3-argument batch hook only
+        def calculate_batch(self, notional, vol, symbol_idx):
+            return np.where(np.asarray(notional) < 1e4, 1e-4, 5e-4)
+
+    prices = {"AAPL": _make_ohlcv(seed=1), "MSFT": _make_ohlcv(seed=2)}
+    idx = prices["AAPL"].index
+    engine = BacktestEngine(prices, initial_capital=100_000.0, commission_model=FixedCommissionModel(0.0),
+                            slippage_model=SizeTieredSlippage())
+    engine.submit_order("AAPL", OrderDirection.LONG, 10, submission_date=idx[0])
+    engine.submit_order("MSFT", OrderDirection.LONG, 500, submission_date=idx[0])
+    trades = engine.run(idx[0], idx[-1])["trades"]
+    np.testing.assert_allclose(trades["entry_price"], [prices["AAPL"]["open"].iloc[1] * (1 + 1e-4),
+                                                       prices["MSFT"]["open"].iloc[1] * (1 + 5e-4)])
+
+    class BrokenSlippage(SlippageModel):
+        def calculate_batch(self, notional, vol, symbol_idx):
+            raise RuntimeError("cost feed down")
+
+    engine = BacktestEngine(prices, slippage_model=BrokenSlippage())
+    oid = engine.submit_order("AAPL", OrderDirection.LONG, 10, submission_date=idx[0])
+    with pytest.raises(RuntimeError, match="cost feed down"):
+        engine.run(idx[0], idx[-1])
+    assert oid in engine.orders and not engine.trade_log  # re-queued, not silently dropped
+
+
+def test_performance_accumulator_zero_peak_and_unsorted_fills():
+    from core.backtest_engine import PerformanceAccumulator, Trade
+
+    def fill(px):
+        return Trade(trade_id="t", symbol="X", entry_time=pd.Timestamp("2024-01-02"), exit_time=None,
+                     entry_price=px, exit_price=None, quantity=1.0, direction=OrderDirection.LONG,
+                     order_type=OrderType.MARKET, commission=0.0, slippage=0.0, pnl=None, pnl_pct=None,
+                     holding_period=None, volatility=0.0)
+
+    acc = PerformanceAccumulator()
+    for eq in (0.0, 0.0, -5.0, 10.0, 5.0):
+        acc.on_bar(eq)
+    eq = pd.Series([0.0, 0.0, -5.0, 10.0, 5.0])
+    assert acc.max_drawdown == ((eq - eq.cummax()) / eq.cummax()).min() == -np.inf
+
+    acc = PerformanceAccumulator()
+    for px in (105.0, 95.0, 101.0, 99.0):  # break-evens arrive out of order
+        acc.on_fill(fill(px))
+    assert acc.win_rate({"X": 100.0}) == 0.5
+    acc.on_fill(fill(90.0))
+    assert acc.win_rate({"X": 100.0}) == 0.6
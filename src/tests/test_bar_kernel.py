@@ -0,0 +1,89 @@
+# src/tests/test_bar_kernel.py
+import numpy as np
+import pandas as pd
+import pytest
+from backtest.bar_kernel import run_bar_kernel, run_path_backtest, NUMBA_AVAILABLE
+
+def _bars(close):
+    close = np.asarray(close, dtype=float)
+    return close, close + 0.5, close - 0.5, close  # open, high, low, close
+
+def test_atr_stop_exits_and_waits_for_new_target():
+    o, h, l, c = _bars([100, 100, 100, 95, 90, 90, 90])
+    target = np.array([10, 10, 10, 10, 10, 10, 0], dtype=float)
+    atr = np.full(len(c), 1.0)
+    res = run_bar_kernel(o, h, l, c, target, atr, capital=10_000, fee_rate=0.0, stop_mult=2.0, backend="python")
+    pos = res.positions[:, 0]
+    assert pos[1] == 10 and pos[3] == 0  # bought at 100, stopped at 98 when the bar opened at 95
+    assert (pos[3:] == 0).all()          # target unchanged -> no re-entry
+    np.testing.assert_allclose(res.cash[3], 10_000 - 1000 + 10 * 95)
+
+def test_limit_order_fills_at_best_of_limit_and_open():
+    o, h, l, c = _bars([100, 100, 100, 98])
+    target = np.array([5, 5, 5, 5], dtype=float)
+    res = run_bar_kernel(o, h, l, c, target, capital=10_000, fee_rate=0.0, limit_offset=0.01, backend="python")
+    # limit at 99 decided on bar 0 fills on bar 1 at min(limit, open), as in BacktestEngine
+    assert list(res.positions[:, 0]) == [0, 5, 5, 5]
+    np.testing.assert_allclose(res.cash[-1], 10_000 - 5 * 99)
+
+@pytest.mark.parametrize("limit_offset", [0.0, 0.002])
+def test_matches_backtest_engine_fills(limit_offset):
+    from core.backtest_engine import (BacktestEngine, OrderDirection, OrderType, PercentageCommissionModel,
+                                      VolatilityProportionalSlippage)
+    rs = np.random.RandomState(3)
+    idx = pd.date_range("2024-01-01", periods=60, freq="D")
+    close = 100 * np.exp(np.cumsum(rs.randn(60, 2) * 0.01, axis=0))
+    open_ = close * (1 + rs.randn(60, 2) * 0.003)
+    high, low = np.maximum(open_, close) * 1.005, np.minimum(open_, close) * 0.995
+    target = np.round(np.cumsum(rs.randn(60, 2), axis=0)) * 10
+    res = run_bar_kernel(open_, high, low, close, target, capital=1e5, fee_rate=0.0005,
+                         limit_offset=limit_offset, backend="python")
+
+    symbols = ["A", "B"]
+    prices = {s: pd.DataFrame({"open": open_[:, j], "high": high[:, j], "low": low[:, j], "close": close[:, j],
+                               "volume": 1.0}, index=idx) for j, s in enumerate(symbols)}
+    engine = BacktestEngine(prices, initial_capital=1e5, commission_model=PercentageCommissionModel(0.0005),
+                            slippage_model=VolatilityProportionalSlippage(0.0))
+    held = np.zeros(2)
+    for t in range(len(idx) - 1):  # the kernel's order on bar t executes on bar t+1
+        for j, s in enumerate(symbols):
+            delta = target[t, j] - held[j]
+            if delta == 0:
+                continue
+            kw = {}
+            if limit_offset:
+                kw = dict(order_type=OrderType.LIMIT,
+                          limit_price=close[t, j] * (1 - limit_offset if delta > 0 else 1 + limit_offset))
+            engine.submit_order(s, OrderDirection.LONG if delta > 0 else OrderDirection.SHORT, abs(delta),
+                                submission_date=idx[t], **kw)
+            held[j] = target[t, j]
+    out = engine.run(idx[0], idx[-1])
+    assert len(out["trades"]) == res.n_fills
+    np.testing.assert_allclose(out["portfolio_history"].to_numpy(), res.equity, rtol=1e-12)
+
+def test_drawdown_kill_switch_flattens_and_halts():
+    o, h, l, c = _bars([100, 100, 50, 50, 60, 70])
+    target = np.full(len(c), 100.0)
+    res = run_bar_kernel(o, h, l, c, target, capital=10_000, fee_rate=0.0, max_drawdown=0.2, backend="python")
+    assert res.killed_at == 2
+    assert (res.positions[3:, 0] == 0).all()
+
+def test_path_backtest_frontend():
+    idx = pd.date_range("2024-01-01", periods=50, freq="D")
+    px = pd.Series(100 + np.random.RandomState(1).randn(50).cumsum(), index=idx)
+    prices = {s: pd.DataFrame({"open": px, "high": px + 1, "low": px - 1, "close": px, "volume": 1.0}) for s in ("A", "B")}
+    targets = pd.DataFrame({"A": 10.0, "B": -5.0}, index=idx)
+    out = run_path_backtest(prices, targets, backend="python", capital=10_000, stop_mult=3.0)
+    assert len(out["equity"]) == 50 and list(out["positions"].columns) == ["A", "B"]
+
+@pytest.mark.skipif(not NUMBA_AVAILABLE, reason="numba not installed")
+def test_numba_backend_matches_python():
+    rs = np.random.RandomState(0)
+    c = 100 * np.exp(np.cumsum(rs.randn(300, 4) * 0.01, axis=0))
+    h, l = c * 1.01, c * 0.99
+    target = np.sign(rs.randn(300, 4)) * 10
+    kw = dict(capital=1e5, stop_mult=1.5, limit_offset=0.002, max_drawdown=0.5)
+    a = run_bar_kernel(c, h, l, c, target, h - l, backend="numba", **kw)
+    b = run_bar_kernel(c, h, l, c, target, h - l, backend="python", **kw)
+    assert a.backend == "numba" and a.n_fills == b.n_fills
+    assert np.array_equal(a.equity, b.equity) and np.array_equal(a.positions, b.positions)
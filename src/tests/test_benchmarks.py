@@ -0,0 +1,29 @@
+# src/tests/test_benchmarks.py
+import numpy as np
+from backtest.benchmarks import run_case, plan, append_history, load_history, compare, synthetic_dataset
+
+def test_dataset_is_seeded_and_large_sizes_fit():
+    a = synthetic_dataset(500, 3, seed=7)
+    b = synthetic_dataset(500, 3, seed=7)
+    assert list(a) == ["S0000", "S0001", "S0002"]
+    np.testing.assert_array_equal(a["S0001"]["close"].to_numpy(), b["S0001"]["close"].to_numpy())
+    assert not np.array_equal(a["S0000"]["close"].to_numpy(), a["S0001"]["close"].to_numpy())
+    big = synthetic_dataset(200_000, 1)  # past the daily-index Timestamp limit
+    assert len(big["S0000"]) == 200_000
+
+def test_run_case_and_history(tmp_path):
+    res = run_case("vectorized_pnl", 1_000, 2)
+    assert res["status"] == "ok" and res["total_bars"] == 2_000
+    assert res["wall_s"] > 0 and res["bars_per_s"] > 0 and res["peak_rss_mb"] >= res["data_rss_mb"] > 0
+
+    path = str(tmp_path / "history.json")
+    append_history({"commit": "a", "results": [dict(res, wall_s=1.0)]}, path)
+    append_history({"commit": "b", "results": [dict(res, wall_s=2.0)]}, path)
+    assert [e["commit"] for e in load_history(path)] == ["a", "b"]
+    table = compare(load_history(path))
+    assert table.loc[0, "ratio"] == 2.0
+
+def test_plan_caps_event_driven_engines():
+    cases = plan(["vectorized_pnl", "simulator"], [1_000, 1_000_000], [1, 2_000])
+    assert ("vectorized_pnl", 1_000_000, 1) in cases and ("vectorized_pnl", 1_000, 2_000) in cases
+    assert ("simulator", 1_000_000, 1) not in cases and ("simulator", 1_000, 1) in cases
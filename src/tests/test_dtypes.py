@@ -0,0 +1,66 @@
+# src/tests/test_dtypes.py
+import numpy as np
+import pandas as pd
+import pytest
+from core.backtest_engine import BacktestEngine, OrderDirection
+from data_layer.dtypes import COMPACT, FLOAT64, apply_dtype_policy, equity_error_bound, frame_nbytes, resolve_policy
+from data_layer.normalizer import normalize_ohlcv
+from data_layer.shared_panel import SharedPanel
+from utils.yf_helpers import synthetic_walk
+
+def _prices(n=1500, k=4):
+    return {f"S{j}": synthetic_walk(f"S{j}", n=n, seed=j, freq="min") for j in range(k)}
+
+def test_policy_casts_loader_output():
+    assert resolve_policy(None) is FLOAT64 and resolve_policy("compact") is COMPACT
+    with pytest.raises(ValueError):
+        resolve_policy("float16")
+    rows = [[1_600_000_000_000 + 60_000 * i, 10.0 + i, 11.0 + i, 9.0 + i, 10.5 + i, 100 + i] for i in range(50)]
+    df = normalize_ohlcv(rows, source="ccxt", symbol="BTC/USDT", dtype_policy="compact")
+    assert [str(df[c].dtype) for c in ("open", "high", "low", "close", "volume")] == ["float32"] * 5
+    assert str(df["symbol"].dtype) == "category" and df["timestamp"].dt.unit == "ns"
+
+    prices = _prices(k=1)["S0"]
+    compact = apply_dtype_policy(prices, "compact")
+    assert frame_nbytes(compact) - compact.index.nbytes == (frame_nbytes(prices) - prices.index.nbytes) // 2
+    as_float = prices.astype(float)
+    assert apply_dtype_policy(as_float, FLOAT64) is as_float
+
+def _run(prices, mode, policy):
+    engine = BacktestEngine(prices, initial_capital=1_000_000.0, mode=mode, dtype_policy=policy)
+    rs = np.random.RandomState(0)
+    idx = prices["S0"].index
+    for k in sorted(rs.choice(len(idx) - 1, 120, replace=False)):
+        sym = f"S{rs.randint(len(prices))}"
+        engine.submit_order(sym, OrderDirection.LONG if rs.rand() < 0.55 else OrderDirection.SHORT, 500, submission_date=idx[k])
+    return engine, engine.run(idx[0], idx[-1])
+
+@pytest.mark.parametrize("mode", ["pandas", "array"])
+def test_compact_equity_within_documented_bound(mode):
+    prices = _prices()
+    ref_engine, ref = _run(prices, mode, None)
+    engine, rep = _run(prices, mode, "compact")
+    if mode == "array":
+        assert engine._panel.dtype == np.float32 and engine._panel.nbytes * 2 == ref_engine._panel.nbytes
+    assert rep["portfolio_history"].dtype == np.float64 and isinstance(engine.portfolio_cash, float)
+    assert len(rep["trades"]) == len(ref["trades"])
+
+    # gross exposure of the float64 run, per bar
+    trades = ref["trades"]
+    dates = ref["portfolio_history"].index
+    signed = trades["quantity"] * np.where(trades["direction"] == "LONG", 1.0, -1.0)
+    qty = signed.groupby([trades["entry_time"], trades["symbol"]]).sum().unstack(fill_value=0.0)
+    close = pd.DataFrame({s: df["close"] for s, df in prices.items()}).reindex(dates)
+    gross = (qty.reindex(index=dates, columns=close.columns, fill_value=0.0).cumsum() * close).abs().sum(axis=1)
+    bound = equity_error_bound(gross, trades["quantity"] * trades["entry_price"], fill_bar=dates.get_indexer(trades["entry_time"]))
+
+    err = np.abs(rep["portfolio_history"].to_numpy() - ref["portfolio_history"].to_numpy())
+    assert err.max() > 0  # the runs really differ
+    assert np.all(err <= bound)
+
+def test_shared_panel_publishes_compact_pages():
+    prices = _prices(n=300, k=3)
+    with SharedPanel.publish(prices, dtype="compact") as panel:
+        assert panel.array.dtype == np.float32
+        engine = BacktestEngine(panel.handle, mode="array")
+        assert engine.dtype_policy == COMPACT and np.shares_memory(engine._panel, panel.array)
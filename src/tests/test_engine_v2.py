@@ -0,0 +1,61 @@
+# src/tests/test_engine_v2.py
+import numpy as np
+import pandas as pd
+from core.risk.advanced import AdvancedRisk
+
+
+def _per_symbol_loop(prices, exposures, capital, fee_bps=0.0005, pct_risk=0.01, stop_mult=3.0):
+    """The per-symbol iterrows loop run_vector_backtest replaced (default risk config)."""
+    panel = pd.concat({sym: df for sym, df in prices.items()}, axis=1)
+    risk = AdvancedRisk({})
+    equity, trades = {}, []
+    for sym in sorted(prices):
+        df = panel[sym]
+        exp = pd.Series(exposures[sym]).reindex(df.index).fillna(0.0)
+        cash, position, rows = capital / len(prices), 0.0, []
+        atr = risk.atr_from_df(df)
+        for ts, row in df.iterrows():
+            price = row["close"]
+            atr_val = float(atr.loc[ts])
+            if atr_val and atr_val > 0:
+                units = risk.position_size_percent_risk(price, atr_val, cash, pct_risk=pct_risk, stop_multiplier=stop_mult)
+            else:
+                units = exp.loc[ts] * cash / price if price > 0 else 0.0
+            delta = units - position
+            if abs(delta) > 1e-9:
+                fee = abs(delta * price) * fee_bps
+                cash -= delta * price + fee
+                trades.append((ts, sym, delta))
+                position = units
+            rows.append(cash + position * price)
+        equity[sym] = pd.Series(rows, index=df.index)
+    return equity, trades
+
+
+def test_misaligned_calendars_match_per_symbol_loop(core_backtest):
+    rng = np.random.default_rng(0)
+    idx = pd.date_range("2023-01-01", periods=60, freq="D")
+
+    def frame(index):
+        c = 100 + rng.standard_normal(len(index)).cumsum()
+        return pd.DataFrame({"open": c, "high": c + 1, "low": c - 1, "close": c}, index=index)
+
+    prices = {"A": frame(idx), "B": frame(idx.delete([10, 25, 40]))}
+    exposures = {s: pd.Series(np.sign(np.sin(np.arange(len(df)))), index=df.index) for s, df in prices.items()}
+    run_vector_backtest = core_backtest("engine_v2").run_vector_backtest
+
+    out = run_vector_backtest(prices, lambda p, cfg: exposures, capital=100_000.0)
+    ref_equity, ref_trades = _per_symbol_loop(prices, exposures, 100_000.0)
+    for sym in ("A", "B"):
+        np.testing.assert_allclose(out["per_symbol_equity"][sym]["equity"].to_numpy(), ref_equity[sym].to_numpy(), rtol=1e-12)
+    assert out["per_symbol_equity"]["B"]["equity"].isna().sum() == 3
+    assert list(zip(out["trades"]["timestamp"], out["trades"]["symbol"])) == [t[:2] for t in ref_trades]
+    np.testing.assert_allclose(out["trades"]["size"].to_numpy(), [t[2] for t in ref_trades], rtol=1e-9, atol=1e-9)
+    ref_port = pd.DataFrame(ref_equity).ffill().sum(axis=1)
+    np.testing.assert_allclose(out["portfolio_equity"].to_numpy(), ref_port.to_numpy(), rtol=1e-12)
+
+    # exposure sizing: a missing bar holds the position instead of trading at a NaN price
+    plain = run_vector_backtest(prices, lambda p, cfg: exposures, cfg={"risk": {"use_atr": False}})
+    b = plain["per_symbol_equity"]["B"]
+    assert b["equity"].isna().sum() == 3 and np.isfinite(b["cash"]).all()
+    assert not plain["trades"]["price"].isna().any()
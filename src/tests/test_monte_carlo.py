@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from backtest.monte_carlo import DEFAULT_QUANTILES, bootstrap_indices, bootstrap_paths, default_block_size, run_monte_carlo
+
+
+def _returns(n=500, seed=0):
+    return pd.Series(np.random.default_rng(seed).normal(0.0004, 0.01, n))
+
+
+def test_iid_paths_match_per_path_loop():
+    ret = _returns()
+    rng = np.random.default_rng(42)
+    r = ret.to_numpy()
+    loop = np.column_stack([(1.0 + pd.Series(rng.choice(r, size=100, replace=True))).cumprod().values for _ in range(20)])
+    np.testing.assert_array_equal(bootstrap_paths(ret, n_paths=20, path_len=100).to_numpy(), loop)
+
+
+def test_block_indices_are_contiguous():
+    idx = bootstrap_indices(50, 40, 30, "circular", block_size=8, rng=np.random.default_rng(1))
+    assert idx.shape == (40, 30)
+    steps = (np.diff(idx, axis=0) % 50)[np.arange(39) % 8 != 7]
+    assert (steps == 1).all()
+    stat = bootstrap_indices(50, 200, 500, "stationary", block_size=10, rng=np.random.default_rng(1))
+    breaks = (np.diff(stat, axis=0) % 50) != 1
+    assert 0.07 < breaks.mean() < 0.13          # new block with probability ~1/10
+
+
+def test_chunked_bands_match_exact_quantiles():
+    ret = _returns()
+    res = run_monte_carlo(ret, n_paths=3000, path_len=120, method="stationary", memory_budget_mb=0.5)
+    assert res.chunk_size < 3000 and res.terminal.shape == (3000,)
+    rng = np.random.default_rng(42)
+    r = ret.to_numpy()
+    block = default_block_size(len(r))
+    eq = np.concatenate([
+        np.cumprod(1.0 + r[bootstrap_indices(len(r), 120, min(res.chunk_size, 3000 - s), "stationary", block, rng)], axis=0)
+        for s in range(0, 3000, res.chunk_size)
+    ], axis=1)
+    np.testing.assert_allclose(res.terminal, eq[-1])
+    exact = np.quantile(eq, DEFAULT_QUANTILES, axis=1).T
+    np.testing.assert_allclose(res.bands.to_numpy(), exact, atol=5e-3)
+    dd = (eq / np.maximum.accumulate(eq, axis=0) - 1.0).min(axis=0)
+    np.testing.assert_allclose(res.max_drawdown, dd)
+    assert res.summary()["max_drawdown_median"] <= 0.0
@@ -0,0 +1,47 @@
+# src/tests/test_parallel_folds.py
+import numpy as np
+import pandas as pd
+import pytest
+from backtest.parallel import map_folds, fold_seed
+
+def _noisy_fold(fold, scale):
+    return fold, float(np.random.rand() * scale)
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_map_folds_ordered_and_seeded(executor):
+    args = [(i, 10.0) for i in range(6)]
+    serial = map_folds(_noisy_fold, args, executor="serial", seed=7)
+    parallel = map_folds(_noisy_fold, args, executor=executor, max_workers=3, seed=7)
+    assert [f for f, _ in parallel] == list(range(6))
+    assert parallel == serial
+    assert fold_seed(7, 0) != fold_seed(7, 1)
+
+def test_walkforward_adapter_parallel_matches_serial():
+    pytest.importorskip("sklearn")
+    from backtest.wf_runner import WalkForwardAdapter
+
+    class Strat:
+        def fit(self, df):
+            self.level = float(df["close"].mean())
+
+    idx = pd.date_range("2022-01-01", periods=300, freq="D")
+    data = pd.DataFrame({"close": 100 + np.random.RandomState(0).randn(300).cumsum()}, index=idx)
+    serial = WalkForwardAdapter().run(data, Strat(), n_splits=4, test_size=40)
+    threaded = WalkForwardAdapter(executor="thread", max_workers=4, seed=1).run(data, Strat(), n_splits=4, test_size=40)
+    pd.testing.assert_frame_equal(serial.summary, threaded.summary)
+
+def test_walkforward_adapter_shared_panel_process_workers():
+    pytest.importorskip("sklearn")
+    from backtest.wf_runner import WalkForwardAdapter
+    from data_layer.shared_panel import SharedPanel
+
+    idx = pd.date_range("2022-01-01", periods=300, freq="D")
+    data = pd.DataFrame({"close": 100 + np.random.RandomState(0).randn(300).cumsum()}, index=idx)
+    serial = WalkForwardAdapter().run(data, _MeanStrat(), n_splits=3, test_size=50)
+    with SharedPanel.publish({"ASSET": data}, fields=["close"]) as panel:
+        shared = WalkForwardAdapter(executor="process", max_workers=2).run(panel.handle, _MeanStrat(), n_splits=3, test_size=50)
+    pd.testing.assert_frame_equal(serial.summary, shared.summary)
+
+class _MeanStrat:
+    def fit(self, df):
+        self.level = float(df["close"].mean())
@@ -0,0 +1,56 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from backtest.result_cache import ResultCache, data_hash, result_key
+from core.backtest_engine import PercentageCommissionModel
+
+
+def _frame(n=50, seed=0):
+    idx = pd.date_range("2022-01-03", periods=n, freq="B")
+    px = 100 + np.random.default_rng(seed).normal(0, 1, n).cumsum()
+    return pd.DataFrame({"open": px, "high": px + 1, "low": px - 1, "close": px, "volume": 1000.0}, index=idx)
+
+
+class _Strat:
+    def __init__(self, window=10):
+        self.window = window
+
+
+def test_key_covers_data_strategy_costs_and_version():
+    df = _frame()
+    base = result_key(df, _Strat(10), PercentageCommissionModel(0.0005), engine="e", settings={"n_splits": 5})
+    assert base == result_key(df.copy(), _Strat(10), PercentageCommissionModel(0.0005), engine="e", settings={"n_splits": 5})
+    bumped = df.copy()
+    bumped.iloc[3, 3] += 1e-9
+    assert data_hash(bumped) != data_hash(df)
+    assert base != result_key(df, _Strat(20), PercentageCommissionModel(0.0005), engine="e", settings={"n_splits": 5})
+    assert base != result_key(df, _Strat(10), PercentageCommissionModel(0.001), engine="e", settings={"n_splits": 5})
+    assert base != result_key(df, _Strat(10), PercentageCommissionModel(0.0005), engine="e", settings={"n_splits": 3})
+    assert base != result_key(df, _Strat(10), PercentageCommissionModel(0.0005), engine="e", settings={"n_splits": 5},
+                              engine_version="0.0.0")
+
+
+def test_get_or_compute_counts_hits_and_misses(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    calls = []
+    compute = lambda: calls.append(1) or {"sharpe": 1.5}
+    assert cache.get_or_compute("k1", compute) == ({"sharpe": 1.5}, "miss")
+    assert cache.get_or_compute("k1", compute) == ({"sharpe": 1.5}, "hit")
+    assert len(calls) == 1 and (cache.hits, cache.misses) == (1, 1)
+
+
+def test_lru_eviction_keeps_recently_used(tmp_path):
+    blob = np.zeros(1000)                                  # ~8 KB pickled
+    cache = ResultCache(str(tmp_path), max_bytes=20_000)   # room for two entries
+    cache.put("a", blob)
+    cache.put("b", blob)
+    past = time.time() - 60
+    os.utime(cache._path("a"), (past, past - 1))
+    os.utime(cache._path("b"), (past, past))
+    assert cache.get("a")[0]                               # touch "a": "b" is now least recent
+    cache.put("c", blob)
+    assert cache.get("a")[0] and cache.get("c")[0] and not cache.get("b")[0]
+    assert cache.stats()["bytes"] <= 20_000
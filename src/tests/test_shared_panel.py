@@ -0,0 +1,43 @@
+# src/tests/test_shared_panel.py
+import numpy as np
+import pandas as pd
+import pytest
+from concurrent.futures import ProcessPoolExecutor
+from data_layer.shared_panel import SharedPanel
+from core.backtest_engine import BacktestEngine, OrderDirection, OrderType
+
+def _prices(n=60):
+    idx = pd.date_range("2023-01-02", periods=n, freq="B", tz="UTC")
+    rs = np.random.RandomState(5)
+    out = {}
+    for sym in ("AAA", "BBB"):
+        px = 100 + rs.randn(n).cumsum()
+        out[sym] = pd.DataFrame({"open": px, "high": px + 1, "low": px - 1, "close": px, "volume": 1000.0}, index=idx)
+    return out
+
+def _close_sum(handle, symbol):
+    frame = SharedPanel.attach(handle).frame(symbol)
+    return float(frame["close"].sum()), str(frame.index[0])
+
+@pytest.mark.parametrize("backend", ["shm", "memmap"])
+def test_workers_attach_zero_copy(backend):
+    prices = _prices()
+    with SharedPanel.publish(prices, backend=backend) as panel:
+        view = panel.frame("BBB")
+        assert np.shares_memory(view.to_numpy(), panel.array)
+        pd.testing.assert_frame_equal(view, prices["BBB"], check_freq=False)
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            out = list(pool.map(_close_sum, [panel.handle] * 2, ["BBB", "AAA"]))
+        assert out[0] == (float(prices["BBB"]["close"].sum()), str(prices["BBB"].index[0]))
+
+def test_backtest_engine_accepts_handle():
+    prices = _prices()
+    idx = prices["AAA"].index
+    with SharedPanel.publish(prices) as panel:
+        reports = []
+        for data in (prices, panel.handle):
+            engine = BacktestEngine(price_data=data, initial_capital=50_000.0, mode="array")
+            engine.submit_order("AAA", OrderDirection.LONG, 10, OrderType.MARKET, submission_date=idx[0])
+            reports.append(engine.run(idx[0], idx[-1]))
+        assert np.shares_memory(engine._panel, panel.array)
+    pd.testing.assert_series_equal(reports[0]["portfolio_history"], reports[1]["portfolio_history"], check_freq=False)
@@ -0,0 +1,83 @@
+# src/tests/test_vectorized_batch.py
+import numpy as np
+import pandas as pd
+from backtest.vectorized import vectorized_pnl, vectorized_pnl_batch
+from backtest.metrics import summarize
+import pytest
+
+def test_batch_matches_single_signal_runs():
+    n = 400
+    idx = pd.date_range("2023-01-01", periods=n, freq="D")
+    close = pd.Series(100 + np.random.RandomState(3).randn(n).cumsum(), index=idx)
+    df = pd.DataFrame({"open": close, "close": close}, index=idx)
+    signals = pd.DataFrame({f"lb_{w}": np.sign(close.diff(w)).fillna(0.0) for w in (1, 5, 20)})
+
+    equity, ret, metrics = vectorized_pnl_batch(df, signals)
+    assert equity.shape == (n, 3) and list(metrics.index) == list(signals.columns)
+    for col in signals.columns:
+        eq1, ret1 = vectorized_pnl(df, signals[col])
+        np.testing.assert_allclose(equity[col].to_numpy(), eq1.to_numpy(), rtol=1e-12)
+        np.testing.assert_allclose(ret[col].to_numpy(), ret1.to_numpy(), rtol=1e-12, atol=1e-15)
+        assert metrics.loc[col].to_dict() == summarize(eq1, None)
+
+
+@pytest.mark.filterwarnings("ignore:The default fill_method:FutureWarning")
+def test_batch_forward_fills_missing_opens_like_single_runs():
+    idx = pd.date_range("2023-01-01", periods=12, freq="D")
+    close = pd.Series(100 + np.arange(12.0), index=idx)
+    opens = close.copy()
+    opens.iloc[[0, 4, 5, 9]] = np.nan  # leading gap plus interior gaps
+    df = pd.DataFrame({"open": opens, "close": close}, index=idx)
+    signals = pd.DataFrame({"long": 1.0, "flip": np.where(np.arange(12) % 3, 1.0, -1.0)}, index=idx)
+
+    equity, ret, _ = vectorized_pnl_batch(df, signals)
+    assert np.isfinite(equity.to_numpy()).all()
+    for col in signals.columns:
+        eq1, ret1 = vectorized_pnl(df, signals[col])
+        np.testing.assert_allclose(equity[col].to_numpy(), eq1.to_numpy(), rtol=1e-12)
+        np.testing.assert_allclose(ret[col].to_numpy(), ret1.to_numpy(), rtol=1e-12, atol=1e-15)
+
+
+def test_backtest_vectorized_batch_matches_single_signal_runs(core_backtest):
+    engine = core_backtest("engine")
+    metrics_mod = core_backtest("metrics")
+    n = 300
+    idx = pd.date_range("2023-01-01", periods=n, freq="D")
+    rng = np.random.RandomState(7)
+    close = pd.Series(100 + rng.randn(n).cumsum(), index=idx)
+    df = pd.DataFrame({"open": close, "close": close}, index=idx)
+    with_nans = np.sign(close.diff(3))
+    with_nans.iloc[rng.choice(n, 40, replace=False)] = np.nan
+    signals = pd.DataFrame({
+        "lb_1": np.sign(close.diff(1)).fillna(0.0),
+        "lb_10": np.sign(close.diff(10)).fillna(0.0),
+        "nan_sig": with_nans,
+        "flat": 0.0,
+    }, index=idx)
+    costs = engine.TradeCosts(commission=0.0005, slippage_bps=2.0)
+
+    equity, ret, stats = engine.backtest_vectorized_batch(df, signals, costs)
+    assert equity.shape == (n, 4) and list(stats.index) == list(signals.columns)
+    for col in signals.columns:
+        eq1, ret1, stats1 = engine.backtest_vectorized(df, signals[col], costs)
+        np.testing.assert_allclose(equity[col].to_numpy(), eq1.to_numpy(), rtol=1e-12)
+        np.testing.assert_allclose(ret[col].to_numpy(), ret1.to_numpy(), rtol=1e-12, atol=1e-15)
+        assert stats.loc[col].keys().tolist() == list(stats1)
+        np.testing.assert_allclose(stats.loc[col].to_numpy(), list(stats1.values()), rtol=1e-9, atol=1e-12)
+        batch_only = metrics_mod.compute_metrics_batch(eq1.to_frame(col), ret1.to_frame(col)).loc[col]
+        np.testing.assert_allclose(batch_only.to_numpy(), list(metrics_mod.compute_metrics(eq1, ret1).values()), rtol=1e-9, atol=1e-12)
+    assert (equity["flat"] == 1.0).all() and stats.loc["flat"].drop("FinalNAV").eq(0.0).all()
+
+
+def test_compute_metrics_batch_nan_returns_and_short_series(core_backtest):
+    metrics_mod = core_backtest("metrics")
+    idx = pd.date_range("2023-01-01", periods=6, freq="D")
+    ret = pd.DataFrame({"a": [np.nan, 0.01, -0.02, np.nan, 0.03, -0.01], "zero": 0.0}, index=idx)
+    equity = (1 + ret.fillna(0.0)).cumprod()
+    batch = metrics_mod.compute_metrics_batch(equity, ret)
+    for col in ret.columns:
+        single = metrics_mod.compute_metrics(equity[col], ret[col])
+        np.testing.assert_allclose(batch.loc[col].to_numpy(), list(single.values()), rtol=1e-9, atol=1e-12)
+    one = metrics_mod.compute_metrics_batch(equity.iloc[:1], ret.iloc[:1])
+    for col in ret.columns:
+        assert one.loc[col].to_dict() == metrics_mod.compute_metrics(equity[col].iloc[:1], ret[col].iloc[:1])
@@ -31,13 +31,14 @@ def normalize_yf(df: pd.DataFrame) -> pd.DataFrame:
     keep = [c for c in ["open","high","low","close","volume"] if c in df.columns]
     return df[keep].dropna(how="any")
 
-def synthetic_walk(symbol: str, n: int = 1000, start_price: float = 100.0, seed: int = 42):
+def synthetic_walk(symbol: str, n: int = 1000, start_price: float = 100.0, seed: int = 42, freq: str = "D"):
     import numpy as np
     import pandas as pd
     rng = np.random.default_rng(seed)
     rets = rng.normal(0, 0.001, n)
     price = start_price * (1 + rets).cumprod()
-    idx = pd.date_range("2018-01-01", periods=n, freq="D")
+    # daily bars overflow the Timestamp range past ~89k rows; large datasets use freq="min"
+    idx = pd.date_range("2018-01-01", periods=n, freq=freq)
     df = pd.DataFrame({
         "open": price * (1 + rng.normal(0, 0.0005, n)),
         "high": price * (1 + rng.normal(0.001, 0.0005, n)),
@@ -0,0 +1,197 @@
+import os, sys, time
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from core.bus.event_bus import EventBus, OrderEvent
+
+def _drain(bus, timeout=2.0):
+    end = time.time() + timeout
+    while (bus.get_stats()["queue_size"] or not bus._idle) and time.time() < end:
+        time.sleep(0.001)
+
+def test_wakeup_queue_ring_log_and_slots():
+    bus = EventBus()
+    bus.reset()
+    got = []
+    def record(e): got.append(e.order_id)
+    def boom(e): raise ValueError("x")
+    bus.subscribe(OrderEvent, record)
+    bus.subscribe(OrderEvent, boom)
+    _drain(bus)
+    assert bus._idle  # parked on the wakeup event, not polling
+
+    bus.configure(audit_log_size=4, audit_sample_every=2)
+    for i in range(10):
+        bus.publish(OrderEvent(order_id=str(i)))
+    _drain(bus)
+    assert got == [str(i) for i in range(10)]
+    stats = bus.get_stats()
+    assert stats["total_events"] == 10
+    assert stats["handlers"][record.__qualname__] == 10 and stats["handler_errors"][boom.__qualname__] == 10
+    log = bus.get_event_log()
+    assert [e["event"].order_id for e in log] == ["2", "4", "6", "8"]  # sampled 0,2,..,8; ring keeps the last 4
+    assert log[-1]["handlers_triggered"] == 1 and "OrderEvent" in log[-1]["event_data"]
+
+    bus.replay(from_idx=3)
+    _drain(bus)
+    assert got[-1] == "8"
+
+    bus.configure(max_queue_size=0)
+    bus.publish(OrderEvent(order_id="dropped"))
+    assert bus.get_stats()["dropped_events"] == 1
+    old = bus._thread
+    bus.reset()
+    assert not old.is_alive() and bus.get_stats()["total_events"] == 0
+
+def test_dispatch_resolves_type_then_direct_bases():
+    from dataclasses import dataclass
+    from core.bus.event_bus import Event
+
+    @dataclass
+    class FillEvent(OrderEvent):
+        fill_qty: float = 0.0
+
+    bus = EventBus()
+    bus.reset()
+    def on_event(e): pass
+    def on_order(e): pass
+    def on_fill(e): pass
+    bus.subscribe(Event, on_event, priority=-5)
+    bus.subscribe(OrderEvent, on_order, priority=9)
+    bus.subscribe(FillEvent, on_fill)
+    # the event's own handlers come before its direct bases'; Event is FillEvent's grandparent
+    assert [h[1] for h in bus._handlers_for(FillEvent)] == [on_fill, on_order]
+    assert [h[1] for h in bus._handlers_for(OrderEvent)] == [on_order, on_event]
+    bus.reset()
+
+def test_transport_codec_and_cross_process_bridge(tmp_path):
+    import multiprocessing as mp
+    from datetime import datetime, timezone, timedelta
+    import pandas as pd
+    from core.bus.event_bus import EventType, MarketDataEvent
+    from core.bus.transport import EventCodec, TransportBridge, UnixSocketHub, UnixSocketTransport
+
+    codec = EventCodec([OrderEvent, MarketDataEvent])
+    order = OrderEvent(event_type=EventType.ORDER_EVENT, timestamp=pd.Timestamp("2024-01-02 03:04:05.123456789", tz="UTC"),
+                       metadata={"tags": ["a", 1, 2.5, None, True], "at": datetime(2024, 1, 2, tzinfo=timezone(timedelta(hours=3)))},
+                       order_id="o-1", symbol="BTC-USD", quantity=0.5, price=60_000.0)
+    frame = codec.encode(order)
+    back = codec.decode(memoryview(frame)[4:])
+    assert back == order and back.event_type is EventType.ORDER_EVENT and len(frame) < 160
+    md = MarketDataEvent(symbol="X", data=pd.DataFrame({"close": [1.0, 2.0]}))
+    trusted = EventCodec([OrderEvent, MarketDataEvent], allow_pickle=True)
+    pickled = trusted.encode(md)
+    assert trusted.decode(memoryview(pickled)[4:]).data.equals(md.data)
+    with pytest.raises(TypeError, match="allow_pickle"):
+        codec.encode(md)
+    with pytest.raises(ValueError, match="allow_pickle"):  # a peer cannot make us unpickle
+        codec.decode(memoryview(pickled)[4:])
+    with pytest.raises(TypeError, match="enum-typed field"):  # would come back as a bare value
+        codec.encode(OrderEvent(metadata={"kind": EventType.ORDER_EVENT}))
+
+    path = str(tmp_path / "bus.sock")
+    hub = UnixSocketHub(path, codec)
+    assert os.stat(path).st_mode & 0o777 == 0o600
+    bus = EventBus()
+    bus.reset()
+    got = []
+    bus.subscribe(OrderEvent, got.append)
+    TransportBridge(bus, hub, codec).start()
+
+    def worker(i):
+        t = UnixSocketTransport.connect(path, EventCodec([OrderEvent, MarketDataEvent]))
+        t.send_many(OrderEvent(order_id=f"{i}-{k}", symbol="BTC-USD") for k in range(100))
+        t.close()
+    procs = [mp.get_context("fork").Process(target=worker, args=(i,)) for i in range(3)]
+    for p in procs: p.start()
+    for p in procs: p.join(10)
+    end = time.time() + 5
+    while len(got) < 300 and time.time() < end:
+        time.sleep(0.01)
+    hub.close()
+    assert len(got) == 300
+    for i in range(3):  # per-worker order is preserved
+        assert [e.order_id for e in got if e.order_id.startswith(f"{i}-")] == [f"{i}-{k}" for k in range(100)]
+
+def test_journal_middleware_and_mmap_replay(tmp_path):
+    import pandas as pd
+    from core.bus.event_bus import MarketDataEvent
+    from core.bus.journal import EventJournal, JournalReplayer
+    bus = EventBus()
+    bus.reset()
+    journal = EventJournal(str(tmp_path), segment_bytes=4096)
+    bus.add_middleware(journal)
+    t0 = pd.Timestamp("2024-01-02 09:30", tz="UTC")
+    for i in range(200):
+        bus.publish(OrderEvent(timestamp=t0 + pd.Timedelta(milliseconds=10 * i), order_id=str(i), price=float(i)), block=True)
+        if i % 50 == 0:
+            bus.publish(MarketDataEvent(timestamp=t0 + pd.Timedelta(milliseconds=10 * i), symbol="X"), block=True)
+    _drain(bus)
+    journal.close()
+    bus.reset()
+
+    # a second writer appends a new segment and is left unclosed, as after a crash
+    crashed = EventJournal(str(tmp_path))
+    crashed.append(OrderEvent(timestamp=t0 + pd.Timedelta(seconds=5), order_id="late"))
+    crashed._mm.flush()
+
+    r = JournalReplayer(str(tmp_path))
+    assert len(r.segments) > 2 and len(r) == 205
+    assert [e.order_id for _, e in r.events(types=[OrderEvent])][-2:] == ["199", "late"]
+    window = list(r.events(start=t0 + pd.Timedelta(milliseconds=500), end=t0 + pd.Timedelta(milliseconds=600)))
+    assert [type(e).__name__ for _, e in window].count("OrderEvent") == 10 and len(window) == 11
+    assert window[0][1].timestamp == t0 + pd.Timedelta(milliseconds=500) and window[0][0] == window[0][1].timestamp.value
+
+    got = []
+    bus.subscribe(OrderEvent, got.append)
+    bus.configure(max_queue_size=8)
+    assert r.replay(bus, types=[OrderEvent]) == 201  # blocks instead of overflowing the queue
+    _drain(bus)
+    assert [e.order_id for e in got] == [str(i) for i in range(200)] + ["late"] and bus.get_stats()["dropped_events"] == 0
+
+    start = time.perf_counter()  # 0.5 s of original time at 10x
+    assert r.replay(bus, speed=10.0, end=t0 + pd.Timedelta(milliseconds=500), types=[OrderEvent]) == 50
+    assert 0.04 <= time.perf_counter() - start < 0.5
+    r.close()
+    bus.reset()
+
+def test_journal_manifest_checks_codec_and_unimportable_types(tmp_path):
+    from dataclasses import dataclass
+    import pandas as pd
+    from core.bus.event_bus import MarketDataEvent
+    from core.bus.journal import EventJournal, JournalReplayer
+    from core.bus.transport import EventCodec
+
+    @dataclass
+    class LocalEvt:
+        n: int = 0
+
+    with EventJournal(str(tmp_path)) as journal:
+        journal.append(OrderEvent(order_id="o"))
+        journal.append(MarketDataEvent(symbol="X", data=pd.DataFrame({"close": [1.0]})))
+        journal.append(LocalEvt(7))
+    with pytest.raises(ValueError, match="defined inside a function"):
+        JournalReplayer(str(tmp_path))
+    with pytest.raises(ValueError, match="manifest order"):  # would silently remap type ids
+        JournalReplayer(str(tmp_path), EventCodec([MarketDataEvent, OrderEvent, LocalEvt]))
+    r = JournalReplayer(str(tmp_path), EventCodec([OrderEvent, MarketDataEvent, LocalEvt], allow_pickle=True))
+    events = [e for _, e in r.events()]
+    assert events[0].order_id == "o" and events[1].data["close"].tolist() == [1.0] and events[2] == LocalEvt(7)
+    r.close()
+
+def test_raising_middleware_does_not_stop_the_bus(tmp_path):
+    from core.bus.journal import EventJournal
+    bus = EventBus()
+    bus.reset()
+    got = []
+    bus.subscribe(OrderEvent, got.append)
+    journal = EventJournal(str(tmp_path))
+    bus.add_middleware(journal)
+    bus.add_middleware(lambda ev: 1 / 0 if ev.order_id == "bad" else ev)
+    journal.close()  # every append now raises
+    for oid in ("a", "bad", "b"):
+        bus.publish(OrderEvent(order_id=oid))
+    _drain(bus)
+    assert bus._thread.is_alive()
+    assert [e.order_id for e in got] == ["a", "bad", "b"]
+    assert bus.get_stats()["middleware_errors"] == 4
+    bus.reset()
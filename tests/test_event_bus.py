@@ -29,3 +29,221 @@ async def test_drop_policy():
     bus.publish(TestEvt(source="t2"))
     await asyncio.sleep(0.05)
     assert bus.metrics["dropped"] >= 1
+
+class ChildEvt(TestEvt):
+    pass
+
+class GrandChildEvt(ChildEvt):
+    pass
+
+@pytest.mark.asyncio
+async def test_dispatch_table_mro_priority_and_incremental_removal():
+    bus = EventBus(sticky_events=False)
+    got = []
+    class Sink:
+        def on(self, e): got.append("weak")
+    sink = Sink()
+    bus.subscribe(BaseEvent, lambda e: got.append("any"), priority=0)
+    bus.subscribe(TestEvt, lambda e: got.append("grandparent"), priority=7)
+    bus.subscribe(GrandChildEvt, lambda e: got.append("exact"), priority=3)
+    bus.subscribe(ChildEvt, lambda e: got.append("once"), priority=5, once=True)
+    bus.subscribe(ChildEvt, sink.on, priority=1, weakref=True)
+
+    table = bus.handlers_for(GrandChildEvt)
+    assert bus.handlers_for(GrandChildEvt) is table  # built once per concrete type
+    await bus._dispatch(GrandChildEvt(source="t"))
+    assert got == ["grandparent", "once", "exact", "weak", "any"]
+
+    del sink  # dead weakref and fired `once` are dropped from the cached tables in place
+    got.clear()
+    await bus._dispatch(GrandChildEvt(source="t"))
+    await bus._dispatch(ChildEvt(source="t"))
+    assert got == ["grandparent", "exact", "any", "grandparent", "any"]
+    assert len(bus.handlers_for(GrandChildEvt)) == 3 and bus._subs[ChildEvt] == []
+
+    def late(e): got.append("late")
+    bus.subscribe(ChildEvt, late, priority=9)  # subscribe invalidates
+    assert bus.handlers_for(GrandChildEvt)[0].handler is late
+    bus.unsubscribe(ChildEvt, late)
+    got.clear()
+    await bus._dispatch(GrandChildEvt(source="t"))
+    assert got == ["grandparent", "exact", "any"]
+
+@pytest.mark.asyncio
+async def test_latency_histograms_and_queue_telemetry():
+    import time
+    from monitoring.metrics import REGISTRY
+    bus = EventBus(name="telemetry-test", workers=1, max_queue=50, drop_policy=DropPolicy.DROP_NEW, sticky_events=False)
+    def fast(e): pass
+    def slow(e): time.sleep(0.002)
+    bus.subscribe(TestEvt, fast)
+    bus.subscribe(TestEvt, slow)
+    for _ in range(60):
+        bus.publish(TestEvt(source="t"))
+    await asyncio.sleep(0.3)
+    q = bus.latency_quantiles()
+    assert q["handler"][slow.__qualname__]["p50"] >= 0.002 > q["handler"][fast.__qualname__]["p999"]
+    assert q["event_type"]["TestEvt"]["p99"] >= 0.002
+    txt = REGISTRY.to_prometheus_text()
+    assert 'eventbus_dropped_total{bus="telemetry-test",policy="drop_new"} 10.0' in txt
+    assert 'eventbus_queue_depth_max{bus="telemetry-test"} 50.0' in txt
+    assert 'eventbus_queue_wait_seconds_count{bus="telemetry-test"} 50' in txt
+    assert f'eventbus_handler_latency_seconds_bucket{{bus="telemetry-test",handler="{slow.__qualname__}",le="+Inf"}} 50' in txt
+    assert "# TYPE eventbus_dropped_total counter" in txt and "# TYPE eventbus_blocked_total counter" in txt
+
+    await bus.shutdown()  # a stopped bus leaves nothing behind in the shared registry
+    txt = REGISTRY.to_prometheus_text()
+    assert 'bus="telemetry-test"' not in txt
+    assert bus.latency_quantiles() == {"handler": {}, "event_type": {}}
+
+@pytest.mark.asyncio
+async def test_partitioned_workers_keep_per_symbol_order_and_steal():
+    from dataclasses import dataclass
+    @dataclass(frozen=True)
+    class Bar(BaseEvent):
+        symbol: str = ""
+        seq: int = 0
+    bus = EventBus(workers=4, partitioned=True, sticky_events=False, partition_batch=4)
+    seen = {}
+    async def handler(e):
+        # a slow symbol must not hold up the others, and awaits must not reorder a symbol
+        await asyncio.sleep(0.01 if e.symbol == "SLOW" else 0)
+        seen.setdefault(e.symbol, []).append(e.seq)
+    bus.subscribe(Bar, handler)
+    symbols = ["SLOW"] + [f"S{i}" for i in range(15)]
+    for seq in range(20):
+        for sym in symbols:
+            bus.publish(Bar(source="t", symbol=sym, seq=seq))
+    await asyncio.sleep(0.05)
+    assert all(len(seen.get(s, [])) == 20 for s in symbols[1:])  # done while SLOW is still running
+    assert len(seen["SLOW"]) < 20
+    await bus.shutdown(timeout=2.0)
+    assert all(seen[s] == list(range(20)) for s in symbols)
+    assert bus.qsize() == 0 and bus.steals > 0 and bus.metrics["processed"] == 320
+
+@pytest.mark.asyncio
+async def test_priority_lanes_conflation_and_credits():
+    from dataclasses import dataclass
+    from core.event_bus import Lane
+    @dataclass(frozen=True)
+    class Bar(BaseEvent):
+        symbol: str = ""
+        seq: int = 0
+    @dataclass(frozen=True)
+    class Fill(BaseEvent):
+        order_id: str = ""
+    @dataclass(frozen=True)
+    class KillSwitch(BaseEvent):
+        lane = Lane.CONTROL
+
+    got = []
+    def record(e): got.append(e)
+    bus = EventBus(workers=1, lanes=True, data_events=(Bar,), max_queue=4, sticky_events=False)
+    for cls in (Bar, Fill, KillSwitch):
+        bus.subscribe(cls, record)
+    for i in range(10):  # the firehose fills the data lane; control events are never dropped
+        bus.publish(Bar(source="md", symbol="BTC", seq=i))
+    bus.publish(Fill(source="gw", order_id="o1"))
+    bus.publish(KillSwitch(source="risk"))
+    await bus.shutdown(timeout=1.0)
+    assert [type(e).__name__ for e in got[:2]] == ["Fill", "KillSwitch"]
+    assert [e.seq for e in got[2:]] == [0, 1, 2, 3] and bus.metrics["dropped"] == 6
+
+    got.clear()
+    bus = EventBus(workers=1, lanes=True, data_events=(Bar,), conflate=True, sticky_events=False)
+    bus.subscribe(Bar, record)
+    for i in range(100):
+        for sym in ("BTC", "ETH", "SOL"):
+            bus.publish(Bar(source="md", symbol=sym, seq=i))
+    await bus.shutdown(timeout=1.0)
+    assert [(e.symbol, e.seq) for e in got] == [("BTC", 99), ("ETH", 99), ("SOL", 99)] and bus.conflated == 297
+
+    # post() waits for credits instead of dropping, and keeps publish order
+    got.clear()
+    bus = EventBus(workers=1, lanes=True, data_events=(Bar,), max_queue=2, sticky_events=False)
+    bus.subscribe(Bar, record)
+    await asyncio.wait_for(asyncio.gather(*(bus.post(Bar(source="md", symbol="BTC", seq=i)) for i in range(20))), 2.0)
+    await bus.shutdown(timeout=1.0)
+    assert [e.seq for e in got] == list(range(20)) and bus.metrics["dropped"] == 0
+
+@pytest.mark.asyncio
+async def test_block_and_drop_oldest_inside_running_loop():
+    for policy in (DropPolicy.BLOCK, DropPolicy.DROP_OLDEST):
+        got = []
+        bus = EventBus(workers=1, max_queue=2, drop_policy=policy, sticky_events=False)
+        bus.subscribe(TestEvt, lambda e: got.append(e.source))
+        for i in range(5):
+            bus.publish(TestEvt(source=str(i)))  # used to raise "This event loop is already running"
+        await asyncio.sleep(0.05)
+        assert got == (["0", "1", "2", "3", "4"] if policy == DropPolicy.BLOCK else ["3", "4"])
+        await bus.shutdown(timeout=0.5)
+
+@pytest.mark.asyncio
+async def test_partitioned_backpressure_and_worker_removal():
+    from dataclasses import dataclass
+    @dataclass(frozen=True)
+    class Bar(BaseEvent):
+        symbol: str = ""
+        seq: int = 0
+    for policy in (DropPolicy.BLOCK, DropPolicy.DROP_NEW):
+        seen = {}
+        bus = EventBus(workers=2, max_queue=5, partitioned=True, drop_policy=policy, sticky_events=False)
+        async def handler(e):
+            await asyncio.sleep(0)
+            seen.setdefault(e.symbol, []).append(e.seq)
+        bus.subscribe(Bar, handler)
+        for seq in range(50):  # post() waits for room instead of dropping
+            await asyncio.wait_for(bus.post(Bar(source="t", symbol=f"S{seq % 3}", seq=seq)), 1.0)
+            assert bus.qsize() <= 5
+        for seq in range(50, 80):  # BLOCK defers publishes behind the room; DROP_NEW discards them
+            bus.publish(Bar(source="t", symbol=f"S{seq % 3}", seq=seq))
+        await bus.shutdown(timeout=2.0)
+        n = 80 if policy == DropPolicy.BLOCK else 50 + 30 - bus.metrics["dropped"]
+        assert sum(map(len, seen.values())) == n and all(v == sorted(v) for v in seen.values())
+        assert bus.metrics["dropped"] == (0 if policy == DropPolicy.BLOCK else 30 - (n - 50))
+
+    # a worker woken for a ready key but removed before it runs hands the key on
+    got = []
+    bus = EventBus(workers=2, partitioned=True, sticky_events=False)
+    bus.subscribe(Bar, lambda e: got.append(e.symbol))
+    await asyncio.sleep(0)  # both workers park
+    sym = next(s for s in (f"K{i}" for i in range(100)) if bus.partition_of(s) == 1)
+    bus.publish(Bar(source="t", symbol=sym))
+    await bus.adjust_workers(1)
+    await asyncio.wait_for(bus._drained.wait(), 1.0)
+    assert got == [sym]
+    await bus.shutdown(timeout=0.5)
+
+@pytest.mark.asyncio
+async def test_block_keeps_fifo_order_under_contention():
+    from dataclasses import dataclass
+    @dataclass(frozen=True)
+    class Bar(BaseEvent):
+        symbol: str = ""
+        seq: int = 0
+    for kw in ({}, {"lanes": True, "data_events": (Bar,)}, {"lanes": True, "data_events": (Bar,), "conflate": True}):
+        got = []
+        bus = EventBus(workers=1, max_queue=3, drop_policy=DropPolicy.BLOCK, sticky_events=False, **kw)
+        bus.subscribe(Bar, lambda e: got.append(e.seq))
+        for i in range(8):
+            bus.publish(Bar(source="t", symbol=f"S{i}", seq=i))
+        await asyncio.sleep(0)  # the worker frees a slot; later publishes must queue behind 3..7
+        for i in range(8, 12):
+            bus.publish(Bar(source="t", symbol=f"S{i}", seq=i))
+        await bus.post(Bar(source="t", symbol="S12", seq=12))
+        if kw: await bus.shutdown(timeout=1.0)
+        else: await asyncio.wait_for(bus.queue.join(), 1.0); await bus.shutdown(timeout=0.5)
+        assert got == list(range(13)), kw
+        # deferred events are delivered, so they count as published and blocked, not dropped
+        assert bus.metrics["published"] == 13 and bus.metrics["dropped"] == 0 and bus.metrics["blocked"] >= 5
+        assert DropPolicy.BLOCK not in bus._dropped_by
+
+    # a conflating bar replaces the waiting one for its symbol, which keeps its place in line
+    got = []
+    bus = EventBus(workers=1, max_queue=1, drop_policy=DropPolicy.BLOCK, lanes=True, data_events=(Bar,),
+                   conflate=True, sticky_events=False)
+    bus.subscribe(Bar, lambda e: got.append((e.symbol, e.seq)))
+    for seq, sym in enumerate(["A", "B", "C", "B", "A", "B"]):
+        bus.publish(Bar(source="t", symbol=sym, seq=seq))
+    await bus.shutdown(timeout=1.0)
+    assert got == [("A", 4), ("B", 5), ("C", 2)] and bus.conflated == 3
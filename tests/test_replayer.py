@@ -17,3 +17,47 @@ def test_replayer_sync():
     assert cnt == 2 and len(received) == 2
     assert received[0]["payload"]["bar"]["o"] == 1.0
     assert received[1]["payload"]["bar"]["c"] == 2.5
+
+def test_replayer_batches_and_unrolls_for_legacy_handlers():
+    import numpy as np
+    n = 200_000
+    df = pd.DataFrame({
+        "timestamp": pd.date_range("2023-01-01", periods=n, freq="min", tz="UTC"),
+        "symbol": np.where(np.arange(n) % 2 == 0, "BTC-USD", "ETH-USD"),
+        "open": np.arange(n, dtype=float), "high": 1.0, "low": 1.0, "close": 2.0, "volume": 3,
+    })
+    bus = EventBus()
+    batches, legacy, order = [], [], []
+    bus.subscribe("MARKET_DATA", lambda b: (batches.append(len(b)), order.append("batch")), batch=True)
+    bus.subscribe("MARKET_DATA", lambda ev: (legacy.append(ev), order.append("bar")) if len(legacy) < 3 else None)
+    assert DataReplayer(df.iloc[:3]).run_sync(bus) == 3
+    assert order == ["batch", "bar", "bar", "bar"]
+    assert [ev["payload"]["symbol"] for ev in legacy] == ["BTC-USD", "ETH-USD", "BTC-USD"]
+    assert legacy[1]["payload"]["bar"] == {"t": "2023-01-01T00:01:00+00:00", "o": 1.0, "h": 1.0, "l": 1.0, "c": 2.0, "v": 3.0}
+
+    fast = EventBus()
+    got = []
+    fast.subscribe("MARKET_DATA", lambda b: got.append(b), batch=True)
+    assert DataReplayer(df, batch_size=50_000).run_sync(fast) == n
+    assert [len(b) for b in got] == [50_000] * 4
+    np.testing.assert_array_equal(np.concatenate([b.o for b in got]), df["open"].to_numpy())
+    assert list(got[0].symbols()[:2]) == ["BTC-USD", "ETH-USD"]
+
+def test_autonom_ed_bar_batch_unrolls_into_bar_events():
+    from datetime import datetime
+    from autonom_ed.core.bus.event_bus import EventBus as EdBus
+    from autonom_ed.core.events.data_events import BarBatch, BarDataEvent
+    frame = pd.DataFrame({"open": [1.0, 2.0], "high": [2.0, 3.0], "low": [0.5, 1.5], "close": [1.5, 2.5], "volume": [10, 11]},
+                         index=pd.date_range("2023-01-02", periods=2, freq="D"))
+    bus = EdBus()
+    bars, whole = [], []
+    bus.subscribe(BarDataEvent, bars.append)
+    bus.subscribe(BarBatch, whole.append)
+    try:
+        bus.publish_batch(BarBatch.from_frame(frame, symbol="SPY", source="t", timestamp=datetime(2023, 1, 1)))
+    finally:
+        bus._subscribers[BarDataEvent].remove(bars.append)
+        bus._subscribers[BarBatch].remove(whole.append)
+    assert len(whole) == 1 and len(whole[0]) == 2
+    assert [(b.timestamp, b.symbol, b.close, b.volume) for b in bars] == [
+        (frame.index[0], "SPY", 1.5, 10.0), (frame.index[1], "SPY", 2.5, 11.0)]
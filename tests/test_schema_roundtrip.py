@@ -1,7 +1,7 @@
 
 import os, sys
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
-from schemas.events import Event
+from schemas.events import Event, LightEvent
 from schemas.signal import Signal
 from schemas.order import Order
 from schemas.risk import RiskDecision
@@ -31,5 +31,30 @@ def run():
     assert abs(data["payload"]["risk"]["sl_px"] - 58500.0) < 1e-9
     print("schema_roundtrip_ok")
 
+def test_light_event_is_a_lazy_event_dict():
+    from infra.event_bus import EventBus
+    from portfolio.ledger import PortfolioLedger
+    from risk.gate import RiskGate
+    from risk.limits import RiskLimits
+    a = LightEvent.create("SIGNAL", "t", {"signal": {"symbol": "BTC-USD", "side": "BUY", "size_hint": 0.2}})
+    b = LightEvent.create("SIGNAL", "t", {})
+    assert b.seq == a.seq + 1 and b.ts_ns >= a.ts_ns and a.event_id != b.event_id
+    d = a.asdict()
+    assert list(d) == ["event_id", "timestamp", "event_type", "source", "payload"] and dict(a) == d
+    assert d["timestamp"].endswith("+00:00") and d["payload"] is a["payload"]
+    assert from_json(to_json(d))["event_id"] == a.event_id and a.to_event().asdict() == d
+
+    bus = EventBus()
+    ledger = PortfolioLedger(bus, start_cash=1000.0)
+    RiskGate(bus, None, RiskLimits())
+    approved, equity = [], []
+    bus.subscribe("SIGNAL_APPROVED", approved.append)
+    bus.subscribe("EQUITY", equity.append)
+    bus.publish("SIGNAL", a)
+    bus.publish("BROKER_TRADE", LightEvent.create("ORDER", "t", {"trade": {"symbol": "BTC-USD", "side": "BUY", "qty": 1, "px": 100.0}}))
+    bus.publish("MARKET_DATA", LightEvent.create("MARKET_DATA", "t", {"symbol": "BTC-USD", "bar": {"t": "2023-01-01T00:00:00+00:00", "c": 110.0}}))
+    assert approved[0]["payload"]["signal"]["size"] == 0.2
+    assert isinstance(equity[0], LightEvent) and equity[0]["payload"]["equity"] == ledger.equity_hist[-1]["equity"] == 1010.0
+
 if __name__ == "__main__":
     run()
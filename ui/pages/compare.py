@@ -21,6 +21,8 @@ def render():
             table = run_wf_batch(selected, wf_splits=wf_splits, wf_test=wf_test)
         st.subheader("WF Summary")
         st.dataframe(table.style.highlight_max(axis=0))
+        cache = table.attrs.get("cache", {})
+        st.caption(f"Result cache: {cache.get('hits', 0)} hit(s), {cache.get('misses', 0)} miss(es)")
 
         csv = table.to_csv().encode("utf-8")
         st.download_button("Download CSV", data=csv, file_name="wf_compare.csv", mime="text/csv")
@@ -2,6 +2,7 @@ import pandas as pd, json
 from pathlib import Path
 from ...src.strategies.registry import STRATEGY_REGISTRY
 from ...src.backtest.wf_engine import WalkForwardEngine
+from ...src.backtest.result_cache import ResultCache
 from ...optimization.hpo_engine import HPOEngine
 
 def _load_fixture():
@@ -10,27 +11,40 @@ def _load_fixture():
         return pd.read_csv(path1, parse_dates=["timestamp"], index_col="timestamp")
     raise FileNotFoundError("tests/fixtures/golden_sample.csv missing")
 
-def run_wf_for_strategy(strategy_key: str, data: pd.DataFrame = None, wf_splits: int = 5, wf_test: int = 63):
+def run_wf_for_strategy(strategy_key: str, data: pd.DataFrame = None, wf_splits: int = 5, wf_test: int = 63,
+                        use_cache: bool = True):
     data = data if data is not None else _load_fixture()
     Strat = STRATEGY_REGISTRY[strategy_key]
     strat = Strat()
-    wf = WalkForwardEngine(n_splits=wf_splits, test_size=wf_test)
+    wf = WalkForwardEngine(n_splits=wf_splits, test_size=wf_test, cache=ResultCache.default() if use_cache else None)
     report = wf.run(strat, data)
     agg = report.aggregate()
     agg["strategy"] = strategy_key
+    agg["cache"] = report.metadata.get("cache", "off")
     return agg
 
-def run_wf_batch(strategy_keys, data: pd.DataFrame = None, wf_splits: int = 5, wf_test: int = 63) -> pd.DataFrame:
+def run_wf_batch(strategy_keys, data: pd.DataFrame = None, wf_splits: int = 5, wf_test: int = 63,
+                 use_cache: bool = True) -> pd.DataFrame:
+    """WF summary per strategy; df.attrs["cache"] holds hit/miss counts and the status per strategy."""
     rows = []
     for key in strategy_keys:
-        rows.append(run_wf_for_strategy(key, data=data, wf_splits=wf_splits, wf_test=wf_test))
+        rows.append(run_wf_for_strategy(key, data=data, wf_splits=wf_splits, wf_test=wf_test, use_cache=use_cache))
     df = pd.DataFrame(rows).set_index("strategy")
     # order columns
     cols = ["sharpe","max_dd","win_rate","turnover"]
-    return df[cols]
+    status = df["cache"].to_dict()
+    out = df[cols]
+    out.attrs["cache"] = {
+        "hits": sum(v == "hit" for v in status.values()),
+        "misses": sum(v == "miss" for v in status.values()),
+        "by_strategy": status,
+    }
+    return out
 
 def run_hpo(strategy_key: str, data: pd.DataFrame = None, n_trials: int = 50, metric: str = "sharpe"):
     data = data if data is not None else _load_fixture()
-    hpo = HPOEngine(metric=metric)
+    hpo = HPOEngine(metric=metric, cache=ResultCache.default())
     study = hpo.optimize(strategy_key, data, n_trials=n_trials)
-    return {"best_value": study.best_value, "best_params": study.best_params, "trials": len(study.trials)}
+    cache = [t.user_attrs.get("cache") for t in study.trials]
+    return {"best_value": study.best_value, "best_params": study.best_params, "trials": len(study.trials),
+            "cache": {"hits": cache.count("hit"), "misses": cache.count("miss")}}